@@ -12,120 +12,2902 @@ Python: 3.12
 # Importación de librerías necesarias
 import pandas as pd
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
-import seaborn as sns
 import warnings
 from datetime import datetime
 import os
+import sys
+import argparse
+import io
+import glob
+import hashlib
+import json
+import shutil
+import time
+import threading
+import weakref
+import cProfile
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import series_temporales_superstore as series
+
+# El pico de memoria residente solo está disponible en sistemas Unix
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# PyArrow es opcional: si está disponible la caché se guarda en Parquet,
+# en caso contrario se usa el formato pickle nativo de pandas
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_DISPONIBLE = True
+except ImportError:
+    PYARROW_DISPONIBLE = False
+
+# Seaborn y DuckDB se importan solo cuando se usan (importar_seaborn, conectar_duckdb)
+# para que las ejecuciones de una sola gráfica arranquen rápido
+sns = None
 
 # Configuración de warnings y estilo
 warnings.filterwarnings('ignore')
 plt.style.use('default')
-sns.set_palette("husl")
 plt.rcParams['figure.figsize'] = (12, 8)
 plt.rcParams['font.size'] = 10
 
-def cargar_y_preparar_datos():
+# Directorio del script: el dataset y el dashboard se buscan y guardan junto a él
+DIRECTORIO_BASE = os.path.dirname(os.path.abspath(__file__))
+
+# Ruta por defecto del dataset
+RUTA_DATASET = os.path.join(DIRECTORIO_BASE, 'superstore_dataset2012.csv')
+
+# Ruta por defecto del dashboard guardado en modo interactivo
+RUTA_DASHBOARD = os.path.join(DIRECTORIO_BASE, 'dashboard_superstore_2012.png')
+
+# Destino de las figuras: None muestra cada figura con plt.show(); un directorio
+# activa el modo batch sin interfaz gráfica (backend Agg) y guarda cada figura allí.
+# 'cambios' son las claves modificadas del modo incremental (None si se procesó todo)
+CONFIG_SALIDA = {'directorio': None, 'cambios': None}
+
+# Caché de figuras renderizadas direccionada por contenido: la clave de cada figura es
+# un hash de las entradas que lee (ENTRADAS_FIGURAS), sus parámetros de dibujo y el código.
+# Con 'directorio' None está desactivada; al superar max_mb se expulsan figuras según
+# la política ('lru': menos usadas, 'fifo': más antiguas, 'tamano': más grandes)
+CONFIG_CACHE_FIGURAS = {'directorio': None, 'max_mb': 512, 'politica': 'lru'}
+
+# Huella de cada figura calculada al comprobar la caché antes de dibujarla, que
+# finalizar_figura usa para guardarla en la caché
+_HUELLAS_PENDIENTES = {}
+
+# Paneles sueltos del dashboard: tamaño en pulgadas de una celda de la rejilla 4x4 y resolución
+TAMANO_CELDA_PANELES = (5, 4)
+DPI_PANELES = 80
+
+# Orden de expulsión de cada política (se expulsa primero el menor)
+POLITICAS_CACHE_FIGURAS = {
+    'lru': lambda estado: estado.st_atime,
+    'fifo': lambda estado: estado.st_mtime,
+    'tamano': lambda estado: -estado.st_size,
+}
+
+# Presupuesto de puntos por gráfico de dispersión. Por debajo del presupuesto se
+# dibuja cada fila; por encima se aplica el modo elegido:
+#   'muestra'       -> muestra aleatoria simple de max_puntos filas
+#   'estratificado' -> muestra proporcional por la columna 'estrato'
+#   'hexbin'        -> densidad en celdas hexagonales
+#   'hist2d'        -> densidad en un histograma 2D rectangular
+CONFIG_DISPERSION = {
+    'max_puntos': 20_000,
+    'modo': 'muestra',
+    'estrato': 'Category',
+    'tamano_rejilla': 60,
+    'semilla': 42,
+}
+
+# Instrumentación por etapas: tiempo, filas, memoria y perfil opcional con cProfile
+CONFIG_INSTRUMENTACION = {'activa': False, 'directorio_perfiles': None}
+
+# Mediciones registradas por medir_etapa y pila de etapas en curso
+REGISTRO_ETAPAS = []
+_ETAPAS_ABIERTAS = []
+
+# Esquema explícito de las 24 columnas del dataset.
+# Las dimensiones de baja cardinalidad se leen como categóricas y los valores
+# numéricos con el tipo más pequeño que no pierde precisión en los agregados.
+ESQUEMA_COLUMNAS = {
+    'Row ID': 'int32',
+    'Order ID': str,
+    'Order Date': str,
+    'Ship Date': str,
+    'Ship Mode': 'category',
+    'Customer ID': str,
+    'Customer Name': str,
+    'Segment': 'category',
+    'City': str,
+    'State': str,
+    'Country': str,
+    'Postal Code': 'float32',
+    'Market': 'category',
+    'Region': 'category',
+    'Product ID': str,
+    'Category': 'category',
+    'Sub-Category': 'category',
+    'Product Name': str,
+    'Sales': 'float64',
+    'Quantity': 'int16',
+    'Discount': 'float32',
+    'Profit': 'float64',
+    'Shipping Cost': 'float64',
+    'Order Priority': 'category',
+}
+
+# Dimensiones con índice de filas por valor y columnas con índice ordenado para rangos
+DIMENSIONES_INDICE = ('Segment', 'Category', 'Sub-Category', 'Region', 'Market', 'Ship Mode', 'Order Priority')
+COLUMNAS_INDICE_RANGO = ('Order Date', 'Profit_Margin')
+
+# Índices registrados por DataFrame (id -> índice); se liberan junto con el DataFrame
+_INDICES_DATOS = {}
+
+# Columnas que usan las gráficas, agregados, índice y cubo (modo compacto: el resto se descarta)
+COLUMNAS_GRAFICAS = ['Order Date', 'Year', 'Month', 'Quarter', 'Market', 'Region', 'Segment', 'Category',
+                     'Sub-Category', 'Ship Mode', 'Order Priority', 'Sales', 'Quantity', 'Discount',
+                     'Profit', 'Shipping Cost', 'Profit_Margin']
+
+# Tipos enteros pequeños de las columnas derivadas de fecha en modo compacto
+TIPOS_COMPACTOS = {'Year': 'int16', 'Month': 'int8', 'Quarter': 'int8'}
+
+# Columnas de fecha y su formato fijo (día/mes/año)
+COLUMNAS_FECHA = ['Order Date', 'Ship Date']
+FORMATO_FECHA = '%d/%m/%Y'
+
+# Agregados que consumen las gráficas, identificados por (medida, dimensiones, agregación).
+# 'conteo' cuenta filas por dimensión; la agregación ('hist', bins) es un histograma y
+# ('resumen',) o ('resumen', mínimo, máximo) el resumen de boxplot/violín por grupo.
+AGREGADOS_GRAFICAS = [
+    ('conteo', ('Category',), 'count'),
+    ('conteo', ('Segment',), 'count'),
+    ('Sales', ('Order Date',), 'sum'),
+    ('Sales', ('Order Date', 'Market'), 'sum'),
+    ('Sales', ('Order Date', 'Category'), 'sum'),
+    ('Sales', ('Category', 'Segment'), 'mean'),
+    ('Profit', ('Ship Mode',), 'mean'),
+    ('Sales', ('Sub-Category',), 'sum'),
+    (('Sales', 'Profit', 'Quantity'), ('Region',), 'sum'),
+    ('Sales', (), ('hist', 50)),
+    ('Sales', (), ('hist', 30)),
+    ('Profit', (), ('hist', 50)),
+    ('Discount', (), ('hist', 30)),
+    ('Discount', (), ('resumen',)),
+    ('Sales', ('Category',), ('resumen',)),
+    ('Profit', ('Segment',), ('resumen',)),
+    ('Sales', ('Order Priority',), ('resumen',)),
+    ('Profit_Margin', ('Region',), ('resumen', -100, 100)),
+]
+
+# Resolución de los bocetos de distribución (histograma fino mergeable) y de la KDE
+BINS_BOCETO = 2048
+PUNTOS_KDE = 200
+MAX_ATIPICOS = 2000
+
+# Variables numéricas de las matrices de correlación
+COLUMNAS_CORRELACION = ('Sales', 'Quantity', 'Discount', 'Profit', 'Shipping Cost', 'Profit_Margin')
+
+# Matrices de correlación que se acumulan junto a los agregados: la del total y una por Market
+AGREGADOS_CORRELACION = [
+    (COLUMNAS_CORRELACION, (), 'corr'),
+    (COLUMNAS_CORRELACION, ('Market',), 'corr'),
+]
+
+# Cubo OLAP: dimensiones de las celdas y medidas con suma, conteo, suma de cuadrados, mínimo y máximo
+DIMENSIONES_CUBO = ('Year', 'Quarter', 'Month', 'Market', 'Region', 'Category', 'Sub-Category',
+                    'Segment', 'Ship Mode', 'Order Priority')
+MEDIDAS_CUBO = ('Sales', 'Profit', 'Quantity', 'Shipping Cost')
+
+# Contadores de la caché de agregados compartida entre gráficas
+CONTADORES_AGREGADOS = {'aciertos': 0, 'calculos': 0}
+
+# Agregados que el modo incremental persiste y combina con las filas nuevas
+# (los histogramas y resúmenes dependen del rango de los datos y se recalculan)
+AGREGADOS_INCREMENTALES = [clave for clave in AGREGADOS_GRAFICAS
+                           if clave[2] in ('count', 'sum', 'mean')] + AGREGADOS_CORRELACION
+
+# Parámetros por defecto del modo streaming
+TAMANO_BLOQUE = 100_000
+TAMANO_MUESTRA = 50_000
+
+# Exportación columnar: extensión por formato, compresión y filas por grupo de filas
+# (cada grupo guarda estadísticas mínimo/máximo por columna para filtrar sin leerlo).
+# Arrow IPC se escribe sin comprimir para poder leerlo con memory mapping sin copias;
+# la compresión queda para Parquet
+FORMATOS_EXPORTACION = {'parquet': '.parquet', 'arrow': '.arrow'}
+COMPRESION_EXPORTACION = {'parquet': 'zstd', 'arrow': 'uncompressed'}
+FILAS_POR_GRUPO_EXPORTACION = 100_000
+
+# Extractos CSV leídos a la vez al cargar un directorio o patrón glob
+MAX_HILOS_LECTURA = 8
+
+# Tamaño objetivo en bytes de cada partición del modo paralelo y particiones por proceso
+# (más particiones que procesos reparten mejor la carga si los archivos son desiguales)
+TAMANO_PARTICION = 32 << 20
+PARTICIONES_POR_PROCESO = 4
+
+# Motor de consultas embebido: hilos (None = todos los núcleos), memoria máxima
+# (p. ej. '4GB') y directorio donde derramar a disco cuando no cabe en memoria
+CONFIG_MOTOR = {'hilos': None, 'memoria_max': None, 'directorio_temporal': None}
+
+# Tipos DuckDB equivalentes al esquema de pandas
+TIPOS_DUCKDB = {'int32': 'INTEGER', 'int16': 'SMALLINT', 'float32': 'FLOAT', 'float64': 'DOUBLE',
+                'category': 'VARCHAR', str: 'VARCHAR'}
+
+def importar_seaborn():
+    """
+    Importa seaborn la primera vez que una gráfica lo necesita
+    
+    Returns:
+        module: El módulo seaborn (también disponible como sns en este módulo)
+    """
+    global sns
+    if sns is None:
+        import seaborn
+        sns = seaborn
+    return sns
+
+def _rss_pico_mb():
+    """
+    Pico de memoria residente del proceso en MB (None si el sistema no lo expone)
+    """
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    factor = 1 if os.uname().sysname == 'Darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * factor / 2**20
+
+@contextmanager
+def medir_etapa(nombre, df=None):
+    """
+    Mide una etapa del análisis si la instrumentación está activa
+    
+    Registra tiempo de reloj, filas procesadas, pico de tracemalloc respecto al inicio,
+    pico de memoria residente y huella en memoria del DataFrame. Las etapas se pueden
+    anidar (por ejemplo, cada subgráfico del dashboard dentro del dashboard); el perfil
+    de cProfile solo se toma en las etapas de primer nivel.
+    
+    Args:
+        nombre (str): Nombre de la etapa
+        df (pd.DataFrame, optional): Datos que procesa la etapa; también se puede
+            asignar al finalizar con registro['df'] = df
+    
+    Yields:
+        dict: Registro de la etapa
+    """
+    if not CONFIG_INSTRUMENTACION['activa']:
+        yield {}
+        return
+    
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if _ETAPAS_ABIERTAS:
+        # El pico acumulado hasta ahora pertenece a la etapa padre
+        padre = _ETAPAS_ABIERTAS[-1]
+        padre['_pico'] = max(padre['_pico'], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    
+    registro = {'etapa': nombre, 'nivel': len(_ETAPAS_ABIERTAS), 'df': df,
+                '_memoria_inicial': tracemalloc.get_traced_memory()[0], '_pico': 0}
+    perfil = None
+    if CONFIG_INSTRUMENTACION['directorio_perfiles'] and not _ETAPAS_ABIERTAS:
+        perfil = cProfile.Profile()
+        perfil.enable()
+    _ETAPAS_ABIERTAS.append(registro)
+    rss_inicial = _rss_pico_mb()
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        registro['segundos'] = round(time.perf_counter() - inicio, 4)
+        _ETAPAS_ABIERTAS.pop()
+        if perfil is not None:
+            perfil.disable()
+            os.makedirs(CONFIG_INSTRUMENTACION['directorio_perfiles'], exist_ok=True)
+            nombre_archivo = nombre.replace('/', '__') + '.prof'
+            perfil.dump_stats(os.path.join(CONFIG_INSTRUMENTACION['directorio_perfiles'], nombre_archivo))
+        
+        pico = max(registro.pop('_pico'), tracemalloc.get_traced_memory()[1])
+        if _ETAPAS_ABIERTAS:
+            _ETAPAS_ABIERTAS[-1]['_pico'] = max(_ETAPAS_ABIERTAS[-1]['_pico'], pico)
+        registro['pico_tracemalloc_mb'] = round((pico - registro.pop('_memoria_inicial')) / 2**20, 2)
+        rss_final = _rss_pico_mb()
+        registro['rss_pico_mb'] = None if rss_final is None else round(rss_final, 1)
+        registro['rss_incremento_mb'] = None if rss_final is None else round(rss_final - rss_inicial, 1)
+        
+        datos = registro.pop('df')
+        registro['filas'] = None if datos is None else len(datos)
+        registro['memoria_df_mb'] = None if datos is None else round(
+            datos.memory_usage(deep=True).sum() / 2**20, 2)
+        REGISTRO_ETAPAS.append(registro)
+
+def informe_instrumentacion(ruta_json=None):
+    """
+    Imprime la tabla resumen de las etapas medidas y opcionalmente la guarda en JSON
+    
+    Args:
+        ruta_json (str, optional): Ruta del informe JSON
+    
+    Returns:
+        list: Registros de las etapas en orden de ejecución
+    """
+    print("\n⏱️ INFORME DE INSTRUMENTACIÓN POR ETAPAS")
+    print("=" * 110)
+    print(f"{'Etapa':<55} {'Tiempo (s)':>10} {'Filas':>10} {'Pico TM (MB)':>13} {'RSS (MB)':>10} {'DF (MB)':>8}")
+    print("-" * 110)
+    for registro in REGISTRO_ETAPAS:
+        nombre = '  ' * registro['nivel'] + registro['etapa']
+        filas = '-' if registro['filas'] is None else registro['filas']
+        rss = '-' if registro['rss_pico_mb'] is None else registro['rss_pico_mb']
+        memoria_df = '-' if registro['memoria_df_mb'] is None else registro['memoria_df_mb']
+        print(f"{nombre:<55} {registro['segundos']:>10.3f} {filas:>10} "
+              f"{registro['pico_tracemalloc_mb']:>13} {rss:>10} {memoria_df:>8}")
+    
+    if ruta_json is not None:
+        with open(ruta_json, 'w', encoding='utf-8') as archivo:
+            json.dump(REGISTRO_ETAPAS, archivo, indent=2, ensure_ascii=False)
+        print(f"\n💾 Informe de instrumentación guardado en: {ruta_json}")
+    return REGISTRO_ETAPAS
+
+def leer_csv_tipado(ruta_dataset, **kwargs):
+    """
+    Lee el CSV aplicando el esquema explícito y convierte las fechas con formato fijo
+    
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV
+        **kwargs: Argumentos adicionales para pd.read_csv
+    
+    Returns:
+        pd.DataFrame: Dataset con tipos aplicados
+    """
+    df = pd.read_csv(ruta_dataset, encoding='utf-8', dtype=ESQUEMA_COLUMNAS, **kwargs)
+    return convertir_fechas(df)
+
+def convertir_fechas(df):
+    """
+    Convierte las columnas de fecha presentes usando el formato fijo día/mes/año
+    
+    Args:
+        df (pd.DataFrame): Dataset o bloque leído del CSV
+    
+    Returns:
+        pd.DataFrame: El mismo dataset con las fechas convertidas
+    """
+    for columna in COLUMNAS_FECHA:
+        if columna in df.columns:
+            df[columna] = pd.to_datetime(df[columna], format=FORMATO_FECHA, errors='coerce')
+    return df
+
+def preparar_columnas_derivadas(df):
+    """
+    Crea las columnas derivadas Year, Month, Quarter y Profit_Margin
+    
+    Args:
+        df (pd.DataFrame): Dataset con fechas ya convertidas
+    
+    Returns:
+        pd.DataFrame: El mismo dataset con las columnas añadidas
+    """
+    df['Year'] = df['Order Date'].dt.year
+    df['Month'] = df['Order Date'].dt.month
+    df['Quarter'] = df['Order Date'].dt.quarter
+    df['Profit_Margin'] = (df['Profit'] / df['Sales']) * 100
+    
+    # Limpiar valores infinitos y NaN en Profit_Margin
+    df['Profit_Margin'] = df['Profit_Margin'].replace([np.inf, -np.inf], np.nan)
+    df['Profit_Margin'] = df['Profit_Margin'].fillna(0)
+    return df
+
+def _rutas_cache(ruta_dataset):
+    """
+    Devuelve las rutas del archivo de caché y de sus metadatos junto al CSV
+    """
+    extension = 'parquet' if PYARROW_DISPONIBLE else 'pkl'
+    return f"{ruta_dataset}.cache.{extension}", f"{ruta_dataset}.cache.json"
+
+def _hash_archivo(ruta, tamano_bloque=1 << 20):
+    """
+    Calcula el hash SHA-256 de un archivo leyéndolo por bloques
+    """
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+def _cache_vigente(ruta_dataset):
+    """
+    Indica si la caché binaria corresponde al contenido actual del CSV
+    
+    La caché se considera válida si coinciden la fecha de modificación y el tamaño
+    del CSV. Si solo cambió la fecha de modificación se compara el hash del contenido.
+    """
+    ruta_cache, ruta_meta = _rutas_cache(ruta_dataset)
+    if not (os.path.exists(ruta_cache) and os.path.exists(ruta_meta)):
+        return False
+    
+    with open(ruta_meta, encoding='utf-8') as archivo:
+        meta = json.load(archivo)
+    estado = os.stat(ruta_dataset)
+    if estado.st_size != meta['size']:
+        return False
+    if estado.st_mtime_ns != meta['mtime_ns']:
+        if _hash_archivo(ruta_dataset) != meta['sha256']:
+            return False
+        # Mismo contenido con otra fecha: se actualizan los metadatos
+        meta['mtime_ns'] = estado.st_mtime_ns
+        with open(ruta_meta, 'w', encoding='utf-8') as archivo:
+            json.dump(meta, archivo)
+    return True
+
+def leer_cache_datos(ruta_dataset):
+    """
+    Recupera el dataset preparado desde la caché binaria si el CSV no ha cambiado
+    
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV original
+    
+    Returns:
+        pd.DataFrame | None: Dataset preparado o None si la caché no es válida
+    """
+    try:
+        if not _cache_vigente(ruta_dataset):
+            return None
+        df = _leer_archivo_cache(_rutas_cache(ruta_dataset)[0])
+        cargar_indice(df, ruta_dataset)
+        return df
+    except Exception as e:
+        print(f"⚠️ Caché no utilizable, se leerá el CSV: {str(e)}")
+        return None
+
+def _leer_archivo_cache(ruta_cache):
+    """
+    Lee el archivo de caché en el formato disponible (Parquet o pickle)
+    """
+    if PYARROW_DISPONIBLE:
+        return pd.read_parquet(ruta_cache)
+    return pd.read_pickle(ruta_cache)
+
+def guardar_cache_datos(df, ruta_dataset):
+    """
+    Guarda el dataset preparado en la caché binaria junto al CSV
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+        ruta_dataset (str): Ruta del archivo CSV original
+    """
+    ruta_cache, ruta_meta = _rutas_cache(ruta_dataset)
+    try:
+        if PYARROW_DISPONIBLE:
+            df.to_parquet(ruta_cache, index=False)
+        else:
+            df.to_pickle(ruta_cache)
+        estado = os.stat(ruta_dataset)
+        meta = {
+            'mtime_ns': estado.st_mtime_ns,
+            'size': estado.st_size,
+            'sha256': _hash_archivo(ruta_dataset),
+        }
+        with open(ruta_meta, 'w', encoding='utf-8') as archivo:
+            json.dump(meta, archivo)
+        guardar_indice(df, ruta_dataset)
+        print(f"💾 Caché de datos guardada en: {ruta_cache}")
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar la caché de datos: {str(e)}")
+
+def construir_indice(df):
+    """
+    Construye el índice de filas de las dimensiones y de las columnas de rango
+    
+    Para cada dimensión categórica se guardan las posiciones de las filas ordenadas
+    por código (orden estable, así que dentro de cada valor siguen en orden original)
+    y el desplazamiento donde empieza cada valor; para las columnas de rango, las
+    posiciones ordenadas por valor y los valores ordenados. Filtrar o agrupar consiste
+    entonces en recortar esos arrays en lugar de recorrer todas las filas.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+    
+    Returns:
+        dict: Índice con filas, dimensiones y rangos
+    """
+    indice = {'filas': len(df), 'dimensiones': {}, 'rangos': {}}
+    for columna in DIMENSIONES_INDICE:
+        if columna not in df.columns or not isinstance(df[columna].dtype, pd.CategoricalDtype):
+            continue
+        codigos = df[columna].cat.codes.to_numpy()
+        orden = np.argsort(codigos, kind='stable').astype(np.int32)
+        indice['dimensiones'][columna] = {
+            'categorias': list(df[columna].cat.categories),
+            'orden': orden,
+            'limites': np.searchsorted(codigos[orden], np.arange(len(df[columna].cat.categories) + 1)),
+        }
+    for columna in COLUMNAS_INDICE_RANGO:
+        if columna not in df.columns:
+            continue
+        valores = df[columna].to_numpy()
+        orden = np.argsort(valores, kind='stable').astype(np.int32)
+        # Los nulos quedan al final del orden y no cumplen ningún rango: no se indexan
+        orden = orden[~pd.isna(valores[orden])]
+        indice['rangos'][columna] = {'orden': orden, 'valores': valores[orden]}
+    return indice
+
+def registrar_indice(df, indice):
+    """
+    Asocia un índice a un DataFrame concreto; se libera cuando el DataFrame deja de existir
+    """
+    _INDICES_DATOS[id(df)] = indice
+    weakref.finalize(df, _INDICES_DATOS.pop, id(df), None)
+
+def obtener_indice(df):
+    """
+    Índice registrado para este DataFrame, o None si no tiene (p. ej. una muestra)
+    """
+    indice = _INDICES_DATOS.get(id(df))
+    return indice if indice is not None and indice['filas'] == len(df) else None
+
+def _ruta_indice(ruta_dataset):
+    """
+    Ruta del índice persistido junto a la caché del dataset
+    """
+    return f"{ruta_dataset}.cache.indice.pkl"
+
+def guardar_indice(df, ruta_dataset):
+    """
+    Construye, registra y persiste el índice del dataset junto a su caché
+    """
+    indice = construir_indice(df)
+    indice['firma_cache'] = os.stat(_rutas_cache(ruta_dataset)[0]).st_mtime_ns
+    pd.to_pickle(indice, _ruta_indice(ruta_dataset))
+    registrar_indice(df, indice)
+
+def cargar_indice(df, ruta_dataset):
+    """
+    Registra para df el índice persistido, o lo reconstruye si falta o es de otra caché
+    """
+    ruta_indice = _ruta_indice(ruta_dataset)
+    if os.path.exists(ruta_indice):
+        indice = pd.read_pickle(ruta_indice)
+        if (indice['filas'] == len(df)
+                and indice.get('firma_cache') == os.stat(_rutas_cache(ruta_dataset)[0]).st_mtime_ns):
+            registrar_indice(df, indice)
+            return
+    guardar_indice(df, ruta_dataset)
+
+def _seleccion_indice(indice, columna, condicion):
+    """
+    Posiciones (sin ordenar) que cumplen una condición resuelta solo con el índice
+    
+    La condición es un valor o lista de valores para una dimensión y una tupla
+    (mínimo, máximo) inclusiva, con None como extremo abierto, para una columna de rango.
+    """
+    if columna in indice['dimensiones']:
+        dimension = indice['dimensiones'][columna]
+        valores = condicion if isinstance(condicion, (list, tuple, set)) else [condicion]
+        trozos = []
+        for valor in valores:
+            if valor in dimension['categorias']:
+                codigo = dimension['categorias'].index(valor)
+                trozos.append(dimension['orden'][dimension['limites'][codigo]:dimension['limites'][codigo + 1]])
+        return np.concatenate(trozos) if trozos else np.empty(0, dtype=np.int32)
+    
+    rango = indice['rangos'][columna]
+    minimo, maximo = condicion
+    inicio = 0 if minimo is None else np.searchsorted(rango['valores'], _valor_comparable(rango, minimo), 'left')
+    fin = len(rango['valores']) if maximo is None else np.searchsorted(
+        rango['valores'], _valor_comparable(rango, maximo), 'right')
+    return rango['orden'][inicio:fin]
+
+def _valor_comparable(rango, valor):
+    """
+    Convierte un extremo de rango al tipo de los valores indexados (fechas o números)
+    """
+    if rango['valores'].dtype.kind == 'M':
+        return np.datetime64(pd.Timestamp(valor))
+    return valor
+
+def _tamano_seleccion(indice, columna, condicion):
+    """
+    Número de filas que devolvería _seleccion_indice, sin materializarlas
+    """
+    if columna in indice['dimensiones']:
+        dimension = indice['dimensiones'][columna]
+        valores = condicion if isinstance(condicion, (list, tuple, set)) else [condicion]
+        codigos = [dimension['categorias'].index(v) for v in valores if v in dimension['categorias']]
+        return sum(int(dimension['limites'][c + 1] - dimension['limites'][c]) for c in codigos)
+    return len(_seleccion_indice(indice, columna, condicion))
+
+def _cumple_condicion(df, columna, filas, condicion):
+    """
+    Máscara de la condición evaluada solo sobre las filas candidatas
+    """
+    if isinstance(df[columna].dtype, pd.CategoricalDtype):
+        # Se comparan códigos para no materializar los valores de la categórica
+        categorias = list(df[columna].cat.categories)
+        seleccion = condicion if isinstance(condicion, (list, tuple, set)) else [condicion]
+        codigos = [categorias.index(v) for v in seleccion if v in categorias]
+        return np.isin(df[columna].cat.codes.to_numpy()[filas], codigos)
+    valores = df[columna].to_numpy()[filas]
+    minimo, maximo = condicion
+    mascara = ~pd.isna(valores)
+    if minimo is not None:
+        mascara &= valores >= (np.datetime64(pd.Timestamp(minimo)) if valores.dtype.kind == 'M' else minimo)
+    if maximo is not None:
+        mascara &= valores <= (np.datetime64(pd.Timestamp(maximo)) if valores.dtype.kind == 'M' else maximo)
+    return mascara
+
+def filas_filtradas(df, filtros):
+    """
+    Posiciones ordenadas de las filas que cumplen todos los filtros
+    
+    Con índice se parte de la condición indexada más selectiva y el resto de
+    condiciones se evalúan solo sobre esas filas; sin índice se usa una máscara
+    booleana sobre todo el DataFrame.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+        filtros (dict): {columna: valor, lista de valores o (mínimo, máximo)}
+    
+    Returns:
+        np.ndarray: Posiciones de las filas en orden ascendente
+    """
+    indice = obtener_indice(df)
+    indexados = [] if indice is None else [
+        c for c in filtros if c in indice['dimensiones'] or c in indice['rangos']]
+    if not indexados:
+        filas = np.arange(len(df))
+        pendientes = list(filtros)
+    else:
+        mas_selectivo = min(indexados, key=lambda c: _tamano_seleccion(indice, c, filtros[c]))
+        filas = np.sort(_seleccion_indice(indice, mas_selectivo, filtros[mas_selectivo]))
+        pendientes = [c for c in filtros if c != mas_selectivo]
+    for columna in pendientes:
+        filas = filas[_cumple_condicion(df, columna, filas, filtros[columna])]
+    return filas
+
+def filtrar_indexado(df, filtros):
+    """
+    Filas de df que cumplen los filtros, tocando solo las filas seleccionadas si hay índice
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+        filtros (dict): {columna: valor, lista de valores o (mínimo, máximo)}
+    
+    Returns:
+        pd.DataFrame: Subconjunto de filas (sin índice propio)
+    """
+    return df.iloc[filas_filtradas(df, filtros)]
+
+def grupos_indexados(df, dimension, filas=None):
+    """
+    Posiciones de las filas de cada valor de una dimensión (solo valores con filas)
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+        dimension (str): Columna categórica de agrupación
+        filas (np.ndarray, optional): Posiciones ordenadas a las que limitar los grupos
+    
+    Returns:
+        list: Pares (valor, posiciones ordenadas)
+    """
+    indice = obtener_indice(df)
+    if indice is not None and dimension in indice['dimensiones'] and filas is None:
+        entrada = indice['dimensiones'][dimension]
+        orden, limites, categorias = entrada['orden'], entrada['limites'], entrada['categorias']
+    else:
+        filas = np.arange(len(df)) if filas is None else filas
+        codigos = df[dimension].cat.codes.to_numpy()[filas]
+        posiciones = np.argsort(codigos, kind='stable')
+        orden = filas[posiciones]
+        categorias = list(df[dimension].cat.categories)
+        limites = np.searchsorted(codigos[posiciones], np.arange(len(categorias) + 1))
+    return [(categoria, orden[limites[codigo]:limites[codigo + 1]])
+            for codigo, categoria in enumerate(categorias) if limites[codigo + 1] > limites[codigo]]
+
+def compactar_datos(df, conservar=()):
+    """
+    Reduce la huella en memoria del dataset preparado
+    
+    Descarta las columnas que no usa ninguna gráfica, convierte a categóricas las
+    columnas de texto con valores repetidos y guarda Year, Month y Quarter como
+    enteros pequeños. El índice de filas registrado se traslada al nuevo DataFrame
+    porque las filas no cambian.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+        conservar (iterable): Columnas adicionales a mantener aunque no las use ninguna gráfica
+    
+    Returns:
+        pd.DataFrame: Dataset compacto
+    """
+    antes = df.memory_usage(deep=True).sum()
+    columnas = [c for c in df.columns if c in COLUMNAS_GRAFICAS or c in conservar]
+    compacto = df[columnas].copy()
+    
+    for columna in compacto.columns:
+        serie = compacto[columna]
+        if columna in TIPOS_COMPACTOS:
+            # Con fechas nulas se usa el entero anulable para no volver a float64
+            tipo = TIPOS_COMPACTOS[columna]
+            compacto[columna] = serie.astype(tipo.capitalize() if serie.hasnans else tipo)
+        elif isinstance(serie.dtype, pd.CategoricalDtype):
+            compacto[columna] = serie.cat.remove_unused_categories()
+        elif (pd.api.types.is_string_dtype(serie) or serie.dtype == object) \
+                and serie.nunique() <= len(serie) // 2:
+            compacto[columna] = serie.astype('category')
+    
+    indice = obtener_indice(df)
+    if indice is not None:
+        registrar_indice(compacto, indice)
+    
+    despues = compacto.memory_usage(deep=True).sum()
+    print(f"🗜️ Modo compacto: {antes / 2**20:.1f} MB → {despues / 2**20:.1f} MB "
+          f"({len(df.columns) - len(columnas)} columnas descartadas)")
+    return compacto
+
+def validar_esquema(archivo):
+    """
+    Comprueba que la cabecera de un extracto tiene exactamente las columnas del esquema
+    
+    Args:
+        archivo (str): Ruta del extracto CSV
+    
+    Raises:
+        ValueError: Si faltan columnas del esquema o sobran columnas desconocidas
+    """
+    columnas = set(pd.read_csv(archivo, encoding='utf-8', nrows=0).columns)
+    faltan = [c for c in ESQUEMA_COLUMNAS if c not in columnas]
+    sobran = sorted(columnas - set(ESQUEMA_COLUMNAS))
+    if faltan or sobran:
+        raise ValueError(f"{archivo} no cumple el esquema (faltan: {faltan or '-'}; sobran: {sobran or '-'})")
+
+def _leer_extracto(archivo):
+    """
+    Valida y lee un extracto con el esquema de tipos (se ejecuta en un hilo del pool)
+    """
+    validar_esquema(archivo)
+    try:
+        return leer_csv_tipado(archivo)
+    except ValueError as e:
+        raise ValueError(f"{archivo}: {e}") from e
+
+def cargar_extractos(ruta_dataset, hilos=None):
+    """
+    Lee en paralelo los extractos CSV de un directorio o patrón glob y los concatena
+    
+    Pensado para exportaciones con un CSV por mercado y año con el esquema de
+    superstore_dataset2012.csv. El parseo de pandas libera el GIL, así que un pool de
+    hilos acotado solapa la lectura de disco y el parseo de varios archivos. Cada
+    extracto se valida contra ESQUEMA_COLUMNAS antes de leerlo y las categorías se
+    unifican antes de concatenar para que las columnas sigan siendo categóricas.
+    
+    Args:
+        ruta_dataset (str): Directorio o patrón glob de los extractos
+        hilos (int, optional): Extractos leídos a la vez (MAX_HILOS_LECTURA por defecto)
+    
+    Returns:
+        pd.DataFrame: Filas de todos los extractos, en el orden de los archivos
+    
+    Raises:
+        FileNotFoundError: Si no hay ningún extracto
+        ValueError: Si algún extracto no cumple el esquema o no se puede parsear
+    """
+    archivos = _archivos_entrada(ruta_dataset)
+    hilos = min(hilos or MAX_HILOS_LECTURA, len(archivos))
+    print(f"📂 Leyendo {len(archivos)} extractos con {hilos} hilos...")
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        extractos = list(pool.map(_leer_extracto, archivos))
+    return concatenar_preservando_categorias(extractos)
+
+def cargar_y_preparar_datos(ruta_dataset=RUTA_DATASET, usar_cache=True, compacto=False,
+                            conservar_columnas=()):
+    """
+    Carga y prepara el dataset superstore_dataset2012.csv
+    
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV, o directorio o patrón glob de extractos
+            con el mismo esquema (se leen en paralelo con cargar_extractos, sin caché)
+        usar_cache (bool): Reutilizar la caché binaria si el CSV no ha cambiado
+        compacto (bool): Reducir la memoria del dataset preparado (ver compactar_datos)
+        conservar_columnas (iterable): Columnas sin uso en gráficas a mantener en modo compacto
+    
+    Returns:
+        pd.DataFrame: Dataset preparado y limpio
+    """
+    try:
+        # La caché binaria se asocia a un único CSV: los extractos múltiples no la usan
+        usar_cache = usar_cache and not es_entrada_multiple(ruta_dataset)
+        df = leer_cache_datos(ruta_dataset) if usar_cache else None
+        
+        if df is not None:
+            print("⚡ Dataset cargado desde caché binaria")
+        elif es_entrada_multiple(ruta_dataset):
+            df = cargar_extractos(ruta_dataset)
+        else:
+            print("📊 Cargando dataset superstore_dataset2012.csv...")
+            df = leer_csv_tipado(ruta_dataset)
+        
+        print(f"✅ Dataset cargado exitosamente: {df.shape[0]} filas, {df.shape[1]} columnas")
+        
+        # Exploración inicial
+        print("\n🔍 EXPLORACIÓN INICIAL DEL DATASET")
+        print("=" * 50)
+        print(f"Forma del dataset: {df.shape}")
+        print(f"\nColumnas: {list(df.columns)}")
+        print(f"\nTipos de datos:")
+        print(df.dtypes)
+        print(f"\nValores nulos por columna:")
+        print(df.isnull().sum())
+        
+        if 'Profit_Margin' not in df.columns:
+            # Crear columnas adicionales para análisis
+            print("\n🔧 Preparando datos...")
+            preparar_columnas_derivadas(df)
+            if usar_cache:
+                guardar_cache_datos(df, ruta_dataset)
+        
+        if compacto:
+            df = compactar_datos(df, conservar_columnas)
+        
+        print("✅ Datos preparados correctamente")
+        print(f"\nPrimeras 5 filas del dataset preparado:")
+        print(df.head())
+        
+        return df
+        
+    except FileNotFoundError:
+        print(f"❌ Error: No se pudo encontrar el archivo {ruta_dataset}")
+        return None
+    except Exception as e:
+        print(f"❌ Error al cargar el dataset: {str(e)}")
+        return None
+
+def _tipo_agregacion(agg):
+    """
+    Devuelve el nombre de la agregación ('hist', 'resumen', 'sum'...)
+    """
+    return agg[0] if isinstance(agg, tuple) else agg
+
+def bordes_boceto(minimo, maximo, bins=BINS_BOCETO):
+    """
+    Bordes equiespaciados del histograma fino que sirve de boceto de distribución
+    """
+    if minimo == maximo:
+        minimo, maximo = minimo - 0.5, maximo + 0.5
+    return np.linspace(minimo, maximo, bins + 1)
+
+def crear_boceto(valores, bordes):
+    """
+    Crea un boceto mergeable de una distribución: histograma fino y momentos
+    
+    Dos bocetos con los mismos bordes se combinan sumando sus campos, por lo que se
+    pueden calcular por bloques o por partición y unir después.
+    
+    Args:
+        valores (np.ndarray): Valores de la variable
+        bordes (np.ndarray): Bordes comunes del histograma fino
+    
+    Returns:
+        dict: Boceto con bordes, conteos, n, suma, suma_cuadrados, minimo y maximo
+    """
+    valores = valores[np.isfinite(valores)]
+    return {
+        'bordes': bordes,
+        'conteos': np.histogram(valores, bins=bordes)[0],
+        'n': len(valores),
+        'suma': float(valores.sum()),
+        'suma_cuadrados': float(np.square(valores).sum()),
+        'minimo': float(valores.min()) if len(valores) else np.inf,
+        'maximo': float(valores.max()) if len(valores) else -np.inf,
+    }
+
+def combinar_bocetos(boceto_a, boceto_b):
+    """
+    Une dos bocetos calculados con los mismos bordes
+    """
+    if boceto_a is None:
+        return boceto_b
+    return {
+        'bordes': boceto_a['bordes'],
+        'conteos': boceto_a['conteos'] + boceto_b['conteos'],
+        'n': boceto_a['n'] + boceto_b['n'],
+        'suma': boceto_a['suma'] + boceto_b['suma'],
+        'suma_cuadrados': boceto_a['suma_cuadrados'] + boceto_b['suma_cuadrados'],
+        'minimo': min(boceto_a['minimo'], boceto_b['minimo']),
+        'maximo': max(boceto_a['maximo'], boceto_b['maximo']),
+    }
+
+def _kde_desde_boceto(boceto, corte=2):
+    """
+    KDE gaussiana sobre una rejilla fija evaluada a partir del histograma fino
+    
+    El coste depende de BINS_BOCETO x PUNTOS_KDE y no del número de filas. El ancho
+    de banda sigue la regla de Scott, igual que seaborn.
+    """
+    n = boceto['n']
+    media = boceto['suma'] / n
+    desviacion = np.sqrt(max(boceto['suma_cuadrados'] / n - media ** 2, 0.0))
+    ancho_banda = max(desviacion * n ** (-1 / 5), np.diff(boceto['bordes'][:2])[0])
+    
+    rejilla = np.linspace(boceto['minimo'] - corte * ancho_banda,
+                          boceto['maximo'] + corte * ancho_banda, PUNTOS_KDE)
+    centros = (boceto['bordes'][:-1] + boceto['bordes'][1:]) / 2
+    ocupados = boceto['conteos'] > 0
+    distancias = (rejilla[:, None] - centros[ocupados][None, :]) / ancho_banda
+    densidad = np.exp(-0.5 * distancias ** 2) @ boceto['conteos'][ocupados]
+    densidad /= n * ancho_banda * np.sqrt(2 * np.pi)
+    return rejilla, densidad
+
+def _cuantiles_desde_boceto(boceto, probabilidades):
+    """
+    Cuantiles aproximados interpolando la distribución acumulada del histograma fino
+    """
+    acumulado = np.concatenate([[0], np.cumsum(boceto['conteos'])]) / boceto['n']
+    cuantiles = np.interp(probabilidades, acumulado, boceto['bordes'])
+    return np.clip(cuantiles, boceto['minimo'], boceto['maximo'])
+
+def resumen_distribucion(boceto, valores=None, cuartiles=None):
+    """
+    Resume una distribución para boxplot y violín: cuartiles, bigotes, atípicos y KDE
+    
+    Con los valores originales los cuartiles, bigotes (1.5 IQR) y atípicos son exactos;
+    sin ellos (modo streaming) se aproximan desde el boceto con error acotado por el
+    ancho de su histograma fino.
+    
+    Args:
+        boceto (dict): Boceto de la distribución
+        valores (np.ndarray, optional): Valores originales
+        cuartiles (tuple, optional): q1, mediana y q3 exactos calculados por un motor de
+            consultas; en ese caso basta con que valores contenga los bigotes y los atípicos
+    
+    Returns:
+        dict: n, media, q1, mediana, q3, bigote_inf, bigote_sup, atipicos, minimo, maximo y kde
+    """
+    if cuartiles is not None:
+        q1, mediana, q3 = cuartiles
+        candidatos = valores
+    elif valores is not None:
+        valores = valores[np.isfinite(valores)]
+        q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+        candidatos = valores
+    else:
+        q1, mediana, q3 = _cuantiles_desde_boceto(boceto, [0.25, 0.5, 0.75])
+        centros = (boceto['bordes'][:-1] + boceto['bordes'][1:]) / 2
+        candidatos = np.clip(centros[boceto['conteos'] > 0], boceto['minimo'], boceto['maximo'])
+    
+    rango = q3 - q1
+    dentro = candidatos[(candidatos >= q1 - 1.5 * rango) & (candidatos <= q3 + 1.5 * rango)]
+    atipicos = np.unique(candidatos[(candidatos < q1 - 1.5 * rango) | (candidatos > q3 + 1.5 * rango)])
+    if len(atipicos) > MAX_ATIPICOS:
+        # Se conservan los extremos y una selección equiespaciada del resto
+        atipicos = atipicos[np.linspace(0, len(atipicos) - 1, MAX_ATIPICOS).astype(int)]
+    
+    return {
+        'n': boceto['n'],
+        'media': boceto['suma'] / boceto['n'],
+        'q1': q1,
+        'mediana': mediana,
+        'q3': q3,
+        'bigote_inf': dentro.min() if len(dentro) else q1,
+        'bigote_sup': dentro.max() if len(dentro) else q3,
+        'atipicos': atipicos,
+        'minimo': boceto['minimo'],
+        'maximo': boceto['maximo'],
+        'kde': _kde_desde_boceto(boceto),
+    }
+
+def _bordes_resumen(serie, agg):
+    """
+    Bordes del boceto de un resumen: el rango explícito de la agregación o el de la columna
+    """
+    if len(agg) == 3:
+        return bordes_boceto(agg[1], agg[2])
+    return bordes_boceto(serie.min(), serie.max())
+
+def calcular_resumenes(df, medida, dimensiones, agg):
+    """
+    Calcula los resúmenes de distribución de una medida, global o por grupo
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+        medida (str): Columna numérica
+        dimensiones (tuple): Columna de agrupación (vacía para un único resumen)
+        agg (tuple): ('resumen',) o ('resumen', mínimo, máximo) para filtrar el rango
+    
+    Returns:
+        dict: Resumen único o {grupo: resumen} ordenado por grupo
+    """
+    bordes = _bordes_resumen(df[medida], agg)
+    resumenes = {grupo: resumen_distribucion(crear_boceto(valores, bordes), valores)
+                 for grupo, valores in _valores_por_grupo(df, medida, dimensiones, agg)}
+    if not dimensiones:
+        return resumenes[None]
+    return dict(sorted(resumenes.items()))
+
+def _valores_por_grupo(df, medida, dimensiones, agg):
+    """
+    Valores de una medida por grupo (un único grupo None sin dimensiones)
+    
+    Con índice, el filtro de rango y la agrupación solo leen las filas seleccionadas;
+    sin él se usan una máscara booleana y groupby.
+    """
+    if obtener_indice(df) is not None:
+        valores = df[medida].to_numpy(dtype=float)
+        filas = filas_filtradas(df, {medida: agg[1:]}) if len(agg) == 3 else None
+        if not dimensiones:
+            return [(None, valores if filas is None else valores[filas])]
+        return [(grupo, valores[posiciones]) for grupo, posiciones in grupos_indexados(df, dimensiones[0], filas)]
+    
+    datos = df
+    if len(agg) == 3:
+        datos = df[(df[medida] >= agg[1]) & (df[medida] <= agg[2])]
+    if not dimensiones:
+        return [(None, datos[medida].to_numpy(dtype=float))]
+    return [(grupo, serie.to_numpy(dtype=float))
+            for grupo, serie in datos.groupby(dimensiones[0], observed=True)[medida]]
+
+def calcular_agregado(df, medida, dimensiones, agg):
+    """
+    Calcula un agregado de las gráficas sobre un DataFrame completo
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+        medida (str | tuple): Columna (o columnas) a agregar, o 'conteo'
+        dimensiones (tuple): Columnas de agrupación
+        agg (str | tuple): Función de agregación, ('hist', bins) o ('resumen', ...)
+    
+    Returns:
+        pd.Series | pd.DataFrame | tuple | dict: Resultado del agregado
+    """
+    if _tipo_agregacion(agg) == 'hist':
+        return np.histogram(df[medida].dropna(), bins=agg[1])
+    if _tipo_agregacion(agg) == 'resumen':
+        return calcular_resumenes(df, medida, dimensiones, agg)
+    if medida == 'conteo':
+        return df[dimensiones[0]].value_counts()
+    if agg == 'corr':
+        total, grupos = estadisticos_correlacion_por_grupo(df, medida, dimensiones[0] if dimensiones else None)
+        if not dimensiones:
+            return correlacion_desde_estadisticos(total)
+        return {grupo: correlacion_desde_estadisticos(est) for grupo, est in sorted(grupos.items())}
+    columnas = list(medida) if isinstance(medida, tuple) else medida
+    return df.groupby(list(dimensiones), observed=True)[columnas].agg(agg)
+
+def obtener_agregado(df, agregados, medida, dimensiones, agg):
+    """
+    Devuelve un agregado precalculado si existe; en caso contrario lo calcula sobre df
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict | None): Agregados precalculados por (medida, dimensiones, agg)
+        medida (str | tuple): Columna (o columnas) a agregar, o 'conteo'
+        dimensiones (tuple): Columnas de agrupación
+        agg (str | tuple): Función de agregación, 'corr' o ('hist', bins)
+    
+    Returns:
+        pd.Series | pd.DataFrame | tuple: Resultado del agregado
+    """
+    clave = (medida, dimensiones, agg)
+    return _memorizar(agregados, clave, lambda: calcular_agregado(df, medida, dimensiones, agg))
+
+def _memorizar(agregados, clave, calculo):
+    """
+    Devuelve agregados[clave] o lo calcula y lo guarda, actualizando los contadores
+    """
+    if agregados is not None and clave in agregados:
+        CONTADORES_AGREGADOS['aciertos'] += 1
+        return agregados[clave]
+    CONTADORES_AGREGADOS['calculos'] += 1
+    resultado = calculo()
+    if agregados is not None:
+        agregados[clave] = resultado
+    return resultado
+
+def obtener_serie_temporal(df, agregados, medida='Sales', frecuencia='mensual', dimension=None):
+    """
+    Serie temporal de una medida a partir de su agregado diario por 'Order Date'
+    
+    El agregado diario es mergeable (streaming, particiones, incremental y DuckDB lo
+    acumulan igual que el resto) y las frecuencias más gruesas se obtienen remuestreándolo
+    sobre su DatetimeIndex, sin volver a recorrer las filas.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict | None): Caché de agregados
+        medida (str): Columna a sumar
+        frecuencia (str): 'diaria', 'semanal', 'mensual' o 'trimestral'
+        dimension (str, optional): Columna por la que obtener una serie por grupo
+    
+    Returns:
+        pd.Series | pd.DataFrame: Serie indexada por Fecha (una columna por grupo con dimensión)
+    """
+    def calculo():
+        dimensiones = ('Order Date',) if dimension is None else ('Order Date', dimension)
+        diaria = obtener_agregado(df, agregados, medida, dimensiones, 'sum')
+        if dimension is not None:
+            diaria = diaria.unstack(dimension, fill_value=0)
+        return series.remuestrear(diaria, frecuencia)
+    return _memorizar(agregados, (medida, ('Fecha', dimension), frecuencia), calculo)
+
+def obtener_ventas_mensuales(df, agregados):
+    """
+    Devuelve las ventas mensuales con su columna Fecha, calculadas una sola vez
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict | None): Caché de agregados
+    
+    Returns:
+        pd.DataFrame: Columnas Year, Month, Sales y Fecha
+    """
+    def calculo():
+        ventas_mensuales = obtener_serie_temporal(df, agregados, 'Sales', 'mensual').reset_index()
+        ventas_mensuales['Year'] = ventas_mensuales['Fecha'].dt.year
+        ventas_mensuales['Month'] = ventas_mensuales['Fecha'].dt.month
+        return ventas_mensuales[['Year', 'Month', 'Sales', 'Fecha']]
+    return _memorizar(agregados, ('Sales', ('Fecha',), 'sum'), calculo)
+
+def construir_agregados(df, agregados=None):
+    """
+    Construye la caché de agregados compartida por todas las gráficas
+    
+    Se calcula una vez tras la carga cada agregado que usan las gráficas, de modo que
+    las funciones de visualización los reutilizan en lugar de volver a recorrer el dataset.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Agregados ya acumulados (modo streaming)
+    
+    Returns:
+        dict: Caché de agregados por (medida, dimensiones, agg)
+    """
+    agregados = {} if agregados is None else agregados
+    for medida, dimensiones, agg in AGREGADOS_GRAFICAS + AGREGADOS_CORRELACION:
+        obtener_agregado(df, agregados, medida, dimensiones, agg)
+    obtener_ventas_mensuales(df, agregados)
+    return agregados
+
+def _sumar_parcial(acumulado, parcial):
+    """
+    Suma un resultado parcial de un bloque al acumulado alineando índices
+    """
+    if acumulado is None:
+        return parcial
+    if isinstance(parcial, np.ndarray):
+        return acumulado + parcial
+    # pandas devuelve la suma de un bloque pequeño en el tipo original (int16) si cabe:
+    # se amplía a int64 antes de acumular para que el total no desborde
+    acumulado, parcial = (_ampliar_enteros(x) for x in (acumulado, parcial))
+    return acumulado.add(parcial, fill_value=0)
+
+def _ampliar_enteros(resultado):
+    """
+    Convierte a int64 las columnas enteras de un resultado parcial
+    """
+    if isinstance(resultado, pd.Series):
+        return resultado.astype('int64') if pd.api.types.is_integer_dtype(resultado) else resultado
+    return resultado.astype({c: 'int64' for c, tipo in resultado.dtypes.items()
+                             if pd.api.types.is_integer_dtype(tipo)})
+
+def estadisticos_correlacion(df, columnas):
+    """
+    Estadísticos suficientes de la correlación de Pearson: n, medias y comomentos
+    
+    Args:
+        df (pd.DataFrame): Filas del bloque o partición
+        columnas (tuple): Variables numéricas
+    
+    Returns:
+        dict: n, media (vector) y comomentos (matriz de sumas de productos centrados)
+    """
+    valores = df[list(columnas)].to_numpy(dtype=float)
+    valores = valores[np.isfinite(valores).all(axis=1)]
+    media = valores.mean(axis=0) if len(valores) else np.zeros(len(columnas))
+    centrados = valores - media
+    return {'columnas': tuple(columnas), 'n': len(valores), 'media': media,
+            'comomentos': centrados.T @ centrados}
+
+def combinar_estadisticos_correlacion(est_a, est_b):
+    """
+    Une dos conjuntos de estadísticos con la fórmula por pares de Chan et al.
+    
+    Se combinan medias y comomentos centrados en lugar de sumas brutas de productos,
+    lo que evita la cancelación numérica con valores grandes.
+    """
+    if est_a is None or est_a['n'] == 0:
+        return est_b
+    if est_b['n'] == 0:
+        return est_a
+    n = est_a['n'] + est_b['n']
+    delta = est_b['media'] - est_a['media']
+    return {
+        'columnas': est_a['columnas'],
+        'n': n,
+        'media': est_a['media'] + delta * est_b['n'] / n,
+        'comomentos': est_a['comomentos'] + est_b['comomentos']
+                      + np.outer(delta, delta) * est_a['n'] * est_b['n'] / n,
+    }
+
+def correlacion_desde_estadisticos(estadisticos):
+    """
+    Matriz de correlación de Pearson a partir de los estadísticos suficientes
+    """
+    desviaciones = np.sqrt(np.diag(estadisticos['comomentos']))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        matriz = estadisticos['comomentos'] / np.outer(desviaciones, desviaciones)
+    columnas = list(estadisticos['columnas'])
+    return pd.DataFrame(matriz, index=columnas, columns=columnas)
+
+def estadisticos_correlacion_por_grupo(df, columnas, dimension=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Estadísticos de correlación del total y de cada grupo de una dimensión en una pasada
+    
+    Las filas se recorren por bloques, de modo que solo un bloque se convierte a una
+    matriz float64 cada vez; los estadísticos de cada bloque se combinan con la
+    fórmula de Chan, igual que entre bloques del modo streaming o entre procesos.
+    
+    Args:
+        df (pd.DataFrame): Dataset, bloque o partición
+        columnas (tuple): Variables numéricas
+        dimension (str, optional): Columna por la que calcular además una matriz por grupo
+        tamano_bloque (int): Filas convertidas a float64 a la vez
+    
+    Returns:
+        tuple: (estadísticos del total, {grupo: estadísticos}) con el dict vacío sin dimensión
+    """
+    total = estadisticos_correlacion(df.iloc[:0], columnas)
+    grupos = {}
+    for inicio in range(0, len(df), tamano_bloque):
+        bloque = df.iloc[inicio:inicio + tamano_bloque]
+        total = combinar_estadisticos_correlacion(total, estadisticos_correlacion(bloque, columnas))
+        if dimension is None:
+            continue
+        for grupo, filas in bloque.groupby(dimension, observed=True).indices.items():
+            estadisticos = estadisticos_correlacion(bloque.iloc[filas], columnas)
+            grupos[grupo] = combinar_estadisticos_correlacion(grupos.get(grupo), estadisticos)
+    return total, grupos
+
+def acumular_parciales(parciales, bloque, claves, bordes=None):
+    """
+    Acumula sobre un bloque los resultados parciales mergeables de los agregados
+    
+    Args:
+        parciales (dict): Parciales acumulados por clave (se modifica en sitio)
+        bloque (pd.DataFrame): Bloque de filas ya preparado
+        claves (list): Claves (medida, dimensiones, agg) a acumular
+        bordes (dict, optional): Bordes fijos de histogramas y bocetos por (agg, medida)
+    """
+    for medida, dimensiones, agg in claves:
+        clave = (medida, dimensiones, agg)
+        if _tipo_agregacion(agg) == 'hist':
+            conteos, _ = np.histogram(bloque[medida].dropna(), bins=bordes[agg, medida])
+            parciales[clave] = _sumar_parcial(parciales.get(clave), conteos)
+        elif _tipo_agregacion(agg) == 'resumen':
+            datos = bloque
+            if len(agg) == 3:
+                datos = bloque[(bloque[medida] >= agg[1]) & (bloque[medida] <= agg[2])]
+            grupos = datos.groupby(list(dimensiones), observed=True)[medida] if dimensiones else [(None, datos[medida])]
+            bocetos = parciales.setdefault(clave, {})
+            for grupo, serie in grupos:
+                grupo = grupo[0] if isinstance(grupo, tuple) else grupo
+                boceto = crear_boceto(serie.to_numpy(dtype=float), bordes[agg, medida])
+                bocetos[grupo] = combinar_bocetos(bocetos.get(grupo), boceto)
+        elif agg == 'corr':
+            total, grupos = estadisticos_correlacion_por_grupo(bloque, medida, dimensiones[0] if dimensiones else None)
+            if not dimensiones:
+                parciales[clave] = combinar_estadisticos_correlacion(parciales.get(clave), total)
+            else:
+                acumulado = parciales.setdefault(clave, {})
+                for grupo, estadisticos in grupos.items():
+                    acumulado[grupo] = combinar_estadisticos_correlacion(acumulado.get(grupo), estadisticos)
+        elif agg == 'mean':
+            # La media se reconstruye al final a partir de suma y conteo
+            grupos = bloque.groupby(list(dimensiones), observed=True)[medida]
+            suma, conteo = parciales.get(clave, (None, None))
+            parciales[clave] = (_sumar_parcial(suma, grupos.sum()),
+                                _sumar_parcial(conteo, grupos.count()))
+        else:
+            parcial = calcular_agregado(bloque, medida, dimensiones, agg)
+            parciales[clave] = _sumar_parcial(parciales.get(clave), parcial)
+
+def finalizar_parciales(parciales, bordes=None):
+    """
+    Convierte los parciales acumulados en los agregados finales que usan las gráficas
+    
+    Args:
+        parciales (dict): Parciales por clave de acumular_parciales
+        bordes (dict, optional): Bordes de histogramas y bocetos por (agg, medida)
+    
+    Returns:
+        dict: Agregados por (medida, dimensiones, agg)
+    """
+    agregados = {}
+    for clave, parcial in parciales.items():
+        medida, dimensiones, agg = clave
+        if _tipo_agregacion(agg) == 'hist':
+            agregados[clave] = (parcial, bordes[agg, medida])
+        elif _tipo_agregacion(agg) == 'resumen':
+            resumenes = {grupo: resumen_distribucion(boceto) for grupo, boceto in sorted(parcial.items())}
+            agregados[clave] = resumenes[None] if not dimensiones else resumenes
+        elif agg == 'corr' and dimensiones:
+            agregados[clave] = {grupo: correlacion_desde_estadisticos(est) for grupo, est in sorted(parcial.items())}
+        elif agg == 'corr':
+            agregados[clave] = correlacion_desde_estadisticos(parcial)
+        elif agg == 'mean':
+            agregados[clave] = (parcial[0] / parcial[1]).sort_index()
+        elif medida == 'conteo':
+            agregados[clave] = parcial.astype('int64').sort_values(ascending=False)
+        else:
+            agregados[clave] = parcial.sort_index()
+    return agregados
+
+def _columnas_con_rango():
+    """
+    Columnas del CSV cuyos histogramas o resúmenes necesitan conocer antes su rango
+    """
+    return sorted({m for m, _, a in AGREGADOS_GRAFICAS
+                   if _tipo_agregacion(a) == 'hist' or (_tipo_agregacion(a) == 'resumen' and len(a) == 1)})
+
+def _bordes_agregados(minimos, maximos):
+    """
+    Bordes fijos de histogramas y bocetos por (agg, medida) a partir de los rangos globales
+    """
+    bordes = {}
+    for medida, dimensiones, agg in AGREGADOS_GRAFICAS:
+        if _tipo_agregacion(agg) == 'hist':
+            bordes[agg, medida] = np.histogram_bin_edges([], bins=agg[1], range=(minimos[medida], maximos[medida]))
+        elif _tipo_agregacion(agg) == 'resumen':
+            rango = agg[1:] if len(agg) == 3 else (minimos[medida], maximos[medida])
+            bordes[agg, medida] = bordes_boceto(*rango)
+    return bordes
+
+def combinar_parciales(parciales_a, parciales_b):
+    """
+    Une dos diccionarios de parciales de acumular_parciales (de bloques o particiones)
+    
+    Args:
+        parciales_a (dict): Parciales por clave (se modifica en sitio)
+        parciales_b (dict): Parciales por clave a añadir
+    
+    Returns:
+        dict: parciales_a con los parciales de parciales_b combinados
+    """
+    for clave, parcial in parciales_b.items():
+        medida, dimensiones, agg = clave
+        acumulado = parciales_a.get(clave)
+        if acumulado is None:
+            parciales_a[clave] = parcial
+        elif _tipo_agregacion(agg) == 'resumen':
+            for grupo, boceto in parcial.items():
+                acumulado[grupo] = combinar_bocetos(acumulado.get(grupo), boceto)
+        elif agg == 'corr' and dimensiones:
+            for grupo, estadisticos in parcial.items():
+                acumulado[grupo] = combinar_estadisticos_correlacion(acumulado.get(grupo), estadisticos)
+        elif agg == 'corr':
+            parciales_a[clave] = combinar_estadisticos_correlacion(acumulado, parcial)
+        elif agg == 'mean':
+            parciales_a[clave] = (_sumar_parcial(acumulado[0], parcial[0]), _sumar_parcial(acumulado[1], parcial[1]))
+        else:
+            parciales_a[clave] = _sumar_parcial(acumulado, parcial)
+    return parciales_a
+
+def cargar_agregados_por_bloques(ruta_dataset=RUTA_DATASET, tamano_bloque=TAMANO_BLOQUE,
+                                 tamano_muestra=TAMANO_MUESTRA, semilla=42):
+    """
+    Lee el CSV por bloques y acumula los agregados que necesitan las gráficas
+    
+    La memoria queda acotada por el tamaño de bloque y de la muestra, no por el
+    número de filas. Se hacen dos pasadas: la primera solo lee las columnas de los
+    histogramas y resúmenes para fijar sus rangos y la segunda acumula todos los
+    agregados. Los boxplots y violines se construyen desde bocetos mergeables y las
+    gráficas que necesitan filas individuales (dispersión) usan una muestra aleatoria
+    uniforme de tamaño acotado.
+    
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV
+        tamano_bloque (int): Filas leídas por bloque
+        tamano_muestra (int): Filas conservadas para las gráficas a nivel de fila
+        semilla (int): Semilla del muestreo aleatorio
+    
+    Returns:
+        tuple: (muestra, agregados) o (None, None) si falla la carga
+    """
+    try:
+        print(f"📊 Cargando dataset por bloques de {tamano_bloque} filas (modo streaming)...")
+        columnas_rango = _columnas_con_rango()
+        
+        # 1ª pasada: rangos de las columnas con histograma o resumen
+        minimos, maximos = {}, {}
+        for bloque in pd.read_csv(ruta_dataset, encoding='utf-8', usecols=columnas_rango,
+                                  dtype=ESQUEMA_COLUMNAS, chunksize=tamano_bloque):
+            for columna in columnas_rango:
+                minimos[columna] = min(minimos.get(columna, np.inf), bloque[columna].min())
+                maximos[columna] = max(maximos.get(columna, -np.inf), bloque[columna].max())
+        bordes = _bordes_agregados(minimos, maximos)
+        claves = AGREGADOS_GRAFICAS + AGREGADOS_CORRELACION
+        
+        # 2ª pasada: acumulación de agregados y muestra aleatoria
+        rng = np.random.default_rng(semilla)
+        parciales = {}
+        muestra = None
+        total_filas = 0
+        for bloque in pd.read_csv(ruta_dataset, encoding='utf-8', dtype=ESQUEMA_COLUMNAS,
+                                  chunksize=tamano_bloque):
+            convertir_fechas(bloque)
+            preparar_columnas_derivadas(bloque)
+            total_filas += len(bloque)
+            acumular_parciales(parciales, bloque, claves, bordes)
+            
+            # Muestreo bottom-k: se conservan las filas con las claves aleatorias más bajas
+            bloque['_clave_muestra'] = rng.random(len(bloque))
+            candidatas = bloque if muestra is None else pd.concat([muestra, bloque], ignore_index=True)
+            muestra = candidatas.nsmallest(tamano_muestra, '_clave_muestra')
+        
+        agregados = finalizar_parciales(parciales, bordes)
+        
+        muestra = muestra.drop(columns='_clave_muestra').sort_index().reset_index(drop=True)
+        categoricas = {c: 'category' for c, tipo in ESQUEMA_COLUMNAS.items() if tipo == 'category'}
+        muestra = muestra.astype(categoricas)
+        
+        print(f"✅ {total_filas} filas procesadas; muestra de {len(muestra)} filas para gráficas de dispersión")
+        return muestra, agregados
+        
+    except FileNotFoundError:
+        print(f"❌ Error: No se pudo encontrar el archivo {ruta_dataset}")
+        return None, None
+    except Exception as e:
+        print(f"❌ Error al cargar el dataset por bloques: {str(e)}")
+        return None, None
+
+def _archivos_entrada(ruta_dataset):
+    """
+    Archivos CSV de entrada: el propio archivo, o los CSV de un directorio o patrón glob
+    (por ejemplo un archivo por mercado y año)
+    """
+    if os.path.isdir(ruta_dataset):
+        archivos = sorted(glob.glob(os.path.join(ruta_dataset, '*.csv')))
+    else:
+        archivos = sorted(glob.glob(ruta_dataset)) or [ruta_dataset]
+    if not archivos or not os.path.exists(archivos[0]):
+        raise FileNotFoundError(ruta_dataset)
+    return archivos
+
+def es_entrada_multiple(ruta_dataset):
+    """
+    Indica si la ruta es un directorio o un patrón glob de extractos en lugar de un CSV
+    """
+    return os.path.isdir(ruta_dataset) or glob.has_magic(ruta_dataset)
+
+def particiones_entrada(ruta_dataset, tamano_particion=TAMANO_PARTICION):
+    """
+    Divide la entrada en particiones de bytes alineadas con el inicio de línea
+    
+    Cada archivo se trocea en rangos de unos tamano_particion bytes que empiezan
+    después de la cabecera y terminan en un salto de línea, de forma que cada proceso
+    puede leer y parsear su partición sin depender de las demás. Se asume que los
+    campos del CSV no contienen saltos de línea.
+    
+    Args:
+        ruta_dataset (str): Archivo CSV, directorio o patrón glob de archivos CSV
+        tamano_particion (int): Tamaño objetivo de cada partición en bytes
+    
+    Returns:
+        list: Tuplas (archivo, inicio, fin, columnas)
+    """
+    particiones = []
+    for archivo in _archivos_entrada(ruta_dataset):
+        columnas = list(pd.read_csv(archivo, encoding='utf-8', nrows=0).columns)
+        tamano = os.path.getsize(archivo)
+        with open(archivo, 'rb') as f:
+            f.readline()
+            inicio = f.tell()
+            while inicio < tamano:
+                f.seek(min(inicio + tamano_particion, tamano))
+                f.readline()
+                fin = min(f.tell(), tamano)
+                particiones.append((archivo, inicio, fin, columnas))
+                inicio = fin
+    return particiones
+
+def _leer_particion(particion, usecols=None):
+    """
+    Parsea con el esquema de tipos las filas de una partición de bytes
+    """
+    archivo, inicio, fin, columnas = particion
+    with open(archivo, 'rb') as f:
+        f.seek(inicio)
+        datos = f.read(fin - inicio)
+    return pd.read_csv(io.BytesIO(datos), encoding='utf-8', header=None, names=columnas,
+                       usecols=usecols, dtype=ESQUEMA_COLUMNAS)
+
+def _rango_particion(argumentos):
+    """
+    Mínimos y máximos de las columnas con rango en una partición (1ª fase del modo paralelo)
+    """
+    particion, columnas_rango = argumentos
+    datos = _leer_particion(particion, columnas_rango)
+    return (len(datos), {c: datos[c].min() for c in columnas_rango},
+            {c: datos[c].max() for c in columnas_rango})
+
+def _procesar_particion(argumentos):
+    """
+    Prepara una partición y acumula sus parciales y su muestra (2ª fase del modo paralelo)
+    """
+    particion, indice, claves, bordes, tamano_muestra, semilla = argumentos
+    datos = _leer_particion(particion)
+    convertir_fechas(datos)
+    preparar_columnas_derivadas(datos)
+    parciales = {}
+    acumular_parciales(parciales, datos, claves, bordes)
+    
+    # Cada partición usa su propio flujo aleatorio para que el resultado no dependa
+    # del orden en que terminan los procesos
+    datos['_clave_muestra'] = np.random.default_rng([semilla, indice]).random(len(datos))
+    return parciales, datos.nsmallest(tamano_muestra, '_clave_muestra'), len(datos)
+
+def cargar_agregados_en_paralelo(ruta_dataset=RUTA_DATASET, procesos=None,
+                                 tamano_particion=TAMANO_PARTICION,
+                                 tamano_muestra=TAMANO_MUESTRA, semilla=42):
+    """
+    Carga y agrega el dataset por particiones repartidas entre un pool de procesos
+    
+    Igual que el modo streaming pero con las particiones procesadas en paralelo:
+    cada proceso parsea, prepara y agrega su partición de bytes y devuelve solo sus
+    parciales mergeables y su muestra bottom-k; el proceso principal los combina
+    sin volver a recorrer las filas. Admite un archivo o un conjunto de archivos ya
+    particionados (por ejemplo por mercado y año).
+    
+    Args:
+        ruta_dataset (str): Archivo CSV, directorio o patrón glob de archivos CSV
+        procesos (int, optional): Número de procesos (uno por núcleo por defecto)
+        tamano_particion (int, optional): Tamaño máximo en bytes de cada partición; por
+            defecto se ajusta para que haya PARTICIONES_POR_PROCESO por proceso
+        tamano_muestra (int): Filas conservadas para las gráficas a nivel de fila
+        semilla (int): Semilla del muestreo aleatorio
+    
+    Returns:
+        tuple: (muestra, agregados) o (None, None) si falla la carga
+    """
+    try:
+        procesos = procesos or os.cpu_count() or 1
+        tamano_total = sum(os.path.getsize(a) for a in _archivos_entrada(ruta_dataset))
+        tamano_particion = min(tamano_particion,
+                               max(1 << 16, tamano_total // (procesos * PARTICIONES_POR_PROCESO) + 1))
+        particiones = particiones_entrada(ruta_dataset, tamano_particion)
+        print(f"📊 Cargando dataset en {len(particiones)} particiones con {procesos} procesos (modo paralelo)...")
+        columnas_rango = _columnas_con_rango()
+        claves = AGREGADOS_GRAFICAS + AGREGADOS_CORRELACION
+        
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            # 1ª fase: rangos de las columnas con histograma o resumen
+            minimos, maximos = {}, {}
+            for filas, minimo, maximo in pool.map(_rango_particion, [(p, columnas_rango) for p in particiones]):
+                for columna in columnas_rango if filas else []:
+                    minimos[columna] = min(minimos.get(columna, np.inf), minimo[columna])
+                    maximos[columna] = max(maximos.get(columna, -np.inf), maximo[columna])
+            bordes = _bordes_agregados(minimos, maximos)
+            
+            # 2ª fase: parciales y muestra de cada partición
+            tareas = [(p, i, claves, bordes, tamano_muestra, semilla) for i, p in enumerate(particiones)]
+            parciales, muestras = {}, []
+            total_filas = 0
+            for parcial, muestra, filas in pool.map(_procesar_particion, tareas):
+                combinar_parciales(parciales, parcial)
+                muestras.append(muestra)
+                total_filas += filas
+        
+        agregados = finalizar_parciales(parciales, bordes)
+        
+        muestra = concatenar_preservando_categorias(muestras).nsmallest(tamano_muestra, '_clave_muestra')
+        muestra = muestra.drop(columns='_clave_muestra').sort_index().reset_index(drop=True)
+        categoricas = {c: 'category' for c, tipo in ESQUEMA_COLUMNAS.items() if tipo == 'category'}
+        muestra = muestra.astype(categoricas)
+        
+        print(f"✅ {total_filas} filas procesadas; muestra de {len(muestra)} filas para gráficas de dispersión")
+        return muestra, agregados
+        
+    except FileNotFoundError:
+        print(f"❌ Error: No se pudo encontrar el archivo {ruta_dataset}")
+        return None, None
+    except Exception as e:
+        print(f"❌ Error al cargar el dataset en paralelo: {str(e)}")
+        return None, None
+
+def concatenar_preservando_categorias(frames):
+    """
+    Concatena DataFrames unificando antes las categorías para no perder el tipo categórico
+    
+    Las categorías se ordenan como al leer un único CSV, para que el orden de los
+    grupos en las gráficas no dependa del orden de los archivos o particiones.
+    """
+    frames = [f for f in frames if len(f)]
+    columnas = [c for c in frames[0].columns if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]
+    for columna in columnas:
+        categorias = pd.api.types.union_categoricals([f[columna] for f in frames], sort_categories=True).categories
+        frames = [f.assign(**{columna: f[columna].cat.set_categories(categorias)}) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+def _ruta_estado_incremental(ruta_dataset):
+    """
+    Ruta del estado persistido del modo incremental junto al CSV
+    """
+    return f"{ruta_dataset}.incremental.pkl"
+
+def _firma_hasta(ruta, posicion, ventana=1 << 16):
+    """
+    Hash de los últimos bytes anteriores a una posición, para detectar si el CSV solo creció
+    """
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(max(0, posicion - ventana))
+        return hashlib.sha256(archivo.read(posicion - max(0, posicion - ventana))).hexdigest()
+
+def _posicion_ultima_linea(ruta):
+    """
+    Posición justo después del último salto de línea del archivo
+    
+    Si la última fila no termina en salto de línea se volverá a leer en la siguiente
+    actualización y se descartará por su Row ID ya procesado.
+    """
+    tamano = os.path.getsize(ruta)
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(max(0, tamano - (1 << 16)))
+        cola = archivo.read()
+    return tamano - len(cola) + cola.rfind(b'\n') + 1
+
+def _leer_filas_nuevas(ruta_dataset, posicion):
+    """
+    Lee y prepara las filas del CSV a partir de una posición en bytes
+    """
+    with open(ruta_dataset, 'rb') as archivo:
+        archivo.seek(posicion)
+        try:
+            nuevas = pd.read_csv(archivo, encoding='utf-8', header=None,
+                                 names=list(ESQUEMA_COLUMNAS), dtype=ESQUEMA_COLUMNAS)
+        except pd.errors.EmptyDataError:
+            return None
+    return preparar_columnas_derivadas(convertir_fechas(nuevas))
+
+def _agregados_iguales(valor_a, valor_b):
+    """
+    Compara dos agregados (Series, DataFrame o {grupo: matriz}) para saber si una gráfica debe renovarse
+    """
+    if isinstance(valor_b, dict):
+        return (isinstance(valor_a, dict) and valor_a.keys() == valor_b.keys()
+                and all(_agregados_iguales(valor_a[grupo], valor_b[grupo]) for grupo in valor_b))
+    return valor_a is not None and valor_a.shape == valor_b.shape and valor_a.equals(valor_b)
+
+def cargar_incremental(ruta_dataset=RUTA_DATASET):
+    """
+    Carga el dataset procesando solo las filas añadidas desde la última ejecución
+    
+    Se persisten junto al CSV los Row ID procesados, el rango de Order Date, la
+    posición leída del archivo y los parciales mergeables de los agregados (ventas
+    mensuales, totales por región, medias Categoría×Segmento, estadísticos de la
+    correlación...). Si el CSV solo ha crecido se leen únicamente los bytes nuevos,
+    se descartan Row ID ya vistos, se combinan los parciales y se añaden las filas a
+    la caché del dataset preparado. Si el contenido previo cambió se reconstruye todo.
+    
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV
+    
+    Returns:
+        tuple: (df, agregados, cambios) donde cambios es el conjunto de claves de
+        agregados modificadas (incluye 'filas' si hubo filas nuevas) o None si se
+        reconstruyó todo; (None, None, None) si falla la carga
+    """
+    ruta_estado = _ruta_estado_incremental(ruta_dataset)
+    ruta_cache, _ = _rutas_cache(ruta_dataset)
+    estado = None
+    if os.path.exists(ruta_estado) and os.path.exists(ruta_cache):
+        estado = pd.read_pickle(ruta_estado)
+        tamano = os.path.getsize(ruta_dataset)
+        if tamano < estado['posicion'] or _firma_hasta(ruta_dataset, estado['posicion']) != estado['firma']:
+            print("⚠️ El contenido previo del CSV cambió: se reconstruye el estado incremental")
+            estado = None
+    
+    if estado is None:
+        df = cargar_y_preparar_datos(ruta_dataset)
+        if df is None:
+            return None, None, None
+        parciales = {}
+        acumular_parciales(parciales, df, AGREGADOS_INCREMENTALES)
+        cambios = None
+    else:
+        print("🔄 Modo incremental: buscando filas nuevas...")
+        nuevas = _leer_filas_nuevas(ruta_dataset, estado['posicion'])
+        if nuevas is not None:
+            nuevas = nuevas[~np.isin(nuevas['Row ID'].to_numpy(), estado['row_ids'])]
+        df = _leer_archivo_cache(ruta_cache)
+        cargar_indice(df, ruta_dataset)
+        parciales = estado['parciales']
+        agregados_previos = finalizar_parciales(parciales)
+        
+        if nuevas is None or nuevas.empty:
+            print("✅ Sin filas nuevas desde la última ejecución")
+            cambios = set()
+        else:
+            print(f"✅ {len(nuevas)} filas nuevas ({nuevas['Order Date'].min():%Y-%m-%d} a "
+                  f"{nuevas['Order Date'].max():%Y-%m-%d})")
+            acumular_parciales(parciales, nuevas, AGREGADOS_INCREMENTALES)
+            df = concatenar_preservando_categorias([df, nuevas])
+            guardar_cache_datos(df, ruta_dataset)
+            agregados_nuevos = finalizar_parciales(parciales)
+            cambios = {'filas'} | {clave for clave, valor in agregados_nuevos.items()
+                                   if not _agregados_iguales(agregados_previos.get(clave), valor)}
+    
+    posicion = _posicion_ultima_linea(ruta_dataset)
+    pd.to_pickle({
+        'posicion': posicion,
+        'firma': _firma_hasta(ruta_dataset, posicion),
+        'row_ids': np.sort(df['Row ID'].to_numpy()),
+        'fecha_min': df['Order Date'].min(),
+        'fecha_max': df['Order Date'].max(),
+        'parciales': parciales,
+    }, ruta_estado)
+    print(f"📅 Pedidos procesados: {len(df)} ({df['Order Date'].min():%Y-%m-%d} a {df['Order Date'].max():%Y-%m-%d})")
+    
+    return df, finalizar_parciales(parciales), cambios
+
+def _sql_identificador(nombre):
+    """
+    Cita un nombre de columna para SQL
+    """
+    return '"' + nombre.replace('"', '""') + '"'
+
+def _sql_literal(texto):
+    """
+    Cita una cadena (ruta de archivo) como literal SQL
+    """
+    return "'" + texto.replace("'", "''") + "'"
+
+def _consulta_origen_duckdb(ruta_dataset):
+    """
+    Consulta SQL que expone el dataset preparado sin cargarlo en memoria
+    
+    Si la caché Parquet del dataset preparado está vigente se consulta directamente
+    (lectura columnar con proyección y filtros empujados al escaneo); si no, se lee el
+    CSV con el esquema explícito y se derivan fechas, Year, Month, Quarter y
+    Profit_Margin igual que preparar_columnas_derivadas.
+    """
+    ruta_cache = _rutas_cache(ruta_dataset)[0]
+    try:
+        vigente = PYARROW_DISPONIBLE and _cache_vigente(ruta_dataset)
+    except Exception:
+        vigente = False
+    if vigente:
+        return f"SELECT * FROM read_parquet({_sql_literal(ruta_cache)})"
+    
+    columnas = ', '.join(f"{_sql_literal(c)}: {_sql_literal(TIPOS_DUCKDB[t])}"
+                         for c, t in ESQUEMA_COLUMNAS.items())
+    fechas = ', '.join(f"try_strptime({_sql_identificador(c)}, {_sql_literal(FORMATO_FECHA)}) "
+                       f"AS {_sql_identificador(c)}" for c in COLUMNAS_FECHA)
+    margen = '"Profit" / "Sales" * 100'
+    return f"""
+        SELECT *,
+               year("Order Date") AS "Year",
+               month("Order Date") AS "Month",
+               quarter("Order Date") AS "Quarter",
+               CASE WHEN isfinite({margen}) THEN {margen} ELSE 0 END AS "Profit_Margin"
+        FROM (SELECT * REPLACE ({fechas})
+              FROM read_csv({_sql_literal(ruta_dataset)}, header = true, columns = {{{columnas}}}))
+    """
+
+def conectar_duckdb(ruta_dataset):
+    """
+    Abre una conexión DuckDB en memoria con la vista 'superstore' sobre el archivo
+    
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV
+    
+    Returns:
+        duckdb.DuckDBPyConnection: Conexión configurada según CONFIG_MOTOR
+    """
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("El motor 'duckdb' requiere el paquete duckdb (pip install duckdb)")
+    conexion = duckdb.connect()
+    if CONFIG_MOTOR['hilos']:
+        conexion.execute(f"SET threads = {int(CONFIG_MOTOR['hilos'])}")
+    if CONFIG_MOTOR['memoria_max']:
+        conexion.execute(f"SET memory_limit = {_sql_literal(CONFIG_MOTOR['memoria_max'])}")
+    if CONFIG_MOTOR['directorio_temporal']:
+        conexion.execute(f"SET temp_directory = {_sql_literal(CONFIG_MOTOR['directorio_temporal'])}")
+    conexion.execute(f"CREATE VIEW superstore AS {_consulta_origen_duckdb(ruta_dataset)}")
+    return conexion
+
+def _conteos_por_bordes_duckdb(conexion, valor, bordes, filtro, grupo='0'):
+    """
+    Cuenta las filas de cada intervalo de unos bordes, por grupo, igual que np.histogram
+    
+    El intervalo se estima con aritmética uniforme y se corrige comparando con los
+    bordes vecinos, la misma corrección que aplica numpy, de modo que los valores que
+    caen justo en un borde van al mismo intervalo que en pandas.
+    
+    Returns:
+        dict: {grupo: np.ndarray de conteos}
+    """
+    bins = len(bordes) - 1
+    filas = conexion.execute(f"""
+        WITH estimado AS (
+            SELECT {grupo} AS grupo, {valor} AS x,
+                   least(greatest(CAST(floor(({valor} - $inicio) * $escala) AS BIGINT), 0), $bins - 1) AS i
+            FROM superstore WHERE {filtro}
+        )
+        SELECT grupo,
+               CASE WHEN x < $bordes[i + 1] THEN i - 1
+                    WHEN i < $bins - 1 AND x >= $bordes[i + 2] THEN i + 1
+                    ELSE i END AS intervalo,
+               count(*)
+        FROM estimado GROUP BY ALL
+    """, {'inicio': float(bordes[0]), 'escala': bins / float(bordes[-1] - bordes[0]),
+          'bins': bins, 'bordes': [float(b) for b in bordes]}).fetchall()
+    conteos = {}
+    for clave_grupo, intervalo, n in filas:
+        conteos.setdefault(clave_grupo, np.zeros(bins, dtype=np.int64))[intervalo] = n
+    return conteos
+
+def _resumenes_duckdb(conexion, medida, dimensiones, agg):
+    """
+    Resúmenes de distribución exactos calculados en DuckDB (cuartiles, bigotes, atípicos)
+    """
+    x = f"CAST({_sql_identificador(medida)} AS DOUBLE)"
+    grupo = _sql_identificador(dimensiones[0]) if dimensiones else '0'
+    filtro = f"{x} IS NOT NULL AND isfinite({x})"
+    if len(agg) == 3:
+        bordes = bordes_boceto(agg[1], agg[2])
+        filtro += f" AND {x} BETWEEN {float(agg[1])!r} AND {float(agg[2])!r}"
+    else:
+        columna = _sql_identificador(medida)
+        rango = conexion.execute(f"SELECT min({columna}), max({columna}) FROM superstore").fetchone()
+        # Mínimo y máximo con el tipo de la columna, como los usa pandas para los bordes
+        bordes = bordes_boceto(*np.array(rango, dtype=ESQUEMA_COLUMNAS.get(medida, 'float64')))
+    if dimensiones:
+        filtro += f" AND {grupo} IS NOT NULL"
+    
+    estadisticos = conexion.execute(f"""
+        SELECT {grupo}, count(*), sum({x}), sum({x} * {x}), min({x}), max({x}),
+               quantile_cont({x}, [0.25, 0.5, 0.75])
+        FROM superstore WHERE {filtro} GROUP BY ALL
+    """).fetchall()
+    conteos = _conteos_por_bordes_duckdb(conexion, x, bordes, filtro, grupo)
+    
+    # Vallas de 1.5 IQR por grupo: bigotes y atípicos se resuelven en una sola pasada
+    vallas = {g: (c[0] - 1.5 * (c[2] - c[0]), c[2] + 1.5 * (c[2] - c[0])) for g, *_, c in estadisticos}
+    parametros = {'grupos': list(vallas), 'inferior': [v[0] for v in vallas.values()],
+                  'superior': [v[1] for v in vallas.values()]}
+    consulta_vallas = f"""
+        WITH vallas AS (SELECT unnest($grupos) AS grupo, unnest($inferior) AS inferior,
+                               unnest($superior) AS superior),
+             datos AS (SELECT {grupo} AS grupo, {x} AS x FROM superstore WHERE {filtro})
+    """
+    candidatos = {g: [] for g in vallas}
+    for g, bigote_inf, bigote_sup in conexion.execute(consulta_vallas + """
+        SELECT grupo, min(x) FILTER (WHERE x BETWEEN inferior AND superior),
+               max(x) FILTER (WHERE x BETWEEN inferior AND superior)
+        FROM datos JOIN vallas USING (grupo) GROUP BY grupo
+    """, parametros).fetchall():
+        candidatos[g] += [v for v in (bigote_inf, bigote_sup) if v is not None]
+    for g, atipico in conexion.execute(consulta_vallas + """
+        SELECT DISTINCT grupo, x FROM datos JOIN vallas USING (grupo)
+        WHERE x < inferior OR x > superior
+    """, parametros).fetchall():
+        candidatos[g].append(atipico)
+    
+    resumenes = {}
+    for g, n, suma, suma_cuadrados, minimo, maximo, cuartiles in estadisticos:
+        boceto = {'bordes': bordes, 'conteos': conteos[g], 'n': n, 'suma': suma,
+                  'suma_cuadrados': suma_cuadrados, 'minimo': minimo, 'maximo': maximo}
+        resumenes[g] = resumen_distribucion(boceto, np.array(candidatos[g], dtype=float), tuple(cuartiles))
+    if not dimensiones:
+        return resumenes[0]
+    return dict(sorted(resumenes.items()))
+
+def calcular_agregado_duckdb(conexion, medida, dimensiones, agg):
+    """
+    Calcula en DuckDB un agregado con el mismo formato que calcular_agregado
+    
+    Args:
+        conexion (duckdb.DuckDBPyConnection): Conexión de conectar_duckdb
+        medida (str | tuple): Columna (o columnas) a agregar, o 'conteo'
+        dimensiones (tuple): Columnas de agrupación
+        agg (str | tuple): Función de agregación, 'corr', ('hist', bins) o ('resumen', ...)
+    
+    Returns:
+        pd.Series | pd.DataFrame | tuple | dict: Resultado del agregado
+    """
+    if _tipo_agregacion(agg) == 'resumen':
+        return _resumenes_duckdb(conexion, medida, dimensiones, agg)
+    if _tipo_agregacion(agg) == 'hist':
+        columna = _sql_identificador(medida)
+        filtro = f"{columna} IS NOT NULL AND NOT isnan({columna})"
+        minimo, maximo = conexion.execute(f"SELECT min({columna}), max({columna}) FROM superstore "
+                                          f"WHERE {filtro}").fetchone()
+        # Bordes con el mismo tipo que la columna en pandas para reproducir np.histogram
+        tipo = ESQUEMA_COLUMNAS.get(medida, 'float64')
+        bordes = np.histogram_bin_edges(np.array([minimo, maximo], dtype=tipo), bins=agg[1])
+        conteos = _conteos_por_bordes_duckdb(conexion, columna, bordes, filtro)
+        return conteos.get(0, np.zeros(agg[1], dtype=np.int64)), bordes
+    grupos = ', '.join(_sql_identificador(d) for d in dimensiones)
+    no_nulos = ' AND '.join(f"{_sql_identificador(d)} IS NOT NULL" for d in dimensiones)
+    if agg == 'corr':
+        pares = [(a, b) for i, a in enumerate(medida) for b in medida[i + 1:]]
+        # La diagonal es 1 solo si la columna varía en el grupo; sin varianza (o con una
+        # sola fila) queda NaN, como en pandas
+        correlaciones = ', '.join([f"var_samp({_sql_identificador(c)})" for c in medida] + [
+            f"corr({_sql_identificador(a)}, {_sql_identificador(b)})" for a, b in pares])
+        
+        def matriz(valores):
+            varianzas, valores = valores[:len(medida)], valores[len(medida):]
+            diagonal = [1.0 if varianza is not None and varianza > 0 else np.nan for varianza in varianzas]
+            resultado = pd.DataFrame(np.diag(diagonal), index=list(medida), columns=list(medida))
+            for (a, b), valor in zip(pares, valores):
+                resultado.loc[a, b] = resultado.loc[b, a] = np.nan if valor is None else valor
+            return resultado
+        
+        if not dimensiones:
+            return matriz(conexion.execute(f"SELECT {correlaciones} FROM superstore").fetchone())
+        filas = conexion.execute(f"SELECT {grupos}, {correlaciones} FROM superstore WHERE {no_nulos} "
+                                 f"GROUP BY ALL ORDER BY {grupos}").fetchall()
+        return {fila[0]: matriz(fila[1:]) for fila in filas}
+    
+    if medida == 'conteo':
+        resultado = conexion.execute(f"""
+            SELECT {grupos}, count(*) AS "count" FROM superstore WHERE {no_nulos}
+            GROUP BY ALL ORDER BY "count" DESC, {grupos}
+        """).df()
+        return resultado.set_index(list(dimensiones))['count']
+    
+    columnas = list(medida) if isinstance(medida, tuple) else [medida]
+    funcion = 'avg' if agg == 'mean' else f'coalesce({agg}'
+    cierre = '' if agg == 'mean' else ', 0)'
+    resultado = conexion.execute(f"""
+        SELECT {grupos}, {', '.join(f'CAST({funcion}({_sql_identificador(c)}){cierre} AS DOUBLE) '
+                                    f'AS {_sql_identificador(c)}' for c in columnas)}
+        FROM superstore WHERE {no_nulos} GROUP BY ALL ORDER BY {grupos}
+    """).df().set_index(list(dimensiones))
+    return resultado if isinstance(medida, tuple) else resultado[medida]
+
+def cargar_agregados_duckdb(ruta_dataset=RUTA_DATASET, tamano_muestra=TAMANO_MUESTRA, semilla=42):
+    """
+    Calcula los agregados de las gráficas con DuckDB directamente sobre el archivo
+    
+    El dataset no se carga en memoria: cada agregado es una consulta columnar
+    multihilo sobre el CSV (o la caché Parquet), con la memoria acotada por
+    CONFIG_MOTOR y derrame a disco si hace falta. Como en el modo streaming, las
+    gráficas a nivel de fila usan una muestra aleatoria de tamaño acotado.
+    
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV
+        tamano_muestra (int): Filas de la muestra para las gráficas de dispersión
+        semilla (int): Semilla del muestreo reproducible
+    
+    Returns:
+        tuple: (muestra, agregados) o (None, None) si falla la carga
+    """
+    try:
+        print("🦆 Calculando agregados con DuckDB sobre el archivo (sin cargarlo en memoria)...")
+        conexion = conectar_duckdb(ruta_dataset)
+        agregados = {}
+        for medida, dimensiones, agg in AGREGADOS_GRAFICAS + AGREGADOS_CORRELACION:
+            agregados[medida, dimensiones, agg] = calcular_agregado_duckdb(conexion, medida, dimensiones, agg)
+        
+        total_filas = conexion.execute("SELECT count(*) FROM superstore").fetchone()[0]
+        muestra = conexion.execute(f"SELECT * FROM superstore USING SAMPLE reservoir({int(tamano_muestra)} ROWS) "
+                                   f"REPEATABLE ({int(semilla)})").df()
+        conexion.close()
+        categoricas = {c: 'category' for c, tipo in ESQUEMA_COLUMNAS.items() if tipo == 'category'}
+        muestra = muestra.astype(categoricas)
+        
+        print(f"✅ {total_filas} filas consultadas; muestra de {len(muestra)} filas para gráficas de dispersión")
+        return muestra, agregados
+        
+    except FileNotFoundError:
+        print(f"❌ Error: No se pudo encontrar el archivo {ruta_dataset}")
+        return None, None
+    except Exception as e:
+        print(f"❌ Error al calcular los agregados con DuckDB: {str(e)}")
+        return None, None
+
+# Motores alternativos de agregación: cada uno devuelve (muestra, agregados) como el modo streaming
+MOTORES_AGREGACION = {
+    'duckdb': cargar_agregados_duckdb,
+}
+
+def _valores_equivalentes(valor_a, valor_b, tolerancia):
+    """
+    Compara recursivamente dos agregados (Series, DataFrame, arrays, tuplas o dicts)
+    """
+    if isinstance(valor_a, dict):
+        return (isinstance(valor_b, dict) and list(valor_a) == list(valor_b)
+                and all(_valores_equivalentes(valor_a[k], valor_b[k], tolerancia) for k in valor_a))
+    if isinstance(valor_a, tuple):
+        return (len(valor_a) == len(valor_b)
+                and all(_valores_equivalentes(a, b, tolerancia) for a, b in zip(valor_a, valor_b)))
+    if isinstance(valor_a, (pd.Series, pd.DataFrame)):
+        valor_a, valor_b = valor_a.sort_index(), valor_b.sort_index()
+        if list(valor_a.index) != list(valor_b.index):
+            return False
+        if isinstance(valor_a, pd.DataFrame) and list(valor_a.columns) != list(valor_b.columns):
+            return False
+        valor_a, valor_b = valor_a.to_numpy(dtype=float), valor_b.to_numpy(dtype=float)
+    valor_a, valor_b = np.asarray(valor_a, dtype=float), np.asarray(valor_b, dtype=float)
+    return valor_a.shape == valor_b.shape and np.allclose(valor_a, valor_b, rtol=tolerancia,
+                                                          atol=0, equal_nan=True)
+
+def verificar_motor(df, agregados_motor, tolerancia=1e-9):
+    """
+    Comprueba que los agregados de un motor coinciden con los calculados en pandas
+    
+    Los conteos e intervalos de histograma deben coincidir exactamente; los valores
+    en coma flotante admiten una tolerancia relativa por el orden de las sumas.
+    
+    Args:
+        df (pd.DataFrame): Dataset completo preparado con pandas
+        agregados_motor (dict): Agregados calculados por el motor alternativo
+        tolerancia (float): Tolerancia relativa para valores en coma flotante
+    
+    Returns:
+        list: Claves cuyos resultados difieren (vacía si todo coincide)
+    """
+    diferencias = []
+    for clave, valor in agregados_motor.items():
+        if not _valores_equivalentes(calcular_agregado(df, *clave), valor, tolerancia):
+            diferencias.append(clave)
+    return diferencias
+
+def construir_cubo(df):
+    """
+    Materializa el cubo OLAP de las medidas sobre todas las dimensiones en una pasada
+    
+    Cada celda (combinación de valores de DIMENSIONES_CUBO presente en los datos)
+    guarda el número de filas y, por medida, la suma, el número de valores no nulos,
+    la suma de cuadrados, el mínimo y el máximo. Son estadísticos que se combinan
+    sumando (o con min/max), así que cualquier agregado sobre un subconjunto de las
+    dimensiones se obtiene agrupando celdas en lugar de filas.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+    
+    Returns:
+        pd.DataFrame: Una fila por celda con las dimensiones y los estadísticos
+    """
+    base = df[list(DIMENSIONES_CUBO)].copy()
+    estadisticos = {'filas': (MEDIDAS_CUBO[0], 'size')}
+    for medida in MEDIDAS_CUBO:
+        valores = df[medida].astype('float64')
+        base[medida] = valores
+        base[f'{medida}__cuadrado'] = valores * valores
+        estadisticos.update({
+            f'{medida}__suma': (medida, 'sum'),
+            f'{medida}__n': (medida, 'count'),
+            f'{medida}__suma_cuadrados': (f'{medida}__cuadrado', 'sum'),
+            f'{medida}__min': (medida, 'min'),
+            f'{medida}__max': (medida, 'max'),
+        })
+    return base.groupby(list(DIMENSIONES_CUBO), observed=True, dropna=False, sort=False).agg(
+        **estadisticos).reset_index()
+
+def _cubo_responde(medida, dimensiones, agg):
+    """
+    Indica si un agregado de las gráficas se puede obtener agregando celdas del cubo
+    """
+    medidas = medida if isinstance(medida, tuple) else (medida,)
+    return (agg in ('count', 'sum', 'mean', 'std', 'min', 'max')
+            and set(dimensiones) <= set(DIMENSIONES_CUBO)
+            and all(m == 'conteo' or m in MEDIDAS_CUBO for m in medidas))
+
+def consultar_cubo(cubo, medida, dimensiones, agg):
+    """
+    Calcula un agregado agrupando celdas del cubo, con el formato de calcular_agregado
+    
+    Args:
+        cubo (pd.DataFrame): Cubo de construir_cubo
+        medida (str | tuple): Medida (o medidas) del cubo, o 'conteo'
+        dimensiones (tuple): Dimensiones del cubo por las que agrupar
+        agg (str): 'count', 'sum', 'mean', 'std' (muestral), 'min' o 'max'
+    
+    Returns:
+        pd.Series | pd.DataFrame: Resultado del agregado
+    """
+    if medida == 'conteo':
+        conteos = cubo.groupby(dimensiones[0], observed=False)['filas'].sum()
+        return conteos.rename('count').sort_values(ascending=False, kind='stable')
+    
+    medidas = list(medida) if isinstance(medida, tuple) else [medida]
+    if agg in ('min', 'max'):
+        columnas = {f'{m}__{agg}': m for m in medidas}
+    else:
+        columnas = {f'{m}__{estadistico}': m for m in medidas for estadistico in ('suma', 'n', 'suma_cuadrados')}
+    grupos = cubo.groupby(list(dimensiones), observed=True)[list(columnas)] if dimensiones else cubo[list(columnas)]
+    agrupado = getattr(grupos, agg)() if agg in ('min', 'max') else grupos.sum()
+    if not dimensiones:
+        agrupado = agrupado.to_frame().T
+    
+    resultado = pd.DataFrame(index=agrupado.index)
+    for m in medidas:
+        if agg in ('min', 'max'):
+            resultado[m] = agrupado[f'{m}__{agg}']
+            continue
+        suma, n = agrupado[f'{m}__suma'], agrupado[f'{m}__n']
+        if agg == 'sum':
+            resultado[m] = suma
+        elif agg == 'mean':
+            resultado[m] = suma / n
+        elif agg == 'std':
+            varianza = (agrupado[f'{m}__suma_cuadrados'] - suma ** 2 / n) / (n - 1)
+            resultado[m] = np.sqrt(varianza.clip(lower=0))
+    if not dimensiones:
+        resultado = resultado.iloc[0]
+    return resultado if isinstance(medida, tuple) else resultado[medida]
+
+def agregados_desde_cubo(cubo, claves=None):
+    """
+    Agregados de las gráficas que responde el cubo, calculados agrupando celdas
+    
+    Args:
+        cubo (pd.DataFrame): Cubo de construir_cubo
+        claves (list, optional): Claves a calcular (por defecto AGREGADOS_GRAFICAS)
+    
+    Returns:
+        dict: Agregados por (medida, dimensiones, agg)
+    """
+    claves = AGREGADOS_GRAFICAS if claves is None else claves
+    return {(medida, dimensiones, agg): consultar_cubo(cubo, medida, dimensiones, agg)
+            for medida, dimensiones, agg in claves if _cubo_responde(medida, dimensiones, agg)}
+
+def _firma_origen(ruta_dataset):
+    """
+    Tamaño y fecha de modificación del CSV, o None si no está disponible
+    """
+    if not os.path.exists(ruta_dataset):
+        return None
+    estado = os.stat(ruta_dataset)
+    return {'size': estado.st_size, 'mtime_ns': estado.st_mtime_ns}
+
+def guardar_cubo(ruta_cubo, cubo, df, agregados, ruta_dataset, tamano_muestra=TAMANO_MUESTRA, semilla=42):
+    """
+    Guarda el cubo junto con lo que necesita un informe para no leer los datos de origen
+    
+    Además de las celdas se guardan los agregados que el cubo no puede responder
+    (histogramas, resúmenes de distribución y correlación) y una muestra aleatoria de
+    filas para las gráficas de dispersión.
+    
+    Args:
+        ruta_cubo (str): Ruta del archivo del cubo
+        cubo (pd.DataFrame): Cubo de construir_cubo
+        df (pd.DataFrame): Dataset preparado del que se extrae la muestra
+        agregados (dict): Caché de agregados ya construida
+        ruta_dataset (str): CSV de origen, para detectar si el cubo quedó obsoleto
+        tamano_muestra (int): Filas de la muestra
+        semilla (int): Semilla del muestreo
+    """
+    muestra = df.sample(min(tamano_muestra, len(df)), random_state=semilla).sort_index().reset_index(drop=True)
+    pd.to_pickle({
+        'cubo': cubo,
+        'agregados': {clave: valor for clave, valor in agregados.items() if not _cubo_responde(*clave)},
+        'muestra': muestra,
+        'origen': _firma_origen(ruta_dataset),
+    }, ruta_cubo)
+    print(f"🧊 Cubo OLAP guardado en: {ruta_cubo} ({len(cubo)} celdas)")
+
+def cargar_cubo(ruta_cubo, ruta_dataset=None):
+    """
+    Carga un cubo guardado y reconstruye los agregados de las gráficas sin leer el CSV
+    
+    Args:
+        ruta_cubo (str): Ruta del archivo del cubo
+        ruta_dataset (str, optional): CSV de origen; si existe y cambió, el cubo se descarta
+    
+    Returns:
+        tuple: (muestra, agregados, cubo) o (None, None, None) si no existe o está obsoleto
+    """
+    if not os.path.exists(ruta_cubo):
+        return None, None, None
+    paquete = pd.read_pickle(ruta_cubo)
+    origen = None if ruta_dataset is None else _firma_origen(ruta_dataset)
+    if origen is not None and origen != paquete['origen']:
+        print("⚠️ El CSV cambió desde que se construyó el cubo: se reconstruye")
+        return None, None, None
+    
+    agregados = agregados_desde_cubo(paquete['cubo'])
+    agregados.update(paquete['agregados'])
+    print(f"🧊 Cubo OLAP cargado desde {ruta_cubo}: {len(paquete['cubo'])} celdas, "
+          f"{int(paquete['cubo']['filas'].sum())} filas de origen")
+    return paquete['muestra'], agregados, paquete['cubo']
+
+def _nombre_tabla(medida, dimensiones, agg):
+    """
+    Nombre de archivo de un agregado: 'sales_por_category_segment_mean', 'profit_hist_50'...
+    """
+    medidas = [medida] if isinstance(medida, str) else list(medida)
+    agregaciones = [agg] if isinstance(agg, str) else [
+        parte if isinstance(parte, str) else str(parte).replace('-', 'm') for parte in agg]
+    partes = medidas + (['por', *dimensiones] if dimensiones else []) + agregaciones
+    return ''.join(c if c.isalnum() else '_' for c in '_'.join(partes).lower())
+
+def _tabla_agregado(valor, agg):
+    """
+    Convierte un agregado de la caché en una tabla plana para exportarla
+    
+    Args:
+        valor: Serie o DataFrame por dimensiones, (conteos, bordes) de un histograma
+            o {grupo: estadísticos} de un resumen de boxplot/violín
+        agg (str | tuple): Agregación del agregado
+    
+    Returns:
+        pd.DataFrame: Tabla sin índice (las dimensiones pasan a ser columnas)
+    """
+    if isinstance(agg, tuple) and agg[0] == 'hist':
+        conteos, bordes = valor
+        return pd.DataFrame({'borde_inferior': bordes[:-1], 'borde_superior': bordes[1:],
+                             'conteo': conteos})
+    if isinstance(agg, tuple) and agg[0] == 'resumen':
+        # Estadísticos escalares por grupo y los atípicos como lista; la KDE es solo
+        # la curva de dibujo y se omite
+        grupos = {None: valor} if 'mediana' in valor else valor
+        filas = [{'grupo': None if grupo is None else str(grupo),
+                  **{k: v for k, v in resumen.items() if k not in ('kde', 'atipicos')},
+                  'atipicos': np.asarray(resumen['atipicos'], dtype='float64')}
+                 for grupo, resumen in grupos.items()]
+        return pd.DataFrame(filas)
+    if agg == 'corr' and isinstance(valor, dict):
+        return pd.concat({str(grupo): matriz.rename_axis('variable') for grupo, matriz in valor.items()},
+                         names=['grupo']).reset_index()
+    if agg == 'corr':
+        return valor.rename_axis('variable').reset_index()
+    tabla = valor.reset_index()
+    if isinstance(valor, pd.Series):
+        tabla = tabla.rename(columns={tabla.columns[-1]: valor.name or 'valor'})
+    return tabla
+
+def tablas_exportacion(df, agregados):
+    """
+    Reúne los agregados que consumen las gráficas como tablas planas
+    
+    Incluye las vistas ya derivadas que usan las gráficas (ventas mensuales, top 10 de
+    subcategorías y matrices de correlación) además de cada agregado de AGREGADOS_GRAFICAS.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado (o muestra)
+        agregados (dict): Caché de agregados; los que falten se calculan y se memorizan
+    
+    Returns:
+        dict: {nombre: (clave del agregado, pd.DataFrame)}
+    """
+    tablas = {
+        'ventas_mensuales': (('Sales', ('Fecha',), 'sum'), obtener_ventas_mensuales(df, agregados)),
+        'top_subcategorias': (('Sales', ('Sub-Category',), 'sum'), obtener_agregado(
+            df, agregados, 'Sales', ('Sub-Category',), 'sum').nlargest(10).reset_index()),
+        'correlacion': ((COLUMNAS_CORRELACION, (), 'corr'), _tabla_agregado(obtener_agregado(
+            df, agregados, COLUMNAS_CORRELACION, (), 'corr'), 'corr')),
+        'correlacion_por_market': ((COLUMNAS_CORRELACION, ('Market',), 'corr'), _tabla_agregado(
+            obtener_agregado(df, agregados, COLUMNAS_CORRELACION, ('Market',), 'corr'), 'corr')),
+    }
+    for medida, dimensiones, agg in AGREGADOS_GRAFICAS:
+        valor = obtener_agregado(df, agregados, medida, dimensiones, agg)
+        tablas[_nombre_tabla(medida, dimensiones, agg)] = ((medida, dimensiones, agg),
+                                                           _tabla_agregado(valor, agg))
+    return tablas
+
+def _escribir_tabla(tabla, ruta, formato, compresion):
+    """
+    Escribe una tabla en Parquet (grupos de filas con estadísticas) o Arrow IPC
+    """
+    if formato == 'parquet':
+        tabla.to_parquet(ruta, engine='pyarrow', index=False, compression=compresion,
+                         row_group_size=FILAS_POR_GRUPO_EXPORTACION, write_statistics=True)
+    else:
+        tabla.to_feather(ruta, compression=compresion or 'uncompressed',
+                         chunksize=FILAS_POR_GRUPO_EXPORTACION)
+
+def exportar_datos(df, agregados, directorio, formato='parquet', compresion=None,
+                   incluir_datos=True):
+    """
+    Exporta el dataset preparado y los agregados de las gráficas en formato columnar
+    
+    Cada tabla se escribe en su archivo (Parquet comprimido con estadísticas por grupo de
+    filas, o Arrow IPC legible con memory mapping) junto a un manifiesto JSON con la clave
+    del agregado, filas y columnas de cada una. El dataset se ordena por 'Order Date' para
+    que las estadísticas de fecha de cada grupo de filas permitan filtrar sin leerlo entero.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado
+        agregados (dict): Caché de agregados
+        directorio (str): Directorio de exportación
+        formato (str): 'parquet' o 'arrow'
+        compresion (str, optional): Códec (por defecto el de COMPRESION_EXPORTACION: zstd en
+            Parquet y sin comprimir en Arrow, que así se lee con memory mapping sin copias)
+        incluir_datos (bool): Exportar también las filas (no si df es solo una muestra)
+    
+    Returns:
+        dict: Manifiesto de la exportación o None si PyArrow no está disponible
+    """
+    if not PYARROW_DISPONIBLE:
+        print("❌ La exportación columnar requiere PyArrow")
+        return None
+    compresion = compresion or COMPRESION_EXPORTACION[formato]
+    extension = FORMATOS_EXPORTACION[formato]
+    os.makedirs(directorio, exist_ok=True)
+    
+    tablas = tablas_exportacion(df, agregados)
+    if incluir_datos:
+        datos = df.sort_values('Order Date', kind='stable').reset_index(drop=True)
+        tablas = {'datos': (None, datos), **tablas}
+    else:
+        print("⚠️ Los datos en memoria son una muestra: solo se exportan los agregados")
+    
+    manifiesto = {'formato': formato, 'compresion': compresion,
+                  'fecha': datetime.now().isoformat(timespec='seconds'), 'tablas': {}}
+    for nombre, (clave, tabla) in tablas.items():
+        archivo = nombre + extension
+        _escribir_tabla(tabla, os.path.join(directorio, archivo), formato, compresion)
+        manifiesto['tablas'][nombre] = {
+            'archivo': archivo,
+            'agregado': None if clave is None else repr(clave),
+            'filas': len(tabla),
+            'columnas': [str(columna) for columna in tabla.columns],
+        }
+    with open(os.path.join(directorio, 'manifiesto.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    
+    tamano = sum(os.path.getsize(os.path.join(directorio, t['archivo']))
+                 for t in manifiesto['tablas'].values())
+    print(f"📦 Exportadas {len(tablas)} tablas en {formato} ({compresion}) a {directorio}: "
+          f"{tamano / 1024 ** 2:.1f} MB")
+    return manifiesto
+
+def _actualizar_huella(sha, valor):
+    """
+    Añade al hash el contenido de un agregado (Series, DataFrame, arrays, tuplas o dicts)
+    """
+    if isinstance(valor, (pd.Series, pd.DataFrame)):
+        sha.update(repr((type(valor).__name__, getattr(valor, 'name', None),
+                         list(getattr(valor, 'columns', [])), str(valor.dtypes))).encode())
+        sha.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+    elif isinstance(valor, np.ndarray):
+        sha.update(repr((valor.dtype.str, valor.shape)).encode())
+        sha.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        for clave in sorted(valor, key=repr):
+            sha.update(repr(clave).encode())
+            _actualizar_huella(sha, valor[clave])
+    elif isinstance(valor, (tuple, list)):
+        sha.update(f"{type(valor).__name__}{len(valor)}".encode())
+        for elemento in valor:
+            _actualizar_huella(sha, elemento)
+    else:
+        sha.update(repr(valor).encode())
+    sha.update(b'\0')
+
+def huella_figura(nombre, df, agregados=None, parametros=()):
+    """
+    Huella de una figura a partir solo de las entradas que lee y de sus parámetros
+    
+    Cada entrada de ENTRADAS_FIGURAS[nombre] aporta el valor de su agregado, o las
+    columnas que se dibujan fila a fila junto con CONFIG_DISPERSION. Así una figura
+    tiene la misma clave aunque se genere desde otro subcomando o con otros agregados
+    en memoria, y solo se recorren las filas de las figuras que las dibujan.
+    
+    Args:
+        nombre (str): Nombre de la figura en ENTRADAS_FIGURAS
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Caché de agregados (los que falten se calculan)
+        parametros (tuple): Parámetros de dibujo propios (p. ej. resolución y tamaño)
+    
+    Returns:
+        str | None: Huella hexadecimal, o None si la caché de figuras está desactivada
+    """
+    if CONFIG_CACHE_FIGURAS['directorio'] is None:
+        return None
+    sha = hashlib.sha256()
+    _actualizar_huella(sha, (nombre, parametros))
+    for entrada in ENTRADAS_FIGURAS[nombre]:
+        sha.update(repr(entrada).encode())
+        if entrada[0] == 'filas':
+            _actualizar_huella(sha, df[list(entrada[1])])
+            _actualizar_huella(sha, CONFIG_DISPERSION)
+        else:
+            _actualizar_huella(sha, obtener_agregado(df, agregados, *entrada))
+    return sha.hexdigest()
+
+def _firma_codigo():
+    """
+    Hash del código de este módulo: cualquier cambio en las gráficas invalida la caché
+    """
+    if 'firma_codigo' not in CONFIG_CACHE_FIGURAS:
+        CONFIG_CACHE_FIGURAS['firma_codigo'] = _hash_archivo(os.path.abspath(__file__))
+    return CONFIG_CACHE_FIGURAS['firma_codigo']
+
+def ruta_figura_cache(huella):
+    """
+    Ruta en la caché de la figura con una huella de huella_figura
+    
+    Args:
+        huella (str | None): Huella de la figura
+    
+    Returns:
+        str | None: Ruta del PNG en la caché, o None si la caché está desactivada
+    """
+    if CONFIG_CACHE_FIGURAS['directorio'] is None or huella is None:
+        return None
+    sha = hashlib.sha256()
+    for parte in (huella, _firma_codigo(), matplotlib.__version__):
+        sha.update(str(parte).encode())
+        sha.update(b'\0')
+    return os.path.join(CONFIG_CACHE_FIGURAS['directorio'], f"{sha.hexdigest()[:32]}.png")
+
+def figura_en_cache(huella):
+    """
+    Indica si la figura con esa huella está en la caché
+    """
+    ruta = ruta_figura_cache(huella)
+    return ruta is not None and os.path.exists(ruta)
+
+def restaurar_figura_cache(huella, destino):
+    """
+    Copia una figura desde la caché al destino y la marca como usada recientemente
+    
+    Args:
+        huella (str | None): Huella de la figura
+        destino (str): Ruta del PNG de salida
+    
+    Returns:
+        bool: True si estaba en la caché y se ha copiado
+    """
+    if not figura_en_cache(huella):
+        return False
+    ruta = ruta_figura_cache(huella)
+    shutil.copyfile(ruta, destino)
+    # El acceso marca el uso (política lru) y la modificación conserva la antigüedad (fifo)
+    os.utime(ruta, (time.time(), os.stat(ruta).st_mtime))
+    print(f"♻️ Figura reutilizada de la caché: {destino}")
+    return True
+
+def leer_figura_cache(huella):
+    """
+    Contenido PNG de una figura de la caché (marcándola como usada) o None si no está
+    """
+    ruta = ruta_figura_cache(huella)
+    if ruta is None:
+        return None
+    try:
+        with open(ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        os.utime(ruta, (time.time(), os.stat(ruta).st_mtime))
+    except FileNotFoundError:
+        # Puede haberse expulsado entre la comprobación y la lectura
+        return None
+    return contenido
+
+def escribir_figura_cache(huella, contenido):
+    """
+    Guarda el contenido PNG de una figura en la caché (escritura atómica)
+    """
+    ruta_cache = ruta_figura_cache(huella)
+    if ruta_cache is None:
+        return
+    os.makedirs(CONFIG_CACHE_FIGURAS['directorio'], exist_ok=True)
+    temporal = f"{ruta_cache}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, 'wb') as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta_cache)
+
+def guardar_figura_cache(ruta, huella):
+    """
+    Añade a la caché una figura ya guardada en disco
+    """
+    if ruta_figura_cache(huella) is None:
+        return
+    with open(ruta, 'rb') as archivo:
+        escribir_figura_cache(huella, archivo.read())
+
+def mostrar_figura_cache(huella, max_pulgadas=20):
+    """
+    Muestra en pantalla una figura de la caché con imshow, sin volver a dibujarla
+    
+    Args:
+        huella (str): Huella de la figura
+        max_pulgadas (float): Lado máximo de la ventana en pulgadas
+    """
+    imagen = plt.imread(io.BytesIO(leer_figura_cache(huella)), format='png')
+    alto, ancho = imagen.shape[:2]
+    escala = min(1, max_pulgadas * 100 / max(alto, ancho))
+    fig = plt.figure(figsize=(ancho * escala / 100, alto * escala / 100))
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.imshow(imagen)
+    ax.axis('off')
+    plt.show()
+
+def recortar_cache_figuras():
+    """
+    Expulsa figuras de la caché según la política hasta no superar max_mb
+    
+    Returns:
+        int: Número de figuras expulsadas
+    """
+    directorio = CONFIG_CACHE_FIGURAS['directorio']
+    if directorio is None or not os.path.isdir(directorio):
+        return 0
+    estados = [(os.path.join(directorio, nombre), os.stat(os.path.join(directorio, nombre)))
+               for nombre in os.listdir(directorio) if nombre.endswith('.png')]
+    estados.sort(key=lambda item: POLITICAS_CACHE_FIGURAS[CONFIG_CACHE_FIGURAS['politica']](item[1]))
+    total = sum(estado.st_size for _, estado in estados)
+    expulsadas = 0
+    for ruta, estado in estados:
+        if total <= CONFIG_CACHE_FIGURAS['max_mb'] * 2**20:
+            break
+        os.remove(ruta)
+        total -= estado.st_size
+        expulsadas += 1
+    if expulsadas:
+        print(f"🧹 Caché de figuras: {expulsadas} figuras expulsadas ({CONFIG_CACHE_FIGURAS['politica']})")
+    return expulsadas
+
+def entradas_modificadas(nombre, cambios):
+    """
+    Indica si alguna entrada de la figura (ENTRADAS_FIGURAS) cambió en modo incremental
+    
+    Los agregados incrementales cambian si su clave está en cambios; las filas dibujadas
+    directamente y los histogramas y resúmenes, que se recalculan desde las filas,
+    cambian si hubo filas nuevas.
+    
+    Args:
+        nombre (str): Nombre de la figura
+        cambios (set | None): Claves modificadas según cargar_incremental (None: todo)
+    
+    Returns:
+        bool: True si hay que volver a renderizar la figura
+    """
+    if cambios is None:
+        return True
+    return any(entrada in cambios if entrada in AGREGADOS_INCREMENTALES else 'filas' in cambios
+               for entrada in ENTRADAS_FIGURAS[nombre])
+
+def reutilizar_figura(nombre, df, agregados=None, parametros=(), destino=None):
+    """
+    Indica si se puede conservar la figura sin dibujarla (se consulta antes de dibujar)
+    
+    En modo batch incremental se conserva la figura ya guardada en el directorio de
+    salida si ninguna de sus entradas cambió desde la ejecución anterior. Si no, y la
+    figura está en la caché de figuras, se copia al directorio de salida o, en modo
+    interactivo, se muestra la imagen guardada. Si hay que dibujarla, su huella queda
+    pendiente para que finalizar_figura la añada a la caché.
+    
+    Args:
+        nombre (str): Nombre de la figura sin extensión
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Caché de agregados
+        parametros (tuple): Parámetros de dibujo propios de la figura
+        destino (str, optional): Ruta donde copiar también la figura en modo interactivo
+    
+    Returns:
+        bool: True si no hay que dibujar la figura
+    """
+    directorio, cambios = CONFIG_SALIDA['directorio'], CONFIG_SALIDA['cambios']
+    if directorio is not None and cambios is not None:
+        ruta = os.path.join(directorio, f"{nombre}.png")
+        if os.path.exists(ruta) and not entradas_modificadas(nombre, cambios):
+            print(f"⏭️ Figura sin cambios en sus entradas: {ruta}")
+            return True
+    
+    huella = huella_figura(nombre, df, agregados, parametros)
+    if not figura_en_cache(huella):
+        _HUELLAS_PENDIENTES[nombre] = huella
+        return False
+    if directorio is not None:
+        restaurar_figura_cache(huella, os.path.join(directorio, f"{nombre}.png"))
+    elif destino is not None:
+        restaurar_figura_cache(huella, destino)
+        mostrar_figura_cache(huella)
+    else:
+        print(f"♻️ Figura reutilizada de la caché: {nombre}")
+        mostrar_figura_cache(huella)
+    return True
+
+def finalizar_figura(fig, nombre, ruta_guardada=None, **kwargs_guardado):
     """
-    Carga y prepara el dataset superstore_dataset2012.csv
+    Muestra la figura o, en modo batch, la guarda en el directorio de salida y la cierra
+    
+    Si reutilizar_figura dejó pendiente su huella, la imagen se añade a la caché de
+    figuras (en modo interactivo desde ruta_guardada si ya se guardó en disco).
+    
+    Args:
+        fig (matplotlib.figure.Figure): Figura terminada
+        nombre (str): Nombre del archivo sin extensión
+        ruta_guardada (str, optional): PNG ya guardado de la figura en modo interactivo
+        **kwargs_guardado: Argumentos adicionales para savefig
     
     Returns:
-        pd.DataFrame: Dataset preparado y limpio
+        str | None: Ruta de la imagen guardada o None en modo interactivo
     """
-    try:
-        # Ruta absoluta del dataset
-        ruta_dataset = r'c:\Users\jnya\OneDrive - GFT Technologies SE\Formación\UNIR\Nivelacion\w04\superstore_dataset2012.csv'
-        
-        print("📊 Cargando dataset superstore_dataset2012.csv...")
-        df = pd.read_csv(ruta_dataset, encoding='utf-8')
-        
-        print(f"✅ Dataset cargado exitosamente: {df.shape[0]} filas, {df.shape[1]} columnas")
-        
-        # Exploración inicial
-        print("\n🔍 EXPLORACIÓN INICIAL DEL DATASET")
-        print("=" * 50)
-        print(f"Forma del dataset: {df.shape}")
-        print(f"\nColumnas: {list(df.columns)}")
-        print(f"\nTipos de datos:")
-        print(df.dtypes)
-        print(f"\nValores nulos por columna:")
-        print(df.isnull().sum())
-        
-        # Conversión de fechas
-        print("\n🔧 Preparando datos...")
-        df['Order Date'] = pd.to_datetime(df['Order Date'], dayfirst=True, errors='coerce')
-        df['Ship Date'] = pd.to_datetime(df['Ship Date'], dayfirst=True, errors='coerce')
-        
-        # Crear columnas adicionales para análisis
-        df['Year'] = df['Order Date'].dt.year
-        df['Month'] = df['Order Date'].dt.month
-        df['Quarter'] = df['Order Date'].dt.quarter
-        df['Profit_Margin'] = (df['Profit'] / df['Sales']) * 100
-        
-        # Limpiar valores infinitos y NaN en Profit_Margin
-        df['Profit_Margin'] = df['Profit_Margin'].replace([np.inf, -np.inf], np.nan)
-        df['Profit_Margin'] = df['Profit_Margin'].fillna(0)
-        
-        print("✅ Datos preparados correctamente")
-        print(f"\nPrimeras 5 filas del dataset preparado:")
-        print(df.head())
-        
-        return df
-        
-    except FileNotFoundError:
-        print(f"❌ Error: No se pudo encontrar el archivo {ruta_dataset}")
-        return None
-    except Exception as e:
-        print(f"❌ Error al cargar el dataset: {str(e)}")
+    huella = _HUELLAS_PENDIENTES.pop(nombre, None)
+    directorio = CONFIG_SALIDA['directorio']
+    if directorio is None:
+        if ruta_guardada is not None:
+            guardar_figura_cache(ruta_guardada, huella)
+        elif ruta_figura_cache(huella) is not None:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', **kwargs_guardado)
+            escribir_figura_cache(huella, buffer.getvalue())
+        plt.show()
         return None
+    
+    ruta = os.path.join(directorio, f"{nombre}.png")
+    fig.savefig(ruta, **kwargs_guardado)
+    guardar_figura_cache(ruta, huella)
+    plt.close(fig)
+    print(f"💾 Figura guardada: {ruta}")
+    return ruta
+
+def reducir_puntos(datos, max_puntos, estrato=None, semilla=42):
+    """
+    Reduce un DataFrame a como máximo max_puntos filas (aprox. en modo estratificado)
+    
+    Con estrato, cada grupo conserva su proporción y al menos una fila, de modo que
+    las categorías pequeñas no desaparecen del gráfico.
+    
+    Args:
+        datos (pd.DataFrame): Filas a reducir
+        max_puntos (int): Presupuesto de filas
+        estrato (str | list, optional): Columna(s) de estratificación
+        semilla (int): Semilla del muestreo
+    
+    Returns:
+        pd.DataFrame: Filas seleccionadas en su orden original
+    """
+    if len(datos) <= max_puntos:
+        return datos
+    if estrato is None:
+        return datos.sample(n=max_puntos, random_state=semilla).sort_index()
+    
+    rng = np.random.default_rng(semilla)
+    barajado = datos.iloc[np.argsort(rng.random(len(datos)))]
+    grupos = barajado.groupby(estrato, observed=True)
+    cuota = np.ceil(grupos[barajado.columns[0]].transform('size') * max_puntos / len(datos))
+    return barajado[grupos.cumcount() < cuota].sort_index()
+
+def dibujar_dispersion(ax, datos, x, y, columna_color=None, **kwargs_scatter):
+    """
+    Dibuja un gráfico de dispersión respetando el presupuesto de CONFIG_DISPERSION
+    
+    Args:
+        ax (matplotlib.axes.Axes): Eje donde dibujar
+        datos (pd.DataFrame): Filas a representar
+        x (str): Columna del eje X
+        y (str): Columna del eje Y
+        columna_color (str, optional): Columna que codifica el color (media por celda en densidad)
+        **kwargs_scatter: Argumentos para ax.scatter (cmap se usa también en densidad)
+    
+    Returns:
+        matplotlib.cm.ScalarMappable: Objeto dibujado, útil para la barra de color
+    """
+    config = CONFIG_DISPERSION
+    max_puntos = config['max_puntos']
+    modo = config['modo']
+    
+    if len(datos) <= max_puntos or modo in ('muestra', 'estratificado'):
+        estrato = config['estrato'] if modo == 'estratificado' else None
+        datos = reducir_puntos(datos, max_puntos, estrato, config['semilla'])
+        if columna_color is not None:
+            kwargs_scatter['c'] = datos[columna_color]
+        return ax.scatter(datos[x], datos[y], **kwargs_scatter)
+    
+    # Modos de densidad: el coste de dibujo depende de la rejilla, no del número de filas
+    cmap = kwargs_scatter.get('cmap', 'viridis')
+    valores_x = datos[x].to_numpy(dtype=float)
+    valores_y = datos[y].to_numpy(dtype=float)
+    valores_c = None if columna_color is None else datos[columna_color].to_numpy(dtype=float)
+    rejilla = config['tamano_rejilla']
+    
+    if modo == 'hexbin':
+        if valores_c is None:
+            return ax.hexbin(valores_x, valores_y, gridsize=rejilla, cmap=cmap, mincnt=1, bins='log')
+        return ax.hexbin(valores_x, valores_y, C=valores_c, reduce_C_function=np.mean,
+                         gridsize=rejilla, cmap=cmap, mincnt=1)
+    
+    conteos, bordes_x, bordes_y = np.histogram2d(valores_x, valores_y, bins=rejilla)
+    if valores_c is None:
+        celdas = np.where(conteos > 0, conteos, np.nan)
+        return ax.pcolormesh(bordes_x, bordes_y, celdas.T, cmap=cmap, norm='log')
+    
+    sumas, _, _ = np.histogram2d(valores_x, valores_y, bins=[bordes_x, bordes_y], weights=valores_c)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        celdas = np.where(conteos > 0, sumas / conteos, np.nan)
+    return ax.pcolormesh(bordes_x, bordes_y, celdas.T, cmap=cmap)
+
+def _dispersion_en_faceta(x, y, data=None, **kwargs):
+    """
+    Adaptador de dibujar_dispersion para FacetGrid.map_dataframe
+    """
+    dibujar_dispersion(plt.gca(), data, x, y, **kwargs)
+
+def dibujar_regresion(ax, datos, x, y, z=1.96, color_linea='red', **kwargs_scatter):
+    """
+    Dispersión con recta de mínimos cuadrados y banda de confianza en forma cerrada
+    
+    Sustituye al bootstrap de sns.regplot: la recta y el error estándar de la media
+    predicha se calculan en una sola pasada vectorizada sobre todas las filas, y los
+    puntos se dibujan respetando el presupuesto de CONFIG_DISPERSION.
+    
+    Args:
+        ax (matplotlib.axes.Axes): Eje donde dibujar
+        datos (pd.DataFrame): Filas a representar
+        x (str): Columna del eje X
+        y (str): Columna del eje Y
+        z (float): Cuantil normal del intervalo de confianza (1.96 = 95%)
+        color_linea (str): Color de la recta y de la banda
+        **kwargs_scatter: Argumentos para la dispersión
+    """
+    dibujar_dispersion(ax, datos, x, y, **kwargs_scatter)
+    
+    valores_x = datos[x].to_numpy(dtype=float)
+    valores_y = datos[y].to_numpy(dtype=float)
+    validos = np.isfinite(valores_x) & np.isfinite(valores_y)
+    valores_x, valores_y = valores_x[validos], valores_y[validos]
+    n = len(valores_x)
+    if n < 3:
+        return
+    
+    media_x, media_y = valores_x.mean(), valores_y.mean()
+    sxx = np.sum((valores_x - media_x) ** 2)
+    pendiente = np.sum((valores_x - media_x) * (valores_y - media_y)) / sxx
+    intercepto = media_y - pendiente * media_x
+    varianza_residual = np.sum((valores_y - intercepto - pendiente * valores_x) ** 2) / (n - 2)
+    
+    rejilla = np.linspace(valores_x.min(), valores_x.max(), 100)
+    prediccion = intercepto + pendiente * rejilla
+    error = np.sqrt(varianza_residual * (1 / n + (rejilla - media_x) ** 2 / sxx))
+    ax.plot(rejilla, prediccion, color=color_linea)
+    ax.fill_between(rejilla, prediccion - z * error, prediccion + z * error, color=color_linea, alpha=0.15)
+
+def escala_correlacion(matriz):
+    """
+    Límites de color para un heatmap de correlación
+    
+    Una matriz sin valores finitos (p. ej. un filtro con un solo pedido, donde ninguna
+    varianza está definida) usa la escala completa de -1 a 1; en otro caso seaborn la
+    toma de los datos.
+    
+    Args:
+        matriz (pd.DataFrame): Matriz de correlación
+    
+    Returns:
+        dict: Argumentos vmin/vmax para sns.heatmap (vacío si hay valores finitos)
+    """
+    if np.isfinite(matriz.to_numpy(dtype=float)).any():
+        return {}
+    return {'vmin': -1, 'vmax': 1}
+
+def dibujar_boxplot(ax, resumenes, x, y, palette):
+    """
+    Dibuja boxplots por grupo a partir de resúmenes precalculados (sin recorrer filas)
+    
+    Args:
+        ax (matplotlib.axes.Axes): Eje donde dibujar
+        resumenes (dict): {grupo: resumen} de resumen_distribucion
+        x (str): Nombre de la dimensión (etiqueta del eje X)
+        y (str): Nombre de la medida (etiqueta del eje Y)
+        palette (str): Paleta de seaborn para las cajas
+    """
+    importar_seaborn()
+    estadisticas = [{
+        'label': str(grupo),
+        'med': resumen['mediana'],
+        'q1': resumen['q1'],
+        'q3': resumen['q3'],
+        'whislo': resumen['bigote_inf'],
+        'whishi': resumen['bigote_sup'],
+        'fliers': resumen['atipicos'],
+    } for grupo, resumen in resumenes.items()]
+    posiciones = np.arange(len(estadisticas))
+    artistas = ax.bxp(estadisticas, positions=posiciones, widths=0.8, patch_artist=True,
+                      medianprops={'color': '0.25'},
+                      flierprops={'marker': 'o', 'markerfacecolor': 'none', 'markeredgecolor': '0.4'})
+    for caja, color in zip(artistas['boxes'], sns.color_palette(palette, len(estadisticas))):
+        caja.set_facecolor(color)
+    ax.set_xticks(posiciones, [e['label'] for e in estadisticas])
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+
+def dibujar_violin(ax, resumenes, x, y, palette):
+    """
+    Dibuja violines por grupo desde la KDE precalculada, con caja interior como seaborn
+    
+    Args:
+        ax (matplotlib.axes.Axes): Eje donde dibujar
+        resumenes (dict): {grupo: resumen} de resumen_distribucion
+        x (str): Nombre de la dimensión (etiqueta del eje X)
+        y (str): Nombre de la medida (etiqueta del eje Y)
+        palette (str): Paleta de seaborn para los violines
+    """
+    importar_seaborn()
+    estadisticas = [{
+        'coords': resumen['kde'][0],
+        'vals': resumen['kde'][1],
+        'mean': resumen['media'],
+        'median': resumen['mediana'],
+        'min': resumen['minimo'],
+        'max': resumen['maximo'],
+    } for resumen in resumenes.values()]
+    posiciones = np.arange(len(estadisticas))
+    artistas = ax.violin(estadisticas, positions=posiciones, widths=0.8,
+                         showmeans=False, showextrema=False, showmedians=False)
+    for cuerpo, color in zip(artistas['bodies'], sns.color_palette(palette, len(estadisticas))):
+        cuerpo.set_facecolor(color)
+        cuerpo.set_edgecolor('0.25')
+        cuerpo.set_alpha(1)
+    
+    # Caja interior: bigotes, rango intercuartílico y mediana
+    resumen_lista = list(resumenes.values())
+    ax.vlines(posiciones, [r['bigote_inf'] for r in resumen_lista], [r['bigote_sup'] for r in resumen_lista],
+              color='0.25', linewidth=1)
+    ax.vlines(posiciones, [r['q1'] for r in resumen_lista], [r['q3'] for r in resumen_lista],
+              color='0.25', linewidth=4)
+    ax.scatter(posiciones, [r['mediana'] for r in resumen_lista], color='white', s=12, zorder=3)
+    ax.set_xticks(posiciones, [str(grupo) for grupo in resumenes])
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
 
-def visualizaciones_univariantes_matplotlib(df):
+def visualizaciones_univariantes_matplotlib(df, agregados=None):
     """
     Crea visualizaciones univariantes usando Matplotlib
     
     Args:
-        df (pd.DataFrame): Dataset preparado
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Agregados precalculados por (medida, dimensiones, agg)
     """
     print("\n📈 CREANDO VISUALIZACIONES UNIVARIANTES CON MATPLOTLIB")
     print("=" * 60)
     
-    # Crear figura con subplots
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    fig.suptitle('Análisis Univariante con Matplotlib - Dataset Superstore 2012', fontsize=16, fontweight='bold')
-    
-    # 1. Histograma de Ventas
-    axes[0, 0].hist(df['Sales'], bins=50, color='skyblue', alpha=0.7, edgecolor='black')
-    axes[0, 0].set_title('Distribución de Ventas', fontweight='bold')
-    axes[0, 0].set_xlabel('Ventas ($)')
-    axes[0, 0].set_ylabel('Frecuencia')
-    axes[0, 0].grid(True, alpha=0.3)
-    
-    # 2. Diagrama de barras de Categorías
-    category_counts = df['Category'].value_counts()
-    axes[0, 1].bar(category_counts.index, category_counts.values, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
-    axes[0, 1].set_title('Frecuencia por Categoría de Producto', fontweight='bold')
-    axes[0, 1].set_xlabel('Categoría')
-    axes[0, 1].set_ylabel('Número de Órdenes')
-    axes[0, 1].tick_params(axis='x', rotation=45)
-    
-    # 3. Histograma de Beneficios
-    axes[1, 0].hist(df['Profit'], bins=50, color='lightgreen', alpha=0.7, edgecolor='black')
-    axes[1, 0].set_title('Distribución de Beneficios', fontweight='bold')
-    axes[1, 0].set_xlabel('Beneficio ($)')
-    axes[1, 0].set_ylabel('Frecuencia')
-    axes[1, 0].grid(True, alpha=0.3)
-    axes[1, 0].axvline(x=0, color='red', linestyle='--', alpha=0.7, label='Punto de equilibrio')
-    axes[1, 0].legend()
-    
-    # 4. Diagrama de barras de Segmentos
-    segment_counts = df['Segment'].value_counts()
-    axes[1, 1].bar(segment_counts.index, segment_counts.values, color=['#FFD93D', '#6BCF7F', '#4D96FF'])
-    axes[1, 1].set_title('Distribución por Segmento de Cliente', fontweight='bold')
-    axes[1, 1].set_xlabel('Segmento')
-    axes[1, 1].set_ylabel('Número de Órdenes')
-    
-    plt.tight_layout()
-    plt.show()
+    if not reutilizar_figura('univariantes_matplotlib', df, agregados):
+        # Crear figura con subplots
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig.suptitle('Análisis Univariante con Matplotlib - Dataset Superstore 2012', fontsize=16, fontweight='bold')
+        
+        # 1. Histograma de Ventas
+        conteos, bordes = obtener_agregado(df, agregados, 'Sales', (), ('hist', 50))
+        axes[0, 0].hist(bordes[:-1], bins=bordes, weights=conteos, color='skyblue', alpha=0.7, edgecolor='black')
+        axes[0, 0].set_title('Distribución de Ventas', fontweight='bold')
+        axes[0, 0].set_xlabel('Ventas ($)')
+        axes[0, 0].set_ylabel('Frecuencia')
+        axes[0, 0].grid(True, alpha=0.3)
+        
+        # 2. Diagrama de barras de Categorías
+        category_counts = obtener_agregado(df, agregados, 'conteo', ('Category',), 'count')
+        axes[0, 1].bar(category_counts.index, category_counts.values, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
+        axes[0, 1].set_title('Frecuencia por Categoría de Producto', fontweight='bold')
+        axes[0, 1].set_xlabel('Categoría')
+        axes[0, 1].set_ylabel('Número de Órdenes')
+        axes[0, 1].tick_params(axis='x', rotation=45)
+        
+        # 3. Histograma de Beneficios
+        conteos, bordes = obtener_agregado(df, agregados, 'Profit', (), ('hist', 50))
+        axes[1, 0].hist(bordes[:-1], bins=bordes, weights=conteos, color='lightgreen', alpha=0.7, edgecolor='black')
+        axes[1, 0].set_title('Distribución de Beneficios', fontweight='bold')
+        axes[1, 0].set_xlabel('Beneficio ($)')
+        axes[1, 0].set_ylabel('Frecuencia')
+        axes[1, 0].grid(True, alpha=0.3)
+        axes[1, 0].axvline(x=0, color='red', linestyle='--', alpha=0.7, label='Punto de equilibrio')
+        axes[1, 0].legend()
+        
+        # 4. Diagrama de barras de Segmentos
+        segment_counts = obtener_agregado(df, agregados, 'conteo', ('Segment',), 'count')
+        axes[1, 1].bar(segment_counts.index, segment_counts.values, color=['#FFD93D', '#6BCF7F', '#4D96FF'])
+        axes[1, 1].set_title('Distribución por Segmento de Cliente', fontweight='bold')
+        axes[1, 1].set_xlabel('Segmento')
+        axes[1, 1].set_ylabel('Número de Órdenes')
+        
+        plt.tight_layout()
+        finalizar_figura(fig, 'univariantes_matplotlib')
     
     # Conclusiones
     print("\n📋 CONCLUSIONES - Visualizaciones Univariantes (Matplotlib):")
@@ -134,50 +2916,59 @@ def visualizaciones_univariantes_matplotlib(df):
     print("• Los beneficios muestran una distribución normal con algunos valores negativos (pérdidas)")
     print("• El segmento Consumer representa la mayor parte de las ventas")
 
-def visualizaciones_univariantes_seaborn(df):
+def visualizaciones_univariantes_seaborn(df, agregados=None):
     """
     Crea visualizaciones univariantes usando Seaborn
     
     Args:
-        df (pd.DataFrame): Dataset preparado
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Agregados precalculados por (medida, dimensiones, agg)
     """
     print("\n📈 CREANDO VISUALIZACIONES UNIVARIANTES CON SEABORN")
     print("=" * 55)
     
-    # Crear figura con subplots
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    fig.suptitle('Análisis Univariante con Seaborn - Dataset Superstore 2012', fontsize=16, fontweight='bold')
-    
-    # 1. Boxplot de Ventas por Categoría
-    sns.boxplot(data=df, x='Category', y='Sales', ax=axes[0, 0], palette='Set2')
-    axes[0, 0].set_title('Distribución de Ventas por Categoría', fontweight='bold')
-    axes[0, 0].set_xlabel('Categoría')
-    axes[0, 0].set_ylabel('Ventas ($)')
-    axes[0, 0].tick_params(axis='x', rotation=45)
-    
-    # 2. Violinplot de Beneficios por Segmento
-    sns.violinplot(data=df, x='Segment', y='Profit', ax=axes[0, 1], palette='viridis')
-    axes[0, 1].set_title('Distribución de Beneficios por Segmento', fontweight='bold')
-    axes[0, 1].set_xlabel('Segmento')
-    axes[0, 1].set_ylabel('Beneficio ($)')
-    
-    # 3. Distribución de Descuentos
-    sns.histplot(data=df, x='Discount', bins=30, kde=True, ax=axes[1, 0], color='coral')
-    axes[1, 0].set_title('Distribución de Descuentos', fontweight='bold')
-    axes[1, 0].set_xlabel('Descuento')
-    axes[1, 0].set_ylabel('Frecuencia')
-    
-    # 4. Boxplot de Margen de Beneficio por Región
-    # Filtrar valores extremos para mejor visualización
-    df_filtered = df[(df['Profit_Margin'] >= -100) & (df['Profit_Margin'] <= 100)]
-    sns.boxplot(data=df_filtered, x='Region', y='Profit_Margin', ax=axes[1, 1], palette='coolwarm')
-    axes[1, 1].set_title('Margen de Beneficio por Región', fontweight='bold')
-    axes[1, 1].set_xlabel('Región')
-    axes[1, 1].set_ylabel('Margen de Beneficio (%)')
-    axes[1, 1].tick_params(axis='x', rotation=45)
-    
-    plt.tight_layout()
-    plt.show()
+    if not reutilizar_figura('univariantes_seaborn', df, agregados):
+        # Crear figura con subplots
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig.suptitle('Análisis Univariante con Seaborn - Dataset Superstore 2012', fontsize=16, fontweight='bold')
+        
+        # 1. Boxplot de Ventas por Categoría
+        resumen_ventas = obtener_agregado(df, agregados, 'Sales', ('Category',), ('resumen',))
+        dibujar_boxplot(axes[0, 0], resumen_ventas, 'Category', 'Sales', palette='Set2')
+        axes[0, 0].set_title('Distribución de Ventas por Categoría', fontweight='bold')
+        axes[0, 0].set_xlabel('Categoría')
+        axes[0, 0].set_ylabel('Ventas ($)')
+        axes[0, 0].tick_params(axis='x', rotation=45)
+        
+        # 2. Violinplot de Beneficios por Segmento
+        resumen_beneficios = obtener_agregado(df, agregados, 'Profit', ('Segment',), ('resumen',))
+        dibujar_violin(axes[0, 1], resumen_beneficios, 'Segment', 'Profit', palette='viridis')
+        axes[0, 1].set_title('Distribución de Beneficios por Segmento', fontweight='bold')
+        axes[0, 1].set_xlabel('Segmento')
+        axes[0, 1].set_ylabel('Beneficio ($)')
+        
+        # 3. Distribución de Descuentos
+        conteos, bordes = obtener_agregado(df, agregados, 'Discount', (), ('hist', 30))
+        resumen_descuento = obtener_agregado(df, agregados, 'Discount', (), ('resumen',))
+        axes[1, 0].hist(bordes[:-1], bins=bordes, weights=conteos, color='coral', alpha=0.75, edgecolor='white')
+        # KDE escalada a frecuencias del histograma
+        rejilla, densidad = resumen_descuento['kde']
+        axes[1, 0].plot(rejilla, densidad * resumen_descuento['n'] * np.diff(bordes).mean(), color='coral')
+        axes[1, 0].set_title('Distribución de Descuentos', fontweight='bold')
+        axes[1, 0].set_xlabel('Descuento')
+        axes[1, 0].set_ylabel('Frecuencia')
+        
+        # 4. Boxplot de Margen de Beneficio por Región
+        # Filtrar valores extremos para mejor visualización
+        resumen_margen = obtener_agregado(df, agregados, 'Profit_Margin', ('Region',), ('resumen', -100, 100))
+        dibujar_boxplot(axes[1, 1], resumen_margen, 'Region', 'Profit_Margin', palette='coolwarm')
+        axes[1, 1].set_title('Margen de Beneficio por Región', fontweight='bold')
+        axes[1, 1].set_xlabel('Región')
+        axes[1, 1].set_ylabel('Margen de Beneficio (%)')
+        axes[1, 1].tick_params(axis='x', rotation=45)
+        
+        plt.tight_layout()
+        finalizar_figura(fig, 'univariantes_seaborn')
     
     # Conclusiones
     print("\n📋 CONCLUSIONES - Visualizaciones Univariantes (Seaborn):")
@@ -186,112 +2977,144 @@ def visualizaciones_univariantes_seaborn(df):
     print("• La mayoría de transacciones no tienen descuento, con concentración en descuentos específicos")
     print("• Las regiones muestran márgenes de beneficio similares con algunas variaciones")
 
-def visualizaciones_bivariantes_matplotlib(df):
+def visualizaciones_bivariantes_matplotlib(df, agregados=None):
     """
     Crea visualizaciones bivariantes usando Matplotlib
     
     Args:
-        df (pd.DataFrame): Dataset preparado
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Agregados precalculados por (medida, dimensiones, agg)
     """
     print("\n📈 CREANDO VISUALIZACIONES BIVARIANTES CON MATPLOTLIB")
     print("=" * 55)
     
-    # Crear figura con subplots
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    fig.suptitle('Análisis Bivariante con Matplotlib - Dataset Superstore 2012', fontsize=16, fontweight='bold')
-    
-    # 1. Gráfico de dispersión: Ventas vs Beneficios
-    scatter = axes[0, 0].scatter(df['Sales'], df['Profit'], alpha=0.6, c=df['Discount'], cmap='viridis', s=30)
-    axes[0, 0].set_title('Relación entre Ventas y Beneficios', fontweight='bold')
-    axes[0, 0].set_xlabel('Ventas ($)')
-    axes[0, 0].set_ylabel('Beneficio ($)')
-    axes[0, 0].grid(True, alpha=0.3)
-    plt.colorbar(scatter, ax=axes[0, 0], label='Descuento')
-    
-    # 2. Evolución temporal de ventas por mes
-    ventas_mensuales = df.groupby(['Year', 'Month'])['Sales'].sum().reset_index()
-    ventas_mensuales['Fecha'] = pd.to_datetime(ventas_mensuales[['Year', 'Month']].assign(day=1))
-    axes[0, 1].plot(ventas_mensuales['Fecha'], ventas_mensuales['Sales'], marker='o', linewidth=2, markersize=4)
-    axes[0, 1].set_title('Evolución Temporal de Ventas Mensuales', fontweight='bold')
-    axes[0, 1].set_xlabel('Fecha')
-    axes[0, 1].set_ylabel('Ventas Totales ($)')
-    axes[0, 1].grid(True, alpha=0.3)
-    axes[0, 1].tick_params(axis='x', rotation=45)
-    
-    # 3. Ventas promedio por categoría y segmento
-    ventas_cat_seg = df.groupby(['Category', 'Segment'])['Sales'].mean().unstack()
-    x = np.arange(len(ventas_cat_seg.index))
-    width = 0.25
-    
-    for i, segment in enumerate(ventas_cat_seg.columns):
-        axes[1, 0].bar(x + i*width, ventas_cat_seg[segment], width, label=segment, alpha=0.8)
-    
-    axes[1, 0].set_title('Ventas Promedio por Categoría y Segmento', fontweight='bold')
-    axes[1, 0].set_xlabel('Categoría')
-    axes[1, 0].set_ylabel('Ventas Promedio ($)')
-    axes[1, 0].set_xticks(x + width)
-    axes[1, 0].set_xticklabels(ventas_cat_seg.index, rotation=45)
-    axes[1, 0].legend()
-    axes[1, 0].grid(True, alpha=0.3)
-    
-    # 4. Relación Cantidad vs Descuento
-    axes[1, 1].scatter(df['Quantity'], df['Discount'], alpha=0.6, c='orange', s=30)
-    axes[1, 1].set_title('Relación entre Cantidad y Descuento', fontweight='bold')
-    axes[1, 1].set_xlabel('Cantidad')
-    axes[1, 1].set_ylabel('Descuento')
-    axes[1, 1].grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.show()
+    if not reutilizar_figura('bivariantes_matplotlib', df, agregados):
+        # Crear figura con subplots
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig.suptitle('Análisis Bivariante con Matplotlib - Dataset Superstore 2012', fontsize=16, fontweight='bold')
+        
+        # 1. Gráfico de dispersión: Ventas vs Beneficios
+        scatter = dibujar_dispersion(axes[0, 0], df, 'Sales', 'Profit', columna_color='Discount', alpha=0.6, cmap='viridis', s=30)
+        axes[0, 0].set_title('Relación entre Ventas y Beneficios', fontweight='bold')
+        axes[0, 0].set_xlabel('Ventas ($)')
+        axes[0, 0].set_ylabel('Beneficio ($)')
+        axes[0, 0].grid(True, alpha=0.3)
+        plt.colorbar(scatter, ax=axes[0, 0], label='Descuento')
+        
+        # 2. Evolución temporal de ventas por mes
+        ventas_mensuales = obtener_ventas_mensuales(df, agregados)
+        media_movil = series.media_movil(ventas_mensuales.set_index('Fecha')['Sales'], ventana=3)
+        axes[0, 1].plot(ventas_mensuales['Fecha'], ventas_mensuales['Sales'], marker='o', linewidth=2, markersize=4,
+                        label='Ventas mensuales')
+        axes[0, 1].plot(media_movil.index, media_movil.values, linestyle='--', linewidth=1.5, color='orange',
+                        label='Media móvil 3 meses')
+        # Tendencia de la descomposición estacional, solo con al menos dos ciclos anuales
+        if len(ventas_mensuales) >= 2 * series.PERIODOS_POR_ANIO['mensual']:
+            componentes = series.descomposicion_estacional(ventas_mensuales.set_index('Fecha')['Sales'])
+            axes[0, 1].plot(componentes.index, componentes['tendencia'], linewidth=2, color='green',
+                            label='Tendencia')
+        axes[0, 1].set_title('Evolución Temporal de Ventas Mensuales', fontweight='bold')
+        axes[0, 1].set_xlabel('Fecha')
+        axes[0, 1].set_ylabel('Ventas Totales ($)')
+        axes[0, 1].legend()
+        axes[0, 1].grid(True, alpha=0.3)
+        axes[0, 1].tick_params(axis='x', rotation=45)
+        
+        # 3. Ventas promedio por categoría y segmento
+        ventas_cat_seg = obtener_agregado(df, agregados, 'Sales', ('Category', 'Segment'), 'mean').unstack()
+        x = np.arange(len(ventas_cat_seg.index))
+        width = 0.25
+        
+        for i, segment in enumerate(ventas_cat_seg.columns):
+            axes[1, 0].bar(x + i*width, ventas_cat_seg[segment], width, label=segment, alpha=0.8)
+        
+        axes[1, 0].set_title('Ventas Promedio por Categoría y Segmento', fontweight='bold')
+        axes[1, 0].set_xlabel('Categoría')
+        axes[1, 0].set_ylabel('Ventas Promedio ($)')
+        axes[1, 0].set_xticks(x + width)
+        axes[1, 0].set_xticklabels(ventas_cat_seg.index, rotation=45)
+        axes[1, 0].legend()
+        axes[1, 0].grid(True, alpha=0.3)
+        
+        # 4. Relación Cantidad vs Descuento
+        dibujar_dispersion(axes[1, 1], df, 'Quantity', 'Discount', alpha=0.6, c='orange', s=30)
+        axes[1, 1].set_title('Relación entre Cantidad y Descuento', fontweight='bold')
+        axes[1, 1].set_xlabel('Cantidad')
+        axes[1, 1].set_ylabel('Descuento')
+        axes[1, 1].grid(True, alpha=0.3)
+        
+        plt.tight_layout()
+        finalizar_figura(fig, 'bivariantes_matplotlib')
+    
+    # Crecimiento del último trimestre respecto al anterior por mercado y por categoría
+    crecimientos = {}
+    for dimension in ('Market', 'Category'):
+        trimestral = obtener_serie_temporal(df, agregados, 'Sales', 'trimestral', dimension)
+        crecimiento = series.metricas_temporales(trimestral, 'trimestral')['crecimiento_intertrimestral']
+        ultimo = crecimiento.xs(trimestral.index[-1], level='Fecha').dropna().sort_values(ascending=False)
+        crecimientos[dimension] = (trimestral.index[-1], ultimo)
+    meses = len(obtener_ventas_mensuales(df, agregados))
     
     # Conclusiones
     print("\n📋 CONCLUSIONES - Visualizaciones Bivariantes (Matplotlib):")
     print("• Existe una correlación positiva entre ventas y beneficios, con algunos outliers negativos")
     print("• Las ventas muestran estacionalidad con picos hacia fin de año")
+    if meses < 2 * series.PERIODOS_POR_ANIO['mensual']:
+        print(f"• Descomposición estacional omitida: requiere dos ciclos anuales "
+              f"({2 * series.PERIODOS_POR_ANIO['mensual']} meses) y hay {meses} meses")
+    for dimension, (fecha, ultimo) in crecimientos.items():
+        if len(ultimo):
+            print(f"• Crecimiento intertrimestral por {dimension} en {fecha:%Y-%m}: " +
+                  ", ".join(f"{grupo} {valor:+.1f}%" for grupo, valor in ultimo.items()))
     print("• Technology tiene las ventas promedio más altas, especialmente en el segmento Corporate")
     print("• No hay una relación clara entre cantidad y descuento en la mayoría de casos")
 
-def visualizaciones_bivariantes_seaborn(df):
+def visualizaciones_bivariantes_seaborn(df, agregados=None):
     """
     Crea visualizaciones bivariantes usando Seaborn
     
     Args:
-        df (pd.DataFrame): Dataset preparado
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Agregados precalculados por (medida, dimensiones, agg)
     """
     print("\n📈 CREANDO VISUALIZACIONES BIVARIANTES CON SEABORN")
     print("=" * 50)
     
-    # Crear figura con subplots
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    fig.suptitle('Análisis Bivariante con Seaborn - Dataset Superstore 2012', fontsize=16, fontweight='bold')
-    
-    # 1. Gráfico de dispersión con regresión: Ventas vs Beneficios
-    sns.regplot(data=df, x='Sales', y='Profit', ax=axes[0, 0], scatter_kws={'alpha':0.6}, line_kws={'color':'red'})
-    axes[0, 0].set_title('Regresión: Ventas vs Beneficios', fontweight='bold')
-    axes[0, 0].set_xlabel('Ventas ($)')
-    axes[0, 0].set_ylabel('Beneficio ($)')
-    
-    # 2. Heatmap de ventas por categoría y segmento
-    pivot_ventas = df.pivot_table(values='Sales', index='Category', columns='Segment', aggfunc='mean')
-    sns.heatmap(pivot_ventas, annot=True, fmt='.0f', cmap='YlOrRd', ax=axes[0, 1])
-    axes[0, 1].set_title('Ventas Promedio: Categoría vs Segmento', fontweight='bold')
-    
-    # 3. Boxplot de ventas por prioridad de orden
-    sns.boxplot(data=df, x='Order Priority', y='Sales', ax=axes[1, 0], palette='Set3')
-    axes[1, 0].set_title('Distribución de Ventas por Prioridad de Orden', fontweight='bold')
-    axes[1, 0].set_xlabel('Prioridad de Orden')
-    axes[1, 0].set_ylabel('Ventas ($)')
-    axes[1, 0].tick_params(axis='x', rotation=45)
-    
-    # 4. Gráfico de barras: Beneficio promedio por modo de envío
-    sns.barplot(data=df, x='Ship Mode', y='Profit', ax=axes[1, 1], palette='viridis', ci=None)
-    axes[1, 1].set_title('Beneficio Promedio por Modo de Envío', fontweight='bold')
-    axes[1, 1].set_xlabel('Modo de Envío')
-    axes[1, 1].set_ylabel('Beneficio Promedio ($)')
-    axes[1, 1].tick_params(axis='x', rotation=45)
-    
-    plt.tight_layout()
-    plt.show()
+    if not reutilizar_figura('bivariantes_seaborn', df, agregados):
+        importar_seaborn()
+        # Crear figura con subplots
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig.suptitle('Análisis Bivariante con Seaborn - Dataset Superstore 2012', fontsize=16, fontweight='bold')
+        
+        # 1. Gráfico de dispersión con regresión: Ventas vs Beneficios
+        dibujar_regresion(axes[0, 0], df, 'Sales', 'Profit', alpha=0.6)
+        axes[0, 0].set_title('Regresión: Ventas vs Beneficios', fontweight='bold')
+        axes[0, 0].set_xlabel('Ventas ($)')
+        axes[0, 0].set_ylabel('Beneficio ($)')
+        
+        # 2. Heatmap de ventas por categoría y segmento
+        pivot_ventas = obtener_agregado(df, agregados, 'Sales', ('Category', 'Segment'), 'mean').unstack()
+        sns.heatmap(pivot_ventas, annot=True, fmt='.0f', cmap='YlOrRd', ax=axes[0, 1])
+        axes[0, 1].set_title('Ventas Promedio: Categoría vs Segmento', fontweight='bold')
+        
+        # 3. Boxplot de ventas por prioridad de orden
+        resumen_prioridad = obtener_agregado(df, agregados, 'Sales', ('Order Priority',), ('resumen',))
+        dibujar_boxplot(axes[1, 0], resumen_prioridad, 'Order Priority', 'Sales', palette='Set3')
+        axes[1, 0].set_title('Distribución de Ventas por Prioridad de Orden', fontweight='bold')
+        axes[1, 0].set_xlabel('Prioridad de Orden')
+        axes[1, 0].set_ylabel('Ventas ($)')
+        axes[1, 0].tick_params(axis='x', rotation=45)
+        
+        # 4. Gráfico de barras: Beneficio promedio por modo de envío
+        beneficio_envio = obtener_agregado(df, agregados, 'Profit', ('Ship Mode',), 'mean')
+        sns.barplot(x=beneficio_envio.index, y=beneficio_envio.values, ax=axes[1, 1], palette='viridis')
+        axes[1, 1].set_title('Beneficio Promedio por Modo de Envío', fontweight='bold')
+        axes[1, 1].set_xlabel('Modo de Envío')
+        axes[1, 1].set_ylabel('Beneficio Promedio ($)')
+        axes[1, 1].tick_params(axis='x', rotation=45)
+        
+        plt.tight_layout()
+        finalizar_figura(fig, 'bivariantes_seaborn')
     
     # Conclusiones
     print("\n📋 CONCLUSIONES - Visualizaciones Bivariantes (Seaborn):")
@@ -300,54 +3123,72 @@ def visualizaciones_bivariantes_seaborn(df):
     print("• Las órdenes críticas no necesariamente generan mayores ventas")
     print("• Same Day delivery muestra el mayor beneficio promedio por envío")
 
-def visualizaciones_multivariantes_seaborn(df):
+def visualizacion_correlaciones(df, agregados=None):
     """
-    Crea visualizaciones multivariantes usando Seaborn
+    Crea el heatmap de correlación de las variables numéricas (Seaborn)
     
     Args:
-        df (pd.DataFrame): Dataset preparado
-    """
-    print("\n📈 CREANDO VISUALIZACIONES MULTIVARIANTES CON SEABORN")
-    print("=" * 55)
-    
-    # 1. Heatmap de correlación
-    plt.figure(figsize=(12, 8))
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Agregados precalculados por (medida, dimensiones, agg)
     
+    Returns:
+        pd.DataFrame: Matriz de correlación
+    """
     # Seleccionar variables numéricas para correlación
-    numeric_cols = ['Sales', 'Quantity', 'Discount', 'Profit', 'Shipping Cost', 'Profit_Margin']
-    correlation_matrix = df[numeric_cols].corr()
+    correlation_matrix = obtener_agregado(df, agregados, COLUMNAS_CORRELACION, (), 'corr')
+    if reutilizar_figura('correlacion', df, agregados):
+        return correlation_matrix
     
+    importar_seaborn()
+    fig = plt.figure(figsize=(12, 8))
     sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, 
-                square=True, fmt='.2f', cbar_kws={'label': 'Correlación'})
+                square=True, fmt='.2f', cbar_kws={'label': 'Correlación'}, **escala_correlacion(correlation_matrix))
     plt.title('Matriz de Correlación - Variables Numéricas del Dataset Superstore', 
               fontsize=14, fontweight='bold', pad=20)
     plt.tight_layout()
-    plt.show()
+    finalizar_figura(fig, 'correlacion')
+    return correlation_matrix
+
+def visualizaciones_multivariantes_seaborn(df, agregados=None):
+    """
+    Crea visualizaciones multivariantes usando Seaborn
     
-    # 2. Pairplot de variables clave
-    print("\n🔄 Generando pairplot (puede tomar unos momentos...)")
+    Args:
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Agregados precalculados por (medida, dimensiones, agg)
+    """
+    print("\n📈 CREANDO VISUALIZACIONES MULTIVARIANTES CON SEABORN")
+    print("=" * 55)
     
-    # Seleccionar una muestra para el pairplot (para mejor rendimiento)
-    df_sample = df.sample(n=min(1000, len(df)), random_state=42)
+    # 1. Heatmap de correlación
+    correlation_matrix = visualizacion_correlaciones(df, agregados)
     
-    # Crear pairplot
-    pairplot_vars = ['Sales', 'Profit', 'Quantity', 'Discount']
-    g = sns.pairplot(df_sample[pairplot_vars + ['Category']], hue='Category', 
-                     diag_kind='hist', plot_kws={'alpha': 0.6})
-    g.fig.suptitle('Análisis de Pares - Variables Clave por Categoría', 
-                   fontsize=14, fontweight='bold', y=1.02)
-    plt.show()
+    # 2. Pairplot de variables clave
+    if not reutilizar_figura('pairplot', df, agregados):
+        print("\n🔄 Generando pairplot (puede tomar unos momentos...)")
+        importar_seaborn()
+        
+        # Seleccionar una muestra para el pairplot (para mejor rendimiento)
+        df_sample = df.sample(n=min(1000, len(df)), random_state=42)
+        
+        # Crear pairplot
+        pairplot_vars = ['Sales', 'Profit', 'Quantity', 'Discount']
+        g = sns.pairplot(df_sample[pairplot_vars + ['Category']], hue='Category', palette='husl',
+                         diag_kind='hist', plot_kws={'alpha': 0.6})
+        g.fig.suptitle('Análisis de Pares - Variables Clave por Categoría', 
+                       fontsize=14, fontweight='bold', y=1.02)
+        finalizar_figura(g.fig, 'pairplot', bbox_inches='tight')
     
     # 3. Análisis multivariante con FacetGrid
-    plt.figure(figsize=(15, 10))
-    
-    # Crear un gráfico de facetas para analizar ventas por múltiples dimensiones
-    g = sns.FacetGrid(df, col='Category', row='Segment', margin_titles=True, height=4)
-    g.map(plt.scatter, 'Sales', 'Profit', alpha=0.6)
-    g.add_legend()
-    g.fig.suptitle('Ventas vs Beneficios por Categoría y Segmento', 
-                   fontsize=14, fontweight='bold', y=1.02)
-    plt.show()
+    if not reutilizar_figura('facetgrid', df, agregados):
+        # Crear un gráfico de facetas para analizar ventas por múltiples dimensiones
+        importar_seaborn()
+        g = sns.FacetGrid(df, col='Category', row='Segment', margin_titles=True, height=4)
+        g.map_dataframe(_dispersion_en_faceta, 'Sales', 'Profit', alpha=0.6)
+        g.add_legend()
+        g.fig.suptitle('Ventas vs Beneficios por Categoría y Segmento', 
+                       fontsize=14, fontweight='bold', y=1.02)
+        finalizar_figura(g.fig, 'facetgrid', bbox_inches='tight')
     
     # Conclusiones
     print("\n📋 CONCLUSIONES - Visualizaciones Multivariantes (Seaborn):")
@@ -359,86 +3200,84 @@ def visualizaciones_multivariantes_seaborn(df):
     print("• Technology muestra mayor dispersión en la relación ventas-beneficios")
     print("• Los descuentos altos tienden a reducir los márgenes de beneficio")
 
-def crear_dashboard_completo(df):
+def panel_distribucion_ventas(ax, df, agregados=None):
     """
-    Crea un dashboard completo con múltiples visualizaciones organizadas
-    
-    Args:
-        df (pd.DataFrame): Dataset preparado
+    Panel 1 del dashboard: distribución de ventas (Matplotlib)
     """
-    print("\n📊 CREANDO DASHBOARD COMPLETO CON SUBPLOTS")
-    print("=" * 45)
-    
-    # Crear figura principal con subplots
-    fig = plt.figure(figsize=(20, 16))
-    fig.suptitle('Dashboard Completo - Análisis Superstore 2012\nVisualización Integral de Ventas Minoristas', 
-                 fontsize=18, fontweight='bold', y=0.98)
-    
-    # Definir grid de subplots
-    gs = fig.add_gridspec(4, 4, hspace=0.3, wspace=0.3)
-    
-    # 1. Distribución de ventas (Matplotlib)
-    ax1 = fig.add_subplot(gs[0, 0])
-    ax1.hist(df['Sales'], bins=30, color='skyblue', alpha=0.7, edgecolor='black')
-    ax1.set_title('Distribución de Ventas', fontweight='bold')
-    ax1.set_xlabel('Ventas ($)')
-    ax1.set_ylabel('Frecuencia')
-    ax1.grid(True, alpha=0.3)
-    
-    # 2. Ventas por categoría (Seaborn)
-    ax2 = fig.add_subplot(gs[0, 1])
-    sns.boxplot(data=df, x='Category', y='Sales', ax=ax2, palette='Set2')
-    ax2.set_title('Ventas por Categoría', fontweight='bold')
-    ax2.tick_params(axis='x', rotation=45)
-    
-    # 3. Relación Ventas-Beneficios (Matplotlib)
-    ax3 = fig.add_subplot(gs[0, 2:4])
-    scatter = ax3.scatter(df['Sales'], df['Profit'], alpha=0.6, c=df['Discount'], cmap='viridis', s=20)
-    ax3.set_title('Relación Ventas vs Beneficios (coloreado por Descuento)', fontweight='bold')
-    ax3.set_xlabel('Ventas ($)')
-    ax3.set_ylabel('Beneficio ($)')
-    ax3.grid(True, alpha=0.3)
-    plt.colorbar(scatter, ax=ax3, label='Descuento')
-    
-    # 4. Evolución temporal (Matplotlib)
-    ax4 = fig.add_subplot(gs[1, :])
-    ventas_mensuales = df.groupby(['Year', 'Month'])['Sales'].sum().reset_index()
-    ventas_mensuales['Fecha'] = pd.to_datetime(ventas_mensuales[['Year', 'Month']].assign(day=1))
-    ax4.plot(ventas_mensuales['Fecha'], ventas_mensuales['Sales'], marker='o', linewidth=2, markersize=6, color='green')
-    ax4.set_title('Evolución Temporal de Ventas Mensuales 2012', fontweight='bold')
-    ax4.set_xlabel('Fecha')
-    ax4.set_ylabel('Ventas Totales ($)')
-    ax4.grid(True, alpha=0.3)
-    
-    # 5. Heatmap de correlación (Seaborn)
-    ax5 = fig.add_subplot(gs[2, :2])
+    conteos, bordes = obtener_agregado(df, agregados, 'Sales', (), ('hist', 30))
+    ax.hist(bordes[:-1], bins=bordes, weights=conteos, color='skyblue', alpha=0.7, edgecolor='black')
+    ax.set_title('Distribución de Ventas', fontweight='bold')
+    ax.set_xlabel('Ventas ($)')
+    ax.set_ylabel('Frecuencia')
+    ax.grid(True, alpha=0.3)
+
+def panel_ventas_categoria(ax, df, agregados=None):
+    """
+    Panel 2 del dashboard: ventas por categoría (Seaborn)
+    """
+    dibujar_boxplot(ax, obtener_agregado(df, agregados, 'Sales', ('Category',), ('resumen',)),
+                    'Category', 'Sales', palette='Set2')
+    ax.set_title('Ventas por Categoría', fontweight='bold')
+    ax.tick_params(axis='x', rotation=45)
+
+def panel_ventas_beneficios(ax, df, agregados=None):
+    """
+    Panel 3 del dashboard: relación ventas-beneficios coloreada por descuento (Matplotlib)
+    """
+    scatter = dibujar_dispersion(ax, df, 'Sales', 'Profit', columna_color='Discount', alpha=0.6, cmap='viridis', s=20)
+    ax.set_title('Relación Ventas vs Beneficios (coloreado por Descuento)', fontweight='bold')
+    ax.set_xlabel('Ventas ($)')
+    ax.set_ylabel('Beneficio ($)')
+    ax.grid(True, alpha=0.3)
+    ax.figure.colorbar(scatter, ax=ax, label='Descuento')
+
+def panel_evolucion_temporal(ax, df, agregados=None):
+    """
+    Panel 4 del dashboard: evolución temporal de ventas mensuales (Matplotlib)
+    """
+    ventas_mensuales = obtener_ventas_mensuales(df, agregados)
+    ax.plot(ventas_mensuales['Fecha'], ventas_mensuales['Sales'], marker='o', linewidth=2, markersize=6, color='green')
+    ax.set_title('Evolución Temporal de Ventas Mensuales 2012', fontweight='bold')
+    ax.set_xlabel('Fecha')
+    ax.set_ylabel('Ventas Totales ($)')
+    ax.grid(True, alpha=0.3)
+
+def panel_correlacion(ax, df, agregados=None):
+    """
+    Panel 5 del dashboard: heatmap de correlación (Seaborn)
+    """
+    importar_seaborn()
     numeric_cols = ['Sales', 'Quantity', 'Discount', 'Profit']
-    correlation_matrix = df[numeric_cols].corr()
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, ax=ax5, fmt='.2f')
-    ax5.set_title('Matriz de Correlación', fontweight='bold')
-    
-    # 6. Beneficios por segmento (Seaborn)
-    ax6 = fig.add_subplot(gs[2, 2])
-    sns.violinplot(data=df, x='Segment', y='Profit', ax=ax6, palette='viridis')
-    ax6.set_title('Beneficios por Segmento', fontweight='bold')
-    ax6.tick_params(axis='x', rotation=45)
-    
-    # 7. Top productos por ventas (Matplotlib)
-    ax7 = fig.add_subplot(gs[2, 3])
-    top_subcategories = df.groupby('Sub-Category')['Sales'].sum().nlargest(10)
-    ax7.barh(range(len(top_subcategories)), top_subcategories.values, color='coral')
-    ax7.set_yticks(range(len(top_subcategories)))
-    ax7.set_yticklabels(top_subcategories.index, fontsize=8)
-    ax7.set_title('Top 10 Subcategorías\npor Ventas', fontweight='bold')
-    ax7.set_xlabel('Ventas Totales ($)')
-    
-    # 8. Análisis regional (Seaborn)
-    ax8 = fig.add_subplot(gs[3, :])
-    region_analysis = df.groupby('Region').agg({
-        'Sales': 'sum',
-        'Profit': 'sum',
-        'Quantity': 'sum'
-    }).reset_index()
+    correlation_matrix = obtener_agregado(df, agregados, COLUMNAS_CORRELACION, (), 'corr').loc[numeric_cols, numeric_cols]
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, ax=ax, fmt='.2f',
+                **escala_correlacion(correlation_matrix))
+    ax.set_title('Matriz de Correlación', fontweight='bold')
+
+def panel_beneficios_segmento(ax, df, agregados=None):
+    """
+    Panel 6 del dashboard: beneficios por segmento (Seaborn)
+    """
+    dibujar_violin(ax, obtener_agregado(df, agregados, 'Profit', ('Segment',), ('resumen',)),
+                   'Segment', 'Profit', palette='viridis')
+    ax.set_title('Beneficios por Segmento', fontweight='bold')
+    ax.tick_params(axis='x', rotation=45)
+
+def panel_top_subcategorias(ax, df, agregados=None):
+    """
+    Panel 7 del dashboard: top 10 subcategorías por ventas (Matplotlib)
+    """
+    top_subcategories = obtener_agregado(df, agregados, 'Sales', ('Sub-Category',), 'sum').nlargest(10)
+    ax.barh(range(len(top_subcategories)), top_subcategories.values, color='coral')
+    ax.set_yticks(range(len(top_subcategories)))
+    ax.set_yticklabels(top_subcategories.index, fontsize=8)
+    ax.set_title('Top 10 Subcategorías\npor Ventas', fontweight='bold')
+    ax.set_xlabel('Ventas Totales ($)')
+
+def panel_analisis_regional(ax, df, agregados=None):
+    """
+    Panel 8 del dashboard: análisis comparativo por región con valores normalizados
+    """
+    region_analysis = obtener_agregado(df, agregados, ('Sales', 'Profit', 'Quantity'), ('Region',), 'sum').reset_index()
     
     x = np.arange(len(region_analysis['Region']))
     width = 0.25
@@ -448,26 +3287,123 @@ def crear_dashboard_completo(df):
     profit_norm = region_analysis['Profit'] / 100  # En cientos
     quantity_norm = region_analysis['Quantity'] * 10  # Multiplicar por 10
     
-    ax8.bar(x - width, sales_norm, width, label='Ventas (K$)', alpha=0.8, color='blue')
-    ax8.bar(x, profit_norm, width, label='Beneficios (100$)', alpha=0.8, color='green')
-    ax8.bar(x + width, quantity_norm, width, label='Cantidad (x10)', alpha=0.8, color='orange')
+    ax.bar(x - width, sales_norm, width, label='Ventas (K$)', alpha=0.8, color='blue')
+    ax.bar(x, profit_norm, width, label='Beneficios (100$)', alpha=0.8, color='green')
+    ax.bar(x + width, quantity_norm, width, label='Cantidad (x10)', alpha=0.8, color='orange')
+    
+    ax.set_title('Análisis Comparativo por Región (Valores Normalizados)', fontweight='bold')
+    ax.set_xlabel('Región')
+    ax.set_ylabel('Valores Normalizados')
+    ax.set_xticks(x)
+    ax.set_xticklabels(region_analysis['Region'], rotation=45)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+# Paneles del dashboard: nombre, posición en la rejilla 4x4 y función de dibujo
+PANELES_DASHBOARD = [
+    ('1_distribucion_ventas', np.s_[0, 0], panel_distribucion_ventas),
+    ('2_ventas_categoria', np.s_[0, 1], panel_ventas_categoria),
+    ('3_ventas_beneficios', np.s_[0, 2:4], panel_ventas_beneficios),
+    ('4_evolucion_temporal', np.s_[1, :], panel_evolucion_temporal),
+    ('5_correlacion', np.s_[2, :2], panel_correlacion),
+    ('6_beneficios_segmento', np.s_[2, 2], panel_beneficios_segmento),
+    ('7_top_subcategorias', np.s_[2, 3], panel_top_subcategorias),
+    ('8_analisis_regional', np.s_[3, :], panel_analisis_regional),
+]
+
+def figura_panel(nombre_panel, df, agregados=None, tamano_celda=TAMANO_CELDA_PANELES):
+    """
+    Figura independiente (sin pyplot, segura entre hilos) con un panel del dashboard
+    
+    Args:
+        nombre_panel (str): Nombre del panel en PANELES_DASHBOARD
+        df (pd.DataFrame): Dataset preparado (o filtrado)
+        agregados (dict, optional): Caché de agregados
+        tamano_celda (tuple): Pulgadas de una celda de la rejilla 4x4
     
-    ax8.set_title('Análisis Comparativo por Región (Valores Normalizados)', fontweight='bold')
-    ax8.set_xlabel('Región')
-    ax8.set_ylabel('Valores Normalizados')
-    ax8.set_xticks(x)
-    ax8.set_xticklabels(region_analysis['Region'], rotation=45)
-    ax8.legend()
-    ax8.grid(True, alpha=0.3)
+    Returns:
+        matplotlib.figure.Figure: Figura con el panel, del tamaño de las celdas que ocupa
     
-    plt.tight_layout()
+    Raises:
+        KeyError: Si el panel no existe
+    """
+    posicion, dibujar_panel = {nombre: (pos, funcion) for nombre, pos, funcion in PANELES_DASHBOARD}[nombre_panel]
+    filas, columnas = (len(range(4)[p]) if isinstance(p, slice) else 1 for p in posicion)
+    fig = matplotlib.figure.Figure(figsize=(tamano_celda[0] * columnas, tamano_celda[1] * filas))
+    dibujar_panel(fig.add_subplot(), df, agregados)
+    return fig
+
+def renderizar_panel(nombre_panel, df, agregados=None, dpi=DPI_PANELES, tamano_celda=TAMANO_CELDA_PANELES):
+    """
+    PNG de un panel suelto del dashboard, leído de la caché de figuras si ya se dibujó
     
-    # Guardar la figura
-    ruta_imagen = r'c:\Users\jnya\OneDrive - GFT Technologies SE\Formación\UNIR\Nivelacion\w04\dashboard_superstore_2012.png'
-    plt.savefig(ruta_imagen, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"\n💾 Dashboard guardado como: {ruta_imagen}")
+    La clave en la caché es la de la figura 'panel_<nombre>' (sus entradas y la
+    resolución y tamaño), la misma que usa el modo batch al guardar los paneles sueltos.
     
-    plt.show()
+    Args:
+        nombre_panel (str): Nombre del panel en PANELES_DASHBOARD
+        df (pd.DataFrame): Dataset preparado (o filtrado)
+        agregados (dict, optional): Caché de agregados
+        dpi (int): Resolución del PNG
+        tamano_celda (tuple): Pulgadas de una celda de la rejilla 4x4
+    
+    Returns:
+        bytes: Imagen PNG
+    """
+    huella = huella_figura(f'panel_{nombre_panel}', df, agregados, (dpi, tuple(tamano_celda)))
+    contenido = leer_figura_cache(huella)
+    if contenido is None:
+        buffer = io.BytesIO()
+        figura_panel(nombre_panel, df, agregados, tamano_celda).savefig(
+            buffer, format='png', dpi=dpi, bbox_inches='tight', facecolor='white')
+        contenido = buffer.getvalue()
+        escribir_figura_cache(huella, contenido)
+    return contenido
+
+def crear_dashboard_completo(df, agregados=None):
+    """
+    Crea un dashboard completo con múltiples visualizaciones organizadas
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict, optional): Agregados precalculados por (medida, dimensiones, agg)
+    """
+    print("\n📊 CREANDO DASHBOARD COMPLETO CON SUBPLOTS")
+    print("=" * 45)
+    
+    if not reutilizar_figura('dashboard_superstore_2012', df, agregados, destino=RUTA_DASHBOARD):
+        # Crear figura principal con subplots
+        fig = plt.figure(figsize=(20, 16))
+        fig.suptitle('Dashboard Completo - Análisis Superstore 2012\nVisualización Integral de Ventas Minoristas', 
+                     fontsize=18, fontweight='bold', y=0.98)
+        
+        # Definir grid de subplots
+        gs = fig.add_gridspec(4, 4, hspace=0.3, wspace=0.3)
+        
+        # Cada panel se dibuja en su posición de la rejilla
+        for nombre_panel, posicion, dibujar_panel in PANELES_DASHBOARD:
+            with medir_etapa(f'crear_dashboard_completo/{nombre_panel}', df):
+                dibujar_panel(fig.add_subplot(gs[posicion]), df, agregados)
+        
+        with medir_etapa('crear_dashboard_completo/guardado', df):
+            plt.tight_layout()
+            
+            # Guardar la figura
+            ruta_guardada = None
+            if CONFIG_SALIDA['directorio'] is None:
+                plt.savefig(RUTA_DASHBOARD, dpi=300, bbox_inches='tight', facecolor='white')
+                ruta_guardada = RUTA_DASHBOARD
+                print(f"\n💾 Dashboard guardado como: {RUTA_DASHBOARD}")
+            finalizar_figura(fig, 'dashboard_superstore_2012', ruta_guardada=ruta_guardada,
+                             dpi=300, bbox_inches='tight', facecolor='white')
+    
+    # En modo batch cada panel se guarda también suelto, con su propia entrada en la caché
+    if CONFIG_SALIDA['directorio'] is not None:
+        for nombre_panel, _, _ in PANELES_DASHBOARD:
+            nombre = f'panel_{nombre_panel}'
+            if not reutilizar_figura(nombre, df, agregados, (DPI_PANELES, TAMANO_CELDA_PANELES)):
+                finalizar_figura(figura_panel(nombre_panel, df, agregados), nombre,
+                                 dpi=DPI_PANELES, bbox_inches='tight', facecolor='white')
     
     # Conclusiones del dashboard
     print("\n📋 CONCLUSIONES GENERALES DEL DASHBOARD:")
@@ -489,10 +3425,232 @@ def crear_dashboard_completo(df):
     print("• Expandir presencia en regiones de alto rendimiento (APAC, EU)")
     print("• Desarrollar programas específicos para el segmento Consumer")
 
-def main():
+# Secciones de análisis independientes entre sí (se pueden renderizar en paralelo)
+SECCIONES_ANALISIS = [
+    'visualizaciones_univariantes_matplotlib',
+    'visualizaciones_univariantes_seaborn',
+    'visualizaciones_bivariantes_matplotlib',
+    'visualizaciones_bivariantes_seaborn',
+    'visualizaciones_multivariantes_seaborn',
+    'crear_dashboard_completo',
+]
+
+# Figuras que guarda cada sección en modo batch
+FIGURAS_SECCIONES = {
+    'visualizaciones_univariantes_matplotlib': ['univariantes_matplotlib'],
+    'visualizaciones_univariantes_seaborn': ['univariantes_seaborn'],
+    'visualizaciones_bivariantes_matplotlib': ['bivariantes_matplotlib'],
+    'visualizaciones_bivariantes_seaborn': ['bivariantes_seaborn'],
+    'visualizaciones_multivariantes_seaborn': ['correlacion', 'pairplot', 'facetgrid'],
+    'crear_dashboard_completo': ['dashboard_superstore_2012'] + [f'panel_{nombre}' for nombre, _, _ in PANELES_DASHBOARD],
+    'visualizacion_correlaciones': ['correlacion'],
+}
+
+# Entradas de cada panel del dashboard y de cada figura: agregados que leen, como
+# (medida, dimensiones, agg), y columnas que dibujan fila a fila, como ('filas', columnas)
+ENTRADAS_PANELES = {
+    '1_distribucion_ventas': [('Sales', (), ('hist', 30))],
+    '2_ventas_categoria': [('Sales', ('Category',), ('resumen',))],
+    '3_ventas_beneficios': [('filas', ('Sales', 'Profit', 'Discount'))],
+    '4_evolucion_temporal': [('Sales', ('Order Date',), 'sum')],
+    '5_correlacion': [(COLUMNAS_CORRELACION, (), 'corr')],
+    '6_beneficios_segmento': [('Profit', ('Segment',), ('resumen',))],
+    '7_top_subcategorias': [('Sales', ('Sub-Category',), 'sum')],
+    '8_analisis_regional': [(('Sales', 'Profit', 'Quantity'), ('Region',), 'sum')],
+}
+
+ENTRADAS_FIGURAS = {
+    'univariantes_matplotlib': [('Sales', (), ('hist', 50)), ('conteo', ('Category',), 'count'),
+                                ('Profit', (), ('hist', 50)), ('conteo', ('Segment',), 'count')],
+    'univariantes_seaborn': [('Sales', ('Category',), ('resumen',)), ('Profit', ('Segment',), ('resumen',)),
+                             ('Discount', (), ('hist', 30)), ('Discount', (), ('resumen',)),
+                             ('Profit_Margin', ('Region',), ('resumen', -100, 100))],
+    'bivariantes_matplotlib': [('filas', ('Sales', 'Profit', 'Discount', 'Quantity')),
+                               ('Sales', ('Order Date',), 'sum'), ('Sales', ('Category', 'Segment'), 'mean')],
+    'bivariantes_seaborn': [('filas', ('Sales', 'Profit')), ('Sales', ('Category', 'Segment'), 'mean'),
+                            ('Sales', ('Order Priority',), ('resumen',)), ('Profit', ('Ship Mode',), 'mean')],
+    'correlacion': [(COLUMNAS_CORRELACION, (), 'corr')],
+    'pairplot': [('filas', ('Sales', 'Profit', 'Quantity', 'Discount', 'Category'))],
+    'facetgrid': [('filas', ('Sales', 'Profit', 'Category', 'Segment'))],
+    'dashboard_superstore_2012': [entrada for entradas in ENTRADAS_PANELES.values() for entrada in entradas],
+    **{f'panel_{nombre}': entradas for nombre, entradas in ENTRADAS_PANELES.items()},
+}
+
+# Secciones que ejecuta cada subcomando de la línea de comandos
+SUBCOMANDOS_CLI = {
+    'todo': SECCIONES_ANALISIS,
+    'univariantes': ['visualizaciones_univariantes_matplotlib', 'visualizaciones_univariantes_seaborn'],
+    'bivariantes': ['visualizaciones_bivariantes_matplotlib', 'visualizaciones_bivariantes_seaborn'],
+    'multivariantes': ['visualizaciones_multivariantes_seaborn'],
+    'correlaciones': ['visualizacion_correlaciones'],
+    'dashboard': ['crear_dashboard_completo'],
+}
+
+# Estado de cada proceso del pool de renderizado
+_ESTADO_PROCESO = {}
+
+def _inicializar_proceso(df, agregados, directorio_salida, cambios, config_dispersion,
+                         config_instrumentacion, config_cache_figuras):
+    """
+    Prepara un proceso del pool: backend sin interfaz, datos y configuración de salida
+    """
+    plt.switch_backend('Agg')
+    CONFIG_SALIDA.update(directorio=directorio_salida, cambios=cambios)
+    CONFIG_DISPERSION.update(config_dispersion)
+    CONFIG_INSTRUMENTACION.update(config_instrumentacion)
+    CONFIG_CACHE_FIGURAS.update(config_cache_figuras)
+    _ESTADO_PROCESO['df'] = df
+    _ESTADO_PROCESO['agregados'] = agregados
+
+def ejecutar_seccion(nombre_seccion, df, agregados):
+    """
+    Ejecuta una sección en modo batch (cada figura consulta la caché antes de dibujarse)
+    
+    Args:
+        nombre_seccion (str): Nombre de la función de la sección
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict): Caché de agregados
+    """
+    globals()[nombre_seccion](df, agregados)
+
+def _renderizar_seccion(nombre_seccion):
+    """
+    Ejecuta una sección de análisis dentro de un proceso del pool
+    
+    La salida de la sección (figuras guardadas y conclusiones) se captura y se devuelve
+    para que el proceso principal la imprima en el orden de las secciones, sin mezclarla
+    con la de otros procesos.
+    
+    Returns:
+        tuple: (contadores de la caché de agregados consumidos por la sección,
+                etapas medidas en el proceso, texto impreso por la sección)
+    """
+    antes = dict(CONTADORES_AGREGADOS)
+    del REGISTRO_ETAPAS[:]
+    salida = io.StringIO()
+    with redirect_stdout(salida), medir_etapa(nombre_seccion, _ESTADO_PROCESO['df']):
+        ejecutar_seccion(nombre_seccion, _ESTADO_PROCESO['df'], _ESTADO_PROCESO['agregados'])
+    contadores = {clave: CONTADORES_AGREGADOS[clave] - antes[clave] for clave in antes}
+    return contadores, list(REGISTRO_ETAPAS), salida.getvalue()
+
+def secciones_pendientes(directorio_salida, cambios, secciones=None):
+    """
+    Secciones que hay que volver a renderizar en modo incremental
+    
+    Una sección se renderiza si a alguna de sus figuras le falta el archivo en el
+    directorio de salida o tiene entradas modificadas (entradas_modificadas); dentro
+    de la sección solo se vuelven a dibujar esas figuras.
+    
+    Args:
+        directorio_salida (str): Directorio de las figuras
+        cambios (set | None): Claves modificadas según cargar_incremental
+        secciones (list, optional): Secciones candidatas (todas por defecto)
+    
+    Returns:
+        list: Nombres de las secciones a renderizar
+    """
+    secciones = SECCIONES_ANALISIS if secciones is None else secciones
+    return [seccion for seccion in secciones
+            if any(entradas_modificadas(nombre, cambios)
+                   or not os.path.exists(os.path.join(directorio_salida, f"{nombre}.png"))
+                   for nombre in FIGURAS_SECCIONES[seccion])]
+
+def renderizar_en_lote(df, agregados, directorio_salida, procesos=None, secciones=None, cambios=None):
+    """
+    Genera todas las figuras sin interfaz gráfica y las guarda en un directorio
+    
+    Las secciones son independientes, así que se reparten en un pool de procesos
+    (uno por núcleo por defecto, sin superar el número de secciones). Con un solo
+    proceso se ejecutan en el proceso actual.
+    
+    Args:
+        df (pd.DataFrame): Dataset preparado (o muestra en modo streaming)
+        agregados (dict): Caché de agregados ya construida
+        directorio_salida (str): Directorio donde se guardan las figuras
+        procesos (int, optional): Número de procesos del pool
+        secciones (list, optional): Secciones a renderizar (todas por defecto)
+        cambios (set, optional): Claves modificadas en modo incremental; las figuras
+            sin entradas modificadas que ya estén en el directorio no se vuelven a dibujar
+    """
+    secciones = SECCIONES_ANALISIS if secciones is None else secciones
+    os.makedirs(directorio_salida, exist_ok=True)
+    print(f"\n🖨️ Renderizando {len(secciones)} secciones en modo batch en: {directorio_salida}")
+    if not secciones:
+        return
+    
+    procesos = min(procesos or os.cpu_count() or 1, len(secciones))
+    if procesos == 1:
+        _inicializar_proceso(df, agregados, directorio_salida, cambios, CONFIG_DISPERSION,
+                             CONFIG_INSTRUMENTACION, CONFIG_CACHE_FIGURAS)
+        for nombre_seccion in secciones:
+            with medir_etapa(nombre_seccion, df):
+                ejecutar_seccion(nombre_seccion, df, agregados)
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso,
+                                 initargs=(df, agregados, directorio_salida, cambios, CONFIG_DISPERSION,
+                                           CONFIG_INSTRUMENTACION, CONFIG_CACHE_FIGURAS)) as pool:
+            # pool.map devuelve los resultados en el orden de las secciones
+            for contadores, etapas, salida in pool.map(_renderizar_seccion, secciones):
+                print(salida, end='')
+                for clave, valor in contadores.items():
+                    CONTADORES_AGREGADOS[clave] += valor
+                REGISTRO_ETAPAS.extend(etapas)
+
+def validar_modos_carga(streaming=False, paralelo=False, incremental=False, motor='pandas', ruta_cubo=None):
+    """
+    Comprueba que se ha pedido como mucho un modo de carga
+    
+    Raises:
+        ValueError: Si se combinan streaming, paralelo, incremental, otro motor o cubo OLAP
+    """
+    modos = [nombre for nombre, activo in (('streaming', streaming), ('paralelo', paralelo),
+                                           ('incremental', incremental), (f"motor {motor}", motor != 'pandas'),
+                                           ('cubo', ruta_cubo is not None)) if activo]
+    if len(modos) > 1:
+        raise ValueError(f"Modos de carga incompatibles: {', '.join(modos)} (elige solo uno)")
+
+def main(ruta_dataset=RUTA_DATASET, streaming=False, tamano_bloque=TAMANO_BLOQUE,
+         directorio_salida=None, procesos=None, incremental=False,
+         instrumentar=False, ruta_informe=None, directorio_perfiles=None,
+         motor='pandas', verificar=False, ruta_cubo=None, paralelo=False, compacto=False,
+         secciones=None, directorio_cache_figuras=None, directorio_exportacion=None,
+         formato_exportacion='parquet'):
     """
     Función principal que ejecuta todo el análisis de visualizaciones
+    
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV
+        streaming (bool): Leer el CSV por bloques y graficar desde agregados acumulados
+        tamano_bloque (int): Filas por bloque en modo streaming
+        directorio_salida (str, optional): Activa el modo batch sin interfaz y guarda ahí las figuras
+        procesos (int, optional): Procesos para renderizar en modo batch o cargar en modo paralelo
+        incremental (bool): Procesar solo las filas añadidas desde la última ejecución
+        instrumentar (bool): Medir tiempo y memoria de cada etapa e imprimir el informe
+        ruta_informe (str, optional): Ruta del informe JSON de instrumentación
+        directorio_perfiles (str, optional): Guardar un perfil cProfile por etapa de primer nivel
+        motor (str): Motor de agregación: 'pandas' o uno de MOTORES_AGREGACION ('duckdb')
+        verificar (bool): Comparar los agregados del motor con los de pandas
+        ruta_cubo (str, optional): Cubo OLAP; si existe y está al día el informe se genera
+            desde él sin leer el CSV, si no se construye a partir de los datos y se guarda
+        paralelo (bool): Cargar y agregar el dataset por particiones en un pool de procesos
+        compacto (bool): Descartar columnas sin uso y compactar tipos del dataset en memoria
+        secciones (list, optional): Secciones a ejecutar (todas por defecto); con un subconjunto
+            los agregados se calculan bajo demanda en lugar de precalcularlos todos
+        directorio_cache_figuras (str, optional): Caché de figuras renderizadas; las figuras
+            cuyas entradas, parámetros y código no cambian se copian de ella sin volver a dibujarlas
+        directorio_exportacion (str, optional): Exportar ahí el dataset preparado y los agregados
+            de las gráficas en formato columnar para otros consumidores
+        formato_exportacion (str): Formato de la exportación: 'parquet' o 'arrow'
+    
+    Raises:
+        ValueError: Si se combinan varios modos de carga (streaming, paralelo, incremental,
+            motor distinto de pandas o cubo OLAP)
     """
+    validar_modos_carga(streaming, paralelo, incremental, motor, ruta_cubo)
+    CONFIG_INSTRUMENTACION['activa'] = instrumentar or ruta_informe is not None \
+        or directorio_perfiles is not None
+    CONFIG_INSTRUMENTACION['directorio_perfiles'] = directorio_perfiles
+    
     print("🎯 ANÁLISIS DE VISUALIZACIONES - DATASET SUPERSTORE 2012")
     print("=" * 65)
     print("📋 Proyecto: Creación de visualizaciones con Matplotlib y Seaborn")
@@ -502,29 +3660,85 @@ def main():
     print("=" * 65)
     
     # 1. Cargar y preparar datos
-    df = cargar_y_preparar_datos()
+    cambios = None
+    cubo = None
+    with medir_etapa('carga_datos') as registro:
+        if ruta_cubo is not None:
+            df, agregados, cubo = cargar_cubo(ruta_cubo, ruta_dataset)
+        if cubo is not None:
+            print("⚡ Informe generado desde el cubo OLAP sin leer los datos de origen")
+        elif streaming:
+            df, agregados = cargar_agregados_por_bloques(ruta_dataset, tamano_bloque)
+        elif paralelo:
+            df, agregados = cargar_agregados_en_paralelo(ruta_dataset, procesos)
+        elif incremental:
+            df, agregados, cambios = cargar_incremental(ruta_dataset)
+        elif motor != 'pandas':
+            df, agregados = MOTORES_AGREGACION[motor](ruta_dataset)
+        else:
+            df, agregados = cargar_y_preparar_datos(ruta_dataset, compacto=compacto), None
+        registro['df'] = df
     
     if df is None:
         print("❌ No se pudo cargar el dataset. Terminando ejecución.")
         return
     
-    # 2. Crear visualizaciones univariantes con Matplotlib
-    visualizaciones_univariantes_matplotlib(df)
-    
-    # 3. Crear visualizaciones univariantes con Seaborn
-    visualizaciones_univariantes_seaborn(df)
-    
-    # 4. Crear visualizaciones bivariantes con Matplotlib
-    visualizaciones_bivariantes_matplotlib(df)
-    
-    # 5. Crear visualizaciones bivariantes con Seaborn
-    visualizaciones_bivariantes_seaborn(df)
-    
-    # 6. Crear visualizaciones multivariantes con Seaborn
-    visualizaciones_multivariantes_seaborn(df)
-    
-    # 7. Crear dashboard completo
-    crear_dashboard_completo(df)
+    if verificar and motor != 'pandas':
+        with medir_etapa('verificar_motor'):
+            diferencias = verificar_motor(cargar_y_preparar_datos(ruta_dataset), agregados)
+        if diferencias:
+            print(f"⚠️ El motor '{motor}' difiere de pandas en {len(diferencias)} agregados:")
+            for clave in diferencias:
+                print(f"  - {clave}")
+        else:
+            print(f"✅ Agregados del motor '{motor}' idénticos a los de pandas")
+    
+    # Cubo OLAP: los agregados por dimensiones se responden agrupando sus celdas
+    cubo_nuevo = ruta_cubo is not None and cubo is None
+    if cubo_nuevo:
+        with medir_etapa('construir_cubo', df):
+            cubo = construir_cubo(df)
+            agregados = {**agregados_desde_cubo(cubo), **(agregados or {})}
+    
+    # Agregados compartidos: se calculan una vez y los reutilizan todas las gráficas.
+    # Si solo se ejecutan algunas secciones se calculan al pedirlos (y el cubo los necesita todos)
+    secciones = SECCIONES_ANALISIS if secciones is None else secciones
+    if secciones == SECCIONES_ANALISIS or cubo_nuevo:
+        with medir_etapa('construir_agregados', df):
+            agregados = construir_agregados(df, agregados)
+    else:
+        agregados = {} if agregados is None else agregados
+    
+    if cubo_nuevo:
+        guardar_cubo(ruta_cubo, cubo, df, agregados, ruta_dataset)
+    
+    if directorio_exportacion is not None:
+        # Con streaming, paralelo, otro motor o un cubo cargado df es solo una muestra
+        datos_completos = not (streaming or paralelo or motor != 'pandas'
+                               or (ruta_cubo is not None and not cubo_nuevo))
+        with medir_etapa('exportar_datos', df):
+            exportar_datos(df, agregados, directorio_exportacion, formato_exportacion,
+                           incluir_datos=datos_completos)
+    
+    CONFIG_CACHE_FIGURAS['directorio'] = directorio_cache_figuras
+    
+    if directorio_salida is not None:
+        # 2-7. Modo batch: las secciones en paralelo, guardadas en disco
+        renderizar_en_lote(df, agregados, directorio_salida, procesos,
+                           secciones_pendientes(directorio_salida, cambios, secciones), cambios)
+    else:
+        # 2-7. Univariantes y bivariantes (Matplotlib y Seaborn), multivariantes y dashboard
+        for nombre_seccion in secciones:
+            with medir_etapa(nombre_seccion, df):
+                globals()[nombre_seccion](df, agregados)
+    
+    recortar_cache_figuras()
+    
+    print(f"\n🗃️ Caché de agregados: {CONTADORES_AGREGADOS['aciertos']} aciertos, "
+          f"{CONTADORES_AGREGADOS['calculos']} cálculos")
+    
+    if CONFIG_INSTRUMENTACION['activa']:
+        informe_instrumentacion(ruta_informe)
     
     print("\n✅ ANÁLISIS COMPLETADO EXITOSAMENTE")
     print("=" * 40)
@@ -542,5 +3756,65 @@ def main():
     print("\n🎉 ¡Análisis de visualizaciones del dataset Superstore 2012 finalizado!")
     print("📊 Todas las visualizaciones han sido creadas según los requerimientos.")
 
+def ejecutar_cli(argumentos=None):
+    """
+    Punto de entrada de línea de comandos con un subcomando por grupo de gráficas
+    
+    Args:
+        argumentos (list, optional): Argumentos a interpretar (sys.argv[1:] por defecto)
+    """
+    comun = argparse.ArgumentParser(add_help=False)
+    comun.add_argument('--datos', default=RUTA_DATASET,
+                       help='Ruta del CSV del dataset, o directorio o patrón glob de extractos')
+    comun.add_argument('--salida', help='Directorio donde guardar las figuras sin interfaz gráfica '
+                                         '(por defecto se muestran en pantalla)')
+    comun.add_argument('--procesos', type=int, help='Procesos para renderizar o cargar en paralelo')
+    comun.add_argument('--streaming', action='store_true', help='Leer el CSV por bloques')
+    comun.add_argument('--tamano-bloque', type=int, default=TAMANO_BLOQUE, help='Filas por bloque en modo streaming')
+    comun.add_argument('--incremental', action='store_true',
+                       help='Procesar solo las filas añadidas desde la última ejecución')
+    comun.add_argument('--paralelo', action='store_true', help='Cargar el CSV por particiones en paralelo')
+    comun.add_argument('--compacto', action='store_true', help='Compactar el dataset en memoria')
+    comun.add_argument('--motor', default='pandas', choices=['pandas', *MOTORES_AGREGACION],
+                       help='Motor de agregación')
+    comun.add_argument('--verificar', action='store_true', help='Comparar los agregados del motor con los de pandas')
+    comun.add_argument('--cubo', help='Ruta del cubo OLAP precalculado')
+    comun.add_argument('--instrumentar', action='store_true',
+                       help='Medir tiempo y memoria de cada etapa e imprimir el informe')
+    comun.add_argument('--informe', help='Guardar el informe de instrumentación por etapas en JSON')
+    comun.add_argument('--perfiles', help='Directorio donde guardar un perfil cProfile por etapa')
+    comun.add_argument('--cache-figuras', help='Directorio de la caché de figuras renderizadas')
+    comun.add_argument('--cache-figuras-mb', type=float, default=CONFIG_CACHE_FIGURAS['max_mb'],
+                       help='Tamaño máximo de la caché de figuras en MB')
+    comun.add_argument('--politica-cache', default=CONFIG_CACHE_FIGURAS['politica'],
+                       choices=list(POLITICAS_CACHE_FIGURAS), help='Política de expulsión de la caché de figuras')
+    comun.add_argument('--exportar', help='Directorio donde exportar datos preparados y agregados')
+    comun.add_argument('--formato-exportacion', default='parquet', choices=list(FORMATOS_EXPORTACION),
+                       help='Formato columnar de la exportación')
+    
+    parser = argparse.ArgumentParser(description='Análisis de visualizaciones del dataset Superstore')
+    subcomandos = parser.add_subparsers(dest='subcomando', metavar='SUBCOMANDO')
+    for nombre, secciones in SUBCOMANDOS_CLI.items():
+        subcomandos.add_parser(nombre, parents=[comun], help=', '.join(secciones))
+    
+    # Sin subcomando se ejecutan todas las secciones con las opciones indicadas
+    argumentos = sys.argv[1:] if argumentos is None else list(argumentos)
+    if not argumentos or argumentos[0] not in (*SUBCOMANDOS_CLI, '-h', '--help'):
+        argumentos = ['todo', *argumentos]
+    args = parser.parse_args(argumentos)
+    try:
+        validar_modos_carga(args.streaming, args.paralelo, args.incremental, args.motor, args.cubo)
+    except ValueError as e:
+        parser.error(str(e))
+    CONFIG_CACHE_FIGURAS.update(max_mb=args.cache_figuras_mb, politica=args.politica_cache)
+    
+    main(args.datos, streaming=args.streaming, tamano_bloque=args.tamano_bloque, directorio_salida=args.salida,
+         procesos=args.procesos, incremental=args.incremental, instrumentar=args.instrumentar,
+         ruta_informe=args.informe, directorio_perfiles=args.perfiles, motor=args.motor,
+         verificar=args.verificar, ruta_cubo=args.cubo, paralelo=args.paralelo,
+         compacto=args.compacto, secciones=SUBCOMANDOS_CLI[args.subcomando],
+         directorio_cache_figuras=args.cache_figuras, directorio_exportacion=args.exportar,
+         formato_exportacion=args.formato_exportacion)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    ejecutar_cli()
\ No newline at end of file
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del Análisis de Visualizaciones del Dataset Superstore
+Genera datasets sintéticos con la forma de superstore_dataset2012.csv y mide cada
+etapa del pipeline (lectura, preparación, agregados y renderizado)
+
+Uso:
+    python benchmark_superstore.py --filas 10000 1000000 10000000 --salida resultados.json
+    python benchmark_superstore.py --filas 10000 --comparar resultados_anteriores.json
+
+Autor: Sistema de Análisis de Datos
+Python: 3.12
+"""
+
+import argparse
+import json
+import os
+import platform
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+
+import analisis_visualizaciones_superstore as analisis
+
+# Mercados y regiones del dataset original, con el peso aproximado de cada mercado
+MERCADOS = {
+    'APAC': (0.22, ['Southeast Asia', 'Oceania', 'Central Asia', 'North Asia']),
+    'LATAM': (0.21, ['South', 'Central', 'North', 'Caribbean']),
+    'EU': (0.20, ['South', 'North', 'Central']),
+    'US': (0.19, ['Central', 'East', 'South', 'West']),
+    'EMEA': (0.10, ['EMEA']),
+    'Africa': (0.07, ['Africa']),
+    'Canada': (0.01, ['Canada']),
+}
+
+# Subcategorías por categoría (17 en total, como el dataset original)
+CATEGORIAS = {
+    'Furniture': ['Chairs', 'Bookcases', 'Furnishings', 'Tables'],
+    'Office Supplies': ['Paper', 'Supplies', 'Storage', 'Art', 'Binders',
+                        'Appliances', 'Fasteners', 'Envelopes', 'Labels'],
+    'Technology': ['Phones', 'Accessories', 'Copiers', 'Machines'],
+}
+
+# Distribuciones de las dimensiones de baja cardinalidad
+MODOS_ENVIO = {'Standard Class': 0.62, 'Second Class': 0.17, 'First Class': 0.16, 'Same Day': 0.05}
+PRIORIDADES = {'Medium': 0.60, 'High': 0.29, 'Critical': 0.07, 'Low': 0.04}
+SEGMENTOS = {'Consumer': 0.54, 'Corporate': 0.30, 'Home Office': 0.16}
+DESCUENTOS = {0.0: 0.56, 0.1: 0.09, 0.2: 0.10, 0.4: 0.07, 0.5: 0.03, 0.6: 0.05, 0.7: 0.04,
+              0.15: 0.02, 0.17: 0.02, 0.27: 0.01, 0.47: 0.01}
+
+# Países por mercado (cardinalidad total similar a la del dataset original)
+PAISES_POR_MERCADO = 16
+
+# Tamaños por defecto y bloque de escritura del generador
+FILAS_POR_DEFECTO = [10_000, 1_000_000, 10_000_000]
+BLOQUE_GENERACION = 1_000_000
+
+def _elegir(rng, opciones, n):
+    """
+    Elige n valores de un diccionario {valor: probabilidad}
+    """
+    valores = list(opciones)
+    probabilidades = np.array(list(opciones.values()), dtype=float)
+    return np.array(valores, dtype=object)[rng.choice(len(valores), size=n, p=probabilidades / probabilidades.sum())]
+
+def _generar_bloque(rng, inicio, n):
+    """
+    Genera un bloque de n filas sintéticas con las 24 columnas del dataset
+    """
+    # Dimensiones geográficas coherentes: mercado -> región -> país -> estado -> ciudad
+    mercados = _elegir(rng, {m: peso for m, (peso, _) in MERCADOS.items()}, n)
+    regiones = np.empty(n, dtype=object)
+    for mercado, (_, lista_regiones) in MERCADOS.items():
+        mascara = mercados == mercado
+        regiones[mascara] = np.array(lista_regiones, dtype=object)[rng.integers(0, len(lista_regiones), mascara.sum())]
+    indice_pais = rng.integers(0, PAISES_POR_MERCADO, n)
+    paises = pd.Series(mercados).str.cat(pd.Series(indice_pais).astype(str), sep=' País ')
+    estados = paises.str.cat(pd.Series(rng.integers(0, 5, n)).astype(str), sep=' Estado ')
+    ciudades = estados.str.cat(pd.Series(rng.integers(0, 2, n)).astype(str), sep=' Ciudad ')
+
+    # Producto: categoría -> subcategoría -> producto
+    subcategorias_todas = [(cat, sub) for cat, subs in CATEGORIAS.items() for sub in subs]
+    pesos = np.array([3.0 if cat == 'Office Supplies' else 2.0 for cat, _ in subcategorias_todas])
+    eleccion = rng.choice(len(subcategorias_todas), size=n, p=pesos / pesos.sum())
+    categorias = np.array([cat for cat, _ in subcategorias_todas], dtype=object)[eleccion]
+    subcategorias = np.array([sub for _, sub in subcategorias_todas], dtype=object)[eleccion]
+    id_producto = pd.Series(rng.integers(10_000_000, 10_000_200, n)).astype(str)
+    productos = pd.Series(categorias).str[:3].str.upper() + '-' + pd.Series(subcategorias).str[:2].str.upper() + '-' + id_producto
+
+    # Cliente y pedido
+    id_cliente = pd.Series(rng.integers(10_000, 10_000 + max(1_000, n // 5), n)).astype(str)
+    fechas_pedido = pd.Timestamp('2011-01-01') + pd.to_timedelta(rng.integers(0, 4 * 365, n), unit='D')
+    fechas_envio = fechas_pedido + pd.to_timedelta(rng.integers(0, 8, n), unit='D')
+    anios = pd.Series(fechas_pedido.year).astype(str)
+
+    # Métricas con distribuciones similares a las originales
+    ventas = np.round(rng.lognormal(mean=np.log(82), sigma=1.3, size=n), 4)
+    cantidades = rng.integers(1, 15, n)
+    descuentos = _elegir(rng, DESCUENTOS, n).astype(float)
+    margen = rng.normal(0.15 - 0.8 * descuentos, 0.2)
+    beneficios = np.round(ventas * margen, 4)
+    costes_envio = np.round(ventas * rng.uniform(0.02, 0.2, n), 2)
+
+    return pd.DataFrame({
+        'Row ID': np.arange(inicio + 1, inicio + n + 1),
+        'Order ID': 'ID-' + anios + '-' + pd.Series(rng.integers(100_000, 100_000 + max(1_000, n // 2), n)).astype(str),
+        'Order Date': fechas_pedido.strftime('%d/%m/%Y'),
+        'Ship Date': fechas_envio.strftime('%d/%m/%Y'),
+        'Ship Mode': _elegir(rng, MODOS_ENVIO, n),
+        'Customer ID': 'CU-' + id_cliente,
+        'Customer Name': 'Cliente ' + id_cliente,
+        'Segment': _elegir(rng, SEGMENTOS, n),
+        'City': ciudades,
+        'State': estados,
+        'Country': paises,
+        'Postal Code': np.where(mercados == 'US', rng.integers(1_000, 99_999, n), np.nan),
+        'Market': mercados,
+        'Region': regiones,
+        'Product ID': productos,
+        'Category': categorias,
+        'Sub-Category': subcategorias,
+        'Product Name': 'Producto ' + productos,
+        'Sales': ventas,
+        'Quantity': cantidades,
+        'Discount': descuentos,
+        'Profit': beneficios,
+        'Shipping Cost': costes_envio,
+        'Order Priority': _elegir(rng, PRIORIDADES, n),
+    })
+
+def generar_dataset_sintetico(filas, ruta, semilla=42):
+    """
+    Escribe un CSV sintético con la forma de superstore_dataset2012.csv
+
+    Se genera por bloques para acotar la memoria incluso con decenas de millones de filas.
+    Si el archivo ya existe se reutiliza.
+
+    Args:
+        filas (int): Número de filas
+        ruta (str): Ruta del CSV de salida
+        semilla (int): Semilla del generador
+    """
+    if os.path.exists(ruta):
+        print(f"♻️ Reutilizando dataset sintético: {ruta}")
+        return
+
+    print(f"🧪 Generando dataset sintético de {filas} filas: {ruta}")
+    rng = np.random.default_rng(semilla)
+    for inicio in range(0, filas, BLOQUE_GENERACION):
+        bloque = _generar_bloque(rng, inicio, min(BLOQUE_GENERACION, filas - inicio))
+        bloque.to_csv(ruta, mode='a', header=inicio == 0, index=False)
+
+def ejecutar_benchmark(filas, directorio):
+    """
+    Mide todas las etapas del pipeline sobre un dataset sintético de un tamaño dado
+
+    Cada etapa se mide con la instrumentación del análisis (medir_etapa), de modo que
+    los registros tienen los mismos campos que el informe de main(instrumentar=True):
+    tiempo, filas, pico de tracemalloc y pico e incremento de memoria residente, que
+    incluye los buffers de Arrow y numpy que tracemalloc no ve.
+
+    Args:
+        filas (int): Número de filas del dataset sintético
+        directorio (str): Directorio de datasets y figuras
+
+    Returns:
+        list: Registros de las etapas en orden de ejecución
+    """
+    ruta = os.path.join(directorio, f"superstore_sintetico_{filas}.csv")
+    generar_dataset_sintetico(filas, ruta)
+    directorio_figuras = os.path.join(directorio, f"figuras_{filas}")
+    os.makedirs(directorio_figuras, exist_ok=True)
+    analisis.CONFIG_SALIDA['directorio'] = directorio_figuras
+    analisis.CONFIG_INSTRUMENTACION['activa'] = True
+    del analisis.REGISTRO_ETAPAS[:]
+    medir_etapa = analisis.medir_etapa
+
+    print(f"\n📏 BENCHMARK CON {filas} FILAS")
+    print("=" * 75)
+
+    # Carga y preparación, etapa por etapa
+    with medir_etapa('lectura_csv') as registro:
+        df = pd.read_csv(ruta, encoding='utf-8', dtype=analisis.ESQUEMA_COLUMNAS)
+        registro['df'] = df
+    with medir_etapa('conversion_fechas', df):
+        analisis.convertir_fechas(df)
+    with medir_etapa('columnas_derivadas', df):
+        analisis.preparar_columnas_derivadas(df)
+    with medir_etapa('guardado_cache', df):
+        analisis.guardar_cache_datos(df, ruta)
+    with medir_etapa('lectura_cache') as registro:
+        registro['df'] = analisis._leer_archivo_cache(analisis._rutas_cache(ruta)[0])
+
+    # Agregados compartidos
+    with medir_etapa('agregados', df):
+        agregados = analisis.construir_agregados(df)
+
+    # Renderizado de cada sección; el savefig del dashboard se mide como etapa anidada
+    finalizar_original = analisis.finalizar_figura
+
+    def finalizar_medido(fig, nombre, **kwargs):
+        if nombre != 'dashboard_superstore_2012':
+            return finalizar_original(fig, nombre, **kwargs)
+        with medir_etapa('savefig_dashboard'):
+            return finalizar_original(fig, nombre, **kwargs)
+
+    analisis.finalizar_figura = finalizar_medido
+    try:
+        for seccion in analisis.SECCIONES_ANALISIS:
+            with medir_etapa(seccion, df):
+                getattr(analisis, seccion)(df, agregados)
+    finally:
+        analisis.finalizar_figura = finalizar_original
+
+    return list(analisis.informe_instrumentacion())
+
+def comparar_resultados(actuales, anteriores):
+    """
+    Imprime la variación de tiempo por etapa respecto a una ejecución anterior
+
+    Args:
+        actuales (dict): Resultados de esta ejecución
+        anteriores (dict): Resultados cargados del JSON anterior
+    """
+    print("\n📊 COMPARACIÓN CON LA EJECUCIÓN ANTERIOR")
+    print("=" * 75)
+    for filas, mediciones in actuales['resultados'].items():
+        previas = {m['etapa']: m for m in anteriores['resultados'].get(filas, [])}
+        if not previas:
+            continue
+        print(f"\n{filas} filas:")
+        for medicion in mediciones:
+            previa = previas.get(medicion['etapa'])
+            if previa is None or not previa['segundos']:
+                continue
+            ratio = medicion['segundos'] / previa['segundos']
+            marca = '🔺' if ratio > 1.1 else ('🔻' if ratio < 0.9 else '  ')
+            print(f"  {marca} {medicion['etapa']:<45} {previa['segundos']:>9.3f} s -> "
+                  f"{medicion['segundos']:>9.3f} s (x{ratio:.2f})")
+
+def main():
+    """
+    Punto de entrada del benchmark
+    """
+    parser = argparse.ArgumentParser(description='Benchmark del pipeline de visualizaciones Superstore')
+    parser.add_argument('--filas', type=int, nargs='+', default=FILAS_POR_DEFECTO,
+                        help='Tamaños de dataset sintético a medir')
+    parser.add_argument('--directorio', default='benchmark_datos',
+                        help='Directorio para los datasets sintéticos y las figuras')
+    parser.add_argument('--salida', default='benchmark_resultados.json',
+                        help='Archivo JSON donde se guardan los resultados')
+    parser.add_argument('--comparar', help='JSON de una ejecución anterior para comparar')
+    args = parser.parse_args()
+
+    os.makedirs(args.directorio, exist_ok=True)
+    actuales = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'nucleos': os.cpu_count(),
+        'resultados': {},
+    }
+    for filas in args.filas:
+        actuales['resultados'][str(filas)] = ejecutar_benchmark(filas, args.directorio)
+
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(actuales, archivo, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados guardados en: {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            comparar_resultados(actuales, json.load(archivo))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Series Temporales del Dataset Superstore
+Remuestreo vectorizado sobre DatetimeIndex (diario, semanal, mensual y trimestral),
+medias móviles, crecimiento interanual e intertrimestral y descomposición estacional,
+para el total o por grupo (Market, Category...)
+
+Todas las funciones trabajan sobre series ya indexadas por fecha: la serie diaria se
+calcula una sola vez (a partir de las filas o de un agregado por 'Order Date') y las
+frecuencias más gruesas se obtienen remuestreándola, sin volver a recorrer las filas
+ni reconstruir fechas a partir de Year y Month.
+
+Uso:
+    diaria = serie_diaria(df, 'Sales', dimension='Market')
+    mensual = remuestrear(diaria, 'mensual')
+    metricas = metricas_temporales(mensual, 'mensual', ventana=3)
+    componentes = descomposicion_estacional(mensual, frecuencia='mensual')
+
+Autor: Sistema de Análisis de Datos
+Python: 3.12
+"""
+
+import numpy as np
+import pandas as pd
+
+# Frecuencias admitidas y su alias de pandas (periodos etiquetados por su fecha de inicio)
+FRECUENCIAS = {'diaria': 'D', 'semanal': 'W-MON', 'mensual': 'MS', 'trimestral': 'QS'}
+
+# Periodos de cada frecuencia en un año: desfase del crecimiento interanual y periodo
+# estacional por defecto
+PERIODOS_POR_ANIO = {'diaria': 365, 'semanal': 52, 'mensual': 12, 'trimestral': 4}
+
+def serie_diaria(df, medidas='Sales', dimension=None, columna_fecha='Order Date'):
+    """
+    Totales diarios de una o varias medidas en una sola pasada sobre las filas
+
+    Args:
+        df (pd.DataFrame): Filas con la columna de fecha y las medidas
+        medidas (str | list): Medida o lista de medidas a sumar
+        dimension (str, optional): Columna por la que obtener una serie por grupo
+        columna_fecha (str): Columna de fecha
+
+    Returns:
+        pd.Series | pd.DataFrame: Serie diaria continua (días sin pedidos a 0). Con una
+            dimensión, una columna por grupo (o por (medida, grupo) si hay varias medidas)
+    """
+    claves = [df[columna_fecha].dt.normalize().rename('Fecha')]
+    if dimension is not None:
+        claves.append(df[dimension])
+    totales = df.groupby(claves, observed=True)[medidas].sum()
+    if dimension is not None:
+        totales = totales.unstack(dimension, fill_value=0)
+    return remuestrear(totales, 'diaria')
+
+def remuestrear(serie, frecuencia='mensual'):
+    """
+    Suma una serie indexada por fecha a la frecuencia indicada
+
+    Args:
+        serie (pd.Series | pd.DataFrame): Totales indexados por fecha (p. ej. la serie diaria)
+        frecuencia (str): 'diaria', 'semanal', 'mensual' o 'trimestral'
+
+    Returns:
+        pd.Series | pd.DataFrame: Serie continua con índice 'Fecha' al inicio de cada periodo
+    """
+    remuestreada = serie.resample(FRECUENCIAS[frecuencia]).sum()
+    remuestreada.index.name = 'Fecha'
+    return remuestreada
+
+def media_movil(serie, ventana=3):
+    """
+    Media móvil de los últimos 'ventana' periodos (los primeros usan los disponibles)
+    """
+    return serie.rolling(ventana, min_periods=1).mean()
+
+def crecimiento(serie, periodos):
+    """
+    Crecimiento porcentual respecto a 'periodos' periodos antes (NaN si no hay base)
+    """
+    anterior = serie.shift(periodos)
+    return ((serie - anterior) / anterior.abs() * 100).replace([np.inf, -np.inf], np.nan)
+
+def crecimiento_intertrimestral(serie):
+    """
+    Crecimiento porcentual de cada trimestre natural respecto al anterior
+
+    Los periodos se suman por el trimestre de su fecha de inicio y cada periodo recibe
+    el crecimiento de su trimestre, de modo que el resultado es el mismo para una serie
+    diaria, mensual o trimestral (en la semanal, cada semana cuenta en el trimestre en
+    que empieza).
+
+    Args:
+        serie (pd.Series | pd.DataFrame): Serie remuestreada (una columna por grupo)
+
+    Returns:
+        pd.Series | pd.DataFrame: Crecimiento con el mismo índice que la serie
+    """
+    trimestres = serie.index.to_period('Q')
+    por_trimestre = crecimiento(serie.groupby(trimestres).sum(), 1)
+    return por_trimestre.loc[trimestres].set_axis(serie.index)
+
+def metricas_temporales(serie, frecuencia='mensual', ventana=3):
+    """
+    Valor, media móvil y crecimientos interanual (YoY) e intertrimestral (QoQ)
+
+    Args:
+        serie (pd.Series | pd.DataFrame): Serie remuestreada a 'frecuencia' (una columna por grupo)
+        frecuencia (str): Frecuencia de la serie
+        ventana (int): Periodos de la media móvil
+
+    Returns:
+        pd.DataFrame: Una columna por métrica; para series por grupo, índice (Fecha, grupo)
+    """
+    ancho = serie.to_frame('valor') if isinstance(serie, pd.Series) else serie
+    metricas = pd.concat({
+        'valor': ancho,
+        'media_movil': media_movil(ancho, ventana),
+        'crecimiento_interanual': crecimiento(ancho, PERIODOS_POR_ANIO[frecuencia]),
+        'crecimiento_intertrimestral': crecimiento_intertrimestral(ancho),
+    }, axis=1)
+    if isinstance(serie, pd.Series):
+        return metricas.droplevel(1, axis=1)
+    return metricas.stack(level=1)
+
+def descomposicion_estacional(serie, periodo=None, frecuencia='mensual'):
+    """
+    Descomposición aditiva clásica en tendencia, componente estacional y residuo
+
+    La tendencia es la media móvil centrada del periodo (2xm si el periodo es par), el
+    componente estacional la media de la serie sin tendencia en cada posición del ciclo
+    (centrada en cero) y el residuo lo que queda. Con una columna por grupo se
+    descomponen todos los grupos a la vez.
+
+    Args:
+        serie (pd.Series | pd.DataFrame): Serie remuestreada (una columna por grupo)
+        periodo (int, optional): Periodos por ciclo (por defecto los de un año)
+        frecuencia (str): Frecuencia de la serie, para el periodo por defecto
+
+    Returns:
+        pd.DataFrame: Columnas observado, tendencia, estacional y residuo (por grupo si aplica)
+
+    Raises:
+        ValueError: Si la serie no cubre al menos dos ciclos completos
+    """
+    periodo = periodo or PERIODOS_POR_ANIO[frecuencia]
+    if len(serie) < 2 * periodo:
+        raise ValueError(f"Se necesitan al menos dos ciclos completos ({2 * periodo} periodos) "
+                         f"y la serie tiene {len(serie)}")
+
+    # Media móvil centrada a partir de la media móvil final: para un periodo par se
+    # promedian las dos ventanas desplazadas, que equivale a los pesos 1/2m en los extremos
+    media = serie.rolling(periodo).mean()
+    if periodo % 2:
+        tendencia = media.shift(-(periodo // 2))
+    else:
+        tendencia = (media.shift(-(periodo // 2 - 1)) + media.shift(-(periodo // 2))) / 2
+
+    posiciones = np.arange(len(serie)) % periodo
+    indices = (serie - tendencia).groupby(posiciones).mean()
+    indices = indices - indices.mean()
+    estacional = indices.iloc[posiciones]
+    estacional.index = serie.index
+
+    return pd.concat({
+        'observado': serie,
+        'tendencia': tendencia,
+        'estacional': estacional,
+        'residuo': serie - tendencia - estacional,
+    }, axis=1)
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor del Dashboard Interactivo del Dataset Superstore
+Carga el dataset una sola vez y sirve los paneles del dashboard y sus agregados en
+JSON para cualquier combinación de filtros (Market, Region, Category, Segment y rango
+de fechas), con una caché LRU de paneles renderizados
+
+Uso:
+    python servidor_dashboard.py --datos superstore_dataset2012.csv --puerto 8050
+    http://localhost:8050/?market=EU,US&category=Technology&desde=2012-03-01&hasta=2012-06-30
+
+Endpoints:
+    /                          Página del dashboard con el formulario de filtros
+    /panel/<nombre>.png        Panel renderizado (nombres de PANELES_DASHBOARD)
+    /api/agregados             KPIs y agregados del dashboard en JSON
+    /api/filtros               Valores disponibles para cada filtro
+    /api/cache                 Estado de las cachés del servidor
+
+Autor: Sistema de Análisis de Datos
+Python: 3.12
+"""
+
+import argparse
+import html
+import json
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+
+import analisis_visualizaciones_superstore as analisis
+
+# Filtros categóricos: parámetro de la URL -> columna del dataset
+FILTROS_CATEGORICOS = {'market': 'Market', 'region': 'Region', 'category': 'Category', 'segment': 'Segment'}
+
+# Columnas que se mantienen en memoria: las de los filtros y las de AGREGADOS_GRAFICAS
+COLUMNAS_SERVIDOR = ['Order Date', 'Market', 'Region', 'Category', 'Sub-Category', 'Segment',
+                     'Ship Mode', 'Order Priority', 'Sales', 'Quantity', 'Discount', 'Profit',
+                     'Shipping Cost', 'Profit_Margin']
+
+# Combinaciones de filtros cuyos datos y agregados se conservan en memoria
+MAX_FILTROS_EN_MEMORIA = 32
+
+# Caché LRU de paneles renderizados (PNG) con expulsión por tamaño total
+CACHE_PANELES = {'entradas': OrderedDict(), 'bytes': 0, 'max_bytes': 64 * 2**20,
+                 'aciertos': 0, 'fallos': 0, 'expulsiones': 0}
+
+# Datos columnares, códigos de los filtros y agregados del dataset completo
+ESTADO = {}
+
+# Paneles que se pueden pedir en /panel/<nombre>.png
+NOMBRES_PANELES = {nombre for nombre, _, _ in analisis.PANELES_DASHBOARD}
+
+# Bloqueos por clave de cálculo: las peticiones de una misma clave (panel y filtros)
+# esperan a un único cálculo y las de claves distintas se atienden en paralelo.
+# Cada entrada es [bloqueo, peticiones que lo usan] y se borra al quedar sin uso
+_BLOQUEOS_CLAVE = {}
+_BLOQUEO_CACHE = threading.Lock()
+
+def cargar_estado(ruta_dataset):
+    """
+    Carga el dataset una vez y precalcula los códigos de filtro y los agregados globales
+
+    Args:
+        ruta_dataset (str): Ruta del archivo CSV
+
+    Returns:
+        bool: True si el dataset se cargó correctamente
+    """
+    completo = analisis.cargar_y_preparar_datos(ruta_dataset)
+    if completo is None:
+        return False
+    df = completo[COLUMNAS_SERVIDOR]
+    # El índice es posicional, así que sirve igual para el subconjunto de columnas
+    indice = analisis.obtener_indice(completo)
+    analisis.registrar_indice(df, indice if indice is not None else analisis.construir_indice(df))
+
+    ESTADO['df'] = df
+    ESTADO['categorias'] = {parametro: list(df[columna].cat.categories)
+                            for parametro, columna in FILTROS_CATEGORICOS.items()}
+    print("\n🗃️ Precalculando agregados del dataset completo...")
+    ESTADO['agregados'] = analisis.construir_agregados(df)
+    datos_filtrados.cache_clear()
+    print(f"✅ Servidor listo con {len(df)} pedidos en memoria "
+          f"({df.memory_usage(deep=True).sum() / 2**20:.1f} MB)")
+    return True
+
+@contextmanager
+def bloqueo_por_clave(clave):
+    """
+    Serializa los cálculos de una misma clave sin bloquear los de otras claves
+    """
+    with _BLOQUEO_CACHE:
+        entrada = _BLOQUEOS_CLAVE.setdefault(clave, [threading.Lock(), 0])
+        entrada[1] += 1
+    try:
+        with entrada[0]:
+            yield
+    finally:
+        with _BLOQUEO_CACHE:
+            entrada[1] -= 1
+            if not entrada[1]:
+                del _BLOQUEOS_CLAVE[clave]
+
+def normalizar_filtros(consulta):
+    """
+    Convierte la query string en una clave de filtros canónica y hashable
+
+    Los valores de un filtro categórico se pueden repetir o separar por comas; el orden
+    no importa, de modo que ?market=EU,US y ?market=US&market=EU comparten caché.
+    Las fechas 'desde' y 'hasta' admiten un único valor.
+
+    Args:
+        consulta (str): Query string de la petición
+
+    Returns:
+        tuple: Pares (parámetro, valor) ordenados
+
+    Raises:
+        ValueError: Si un filtro o un valor no existe, una fecha no es válida o se repite
+    """
+    parametros = parse_qs(consulta)
+    filtros = []
+    for parametro, valores in parametros.items():
+        valores = sorted({v.strip() for valor in valores for v in valor.split(',') if v.strip()})
+        if not valores:
+            continue
+        if parametro in FILTROS_CATEGORICOS:
+            desconocidos = [v for v in valores if v not in ESTADO['categorias'][parametro]]
+            if desconocidos:
+                raise ValueError(f"Valores no válidos para {parametro}: {', '.join(desconocidos)}")
+            filtros.append((parametro, tuple(valores)))
+        elif parametro in ('desde', 'hasta'):
+            if len(valores) > 1:
+                raise ValueError(f"El filtro {parametro} admite una sola fecha: {', '.join(valores)}")
+            filtros.append((parametro, pd.Timestamp(valores[0]).strftime('%Y-%m-%d')))
+        else:
+            raise ValueError(f"Filtro desconocido: {parametro}")
+    return tuple(sorted(filtros))
+
+@lru_cache(maxsize=MAX_FILTROS_EN_MEMORIA)
+def datos_filtrados(filtros):
+    """
+    Filas que cumplen los filtros y su caché de agregados (vacía hasta que se usa)
+
+    Los filtros se resuelven con el índice de filas del dataset, de modo que solo se
+    leen las filas que cumplen la condición más selectiva.
+
+    Args:
+        filtros (tuple): Clave de normalizar_filtros
+
+    Returns:
+        tuple: (pd.DataFrame filtrado, dict de agregados)
+    """
+    if not filtros:
+        return ESTADO['df'], ESTADO['agregados']
+
+    condiciones = {FILTROS_CATEGORICOS[parametro]: list(valor)
+                   for parametro, valor in filtros if parametro in FILTROS_CATEGORICOS}
+    seleccion = dict(filtros)
+    if 'desde' in seleccion or 'hasta' in seleccion:
+        # El día de 'hasta' se incluye completo
+        hasta = seleccion.get('hasta')
+        if hasta is not None:
+            hasta = pd.Timestamp(hasta) + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+        condiciones['Order Date'] = (seleccion.get('desde'), hasta)
+    return analisis.filtrar_indexado(ESTADO['df'], condiciones), {}
+
+def _datos_filtrados_una_vez(filtros):
+    """
+    datos_filtrados sin que peticiones simultáneas con los mismos filtros los calculen dos veces
+    """
+    with bloqueo_por_clave(('datos', filtros)):
+        return datos_filtrados(filtros)
+
+def _serie_a_json(serie):
+    """
+    Convierte una Series de agregados en un dict con claves de texto
+    """
+    return {str(clave): float(valor) for clave, valor in serie.items()}
+
+def agregados_dashboard(filtros):
+    """
+    KPIs y agregados que muestra el dashboard para unos filtros, listos para JSON
+
+    Args:
+        filtros (tuple): Clave de normalizar_filtros
+
+    Returns:
+        dict | None: Agregados o None si ningún pedido cumple los filtros
+    """
+    with bloqueo_por_clave(('agregados', filtros)):
+        df, agregados = _datos_filtrados_una_vez(filtros)
+        if df.empty:
+            return None
+        obtener = analisis.obtener_agregado
+        region = obtener(df, agregados, ('Sales', 'Profit', 'Quantity'), ('Region',), 'sum')
+        ventas_mensuales = analisis.obtener_ventas_mensuales(df, agregados)
+        correlacion = obtener(df, agregados, analisis.COLUMNAS_CORRELACION, (), 'corr')
+        correlacion_market = obtener(df, agregados, analisis.COLUMNAS_CORRELACION, ('Market',), 'corr')
+        return {
+            'filtros': {parametro: valor for parametro, valor in filtros},
+            'pedidos': len(df),
+            'ventas_totales': float(region['Sales'].sum()),
+            'beneficio_total': float(region['Profit'].sum()),
+            'cantidad_total': float(region['Quantity'].sum()),
+            'ventas_mensuales': {fecha.strftime('%Y-%m'): float(ventas)
+                                 for fecha, ventas in zip(ventas_mensuales['Fecha'], ventas_mensuales['Sales'])},
+            'conteo_categorias': _serie_a_json(obtener(df, agregados, 'conteo', ('Category',), 'count')),
+            'top_subcategorias': _serie_a_json(obtener(df, agregados, 'Sales', ('Sub-Category',), 'sum').nlargest(10)),
+            'regiones': {str(r): {c: float(v) for c, v in fila.items()} for r, fila in region.iterrows()},
+            'correlacion': json.loads(correlacion.to_json()),
+            'correlacion_por_market': {str(m): json.loads(matriz.to_json()) for m, matriz in correlacion_market.items()},
+        }
+
+def _cache_obtener(clave):
+    """
+    Devuelve un panel de la caché LRU y lo marca como usado recientemente
+    """
+    with _BLOQUEO_CACHE:
+        entradas = CACHE_PANELES['entradas']
+        if clave in entradas:
+            entradas.move_to_end(clave)
+            CACHE_PANELES['aciertos'] += 1
+            return entradas[clave]
+        CACHE_PANELES['fallos'] += 1
+        return None
+
+def _cache_guardar(clave, contenido):
+    """
+    Guarda un panel en la caché LRU expulsando los menos usados si se supera el tamaño
+    """
+    with _BLOQUEO_CACHE:
+        entradas = CACHE_PANELES['entradas']
+        if clave in entradas:
+            CACHE_PANELES['bytes'] -= len(entradas.pop(clave))
+        entradas[clave] = contenido
+        CACHE_PANELES['bytes'] += len(contenido)
+        while CACHE_PANELES['bytes'] > CACHE_PANELES['max_bytes'] and len(entradas) > 1:
+            _, expulsado = entradas.popitem(last=False)
+            CACHE_PANELES['bytes'] -= len(expulsado)
+            CACHE_PANELES['expulsiones'] += 1
+
+def renderizar_panel(nombre_panel, filtros):
+    """
+    Devuelve el PNG de un panel del dashboard para unos filtros, usando la caché LRU
+
+    Si está activa la caché de figuras en disco, el panel se busca en ella por la
+    huella de las entradas que lee (analisis.renderizar_panel), así que filtros
+    distintos con los mismos datos, el modo batch y los reinicios del servidor
+    comparten la imagen. Solo se serializan las peticiones del mismo panel y filtros;
+    las demás se renderizan a la vez en los hilos del servidor.
+
+    Args:
+        nombre_panel (str): Nombre del panel en PANELES_DASHBOARD
+        filtros (tuple): Clave de normalizar_filtros
+
+    Returns:
+        bytes | None: Imagen PNG o None si ningún pedido cumple los filtros
+
+    Raises:
+        KeyError: Si el panel no existe
+    """
+    if nombre_panel not in NOMBRES_PANELES:
+        raise KeyError(nombre_panel)
+    clave = (nombre_panel, filtros)
+    with bloqueo_por_clave(clave):
+        contenido = _cache_obtener(clave)
+        if contenido is not None:
+            return contenido
+        df, agregados = _datos_filtrados_una_vez(filtros)
+        if df.empty:
+            return None
+        contenido = analisis.renderizar_panel(nombre_panel, df, agregados)
+        _cache_guardar(clave, contenido)
+    if analisis.CONFIG_CACHE_FIGURAS['directorio'] is not None:
+        with bloqueo_por_clave('recorte_cache_figuras'):
+            analisis.recortar_cache_figuras()
+    return contenido
+
+def pagina_dashboard(filtros, consulta):
+    """
+    Página HTML con el formulario de filtros y los paneles del dashboard
+    """
+    seleccion = dict(filtros)
+    controles = []
+    for parametro, columna in FILTROS_CATEGORICOS.items():
+        opciones = ''.join(
+            f'<option{" selected" if valor in seleccion.get(parametro, ()) else ""}>{html.escape(valor)}</option>'
+            for valor in ESTADO['categorias'][parametro])
+        controles.append(f'<label>{columna}<br><select name="{parametro}" multiple size="5">{opciones}</select></label>')
+    for parametro in ('desde', 'hasta'):
+        controles.append(f'<label>{parametro.capitalize()}<br>'
+                         f'<input type="date" name="{parametro}" value="{seleccion.get(parametro, "")}"></label>')
+
+    sufijo = f'?{html.escape(consulta)}' if consulta else ''
+    paneles = ''.join(
+        f'<img src="/panel/{nombre}.png{sufijo}" alt="{nombre}" '
+        f'style="grid-column: span {len(range(4)[pos[1]]) if isinstance(pos[1], slice) else 1}">'
+        for nombre, pos, _ in analisis.PANELES_DASHBOARD)
+    return f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Dashboard Superstore 2012</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+form {{ display: flex; gap: 16px; align-items: flex-end; margin-bottom: 16px; }}
+.rejilla {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 8px; }}
+.rejilla img {{ width: 100%; }}
+</style></head><body>
+<h1>Dashboard Completo - Análisis Superstore 2012</h1>
+<form method="get">{''.join(controles)}<button type="submit">Filtrar</button> <a href="/">Limpiar</a></form>
+<p><a href="/api/agregados{sufijo}">Agregados en JSON</a></p>
+<div class="rejilla">{paneles}</div>
+</body></html>"""
+
+class ManejadorDashboard(BaseHTTPRequestHandler):
+    """
+    Manejador HTTP del dashboard: página, paneles PNG y endpoints JSON
+    """
+
+    def do_GET(self):
+        inicio = time.perf_counter()
+        url = urlparse(self.path)
+        try:
+            filtros = normalizar_filtros(url.query)
+        except ValueError as e:
+            self._responder_json(400, {'error': str(e)}, inicio)
+            return
+
+        if url.path == '/':
+            self._responder(200, pagina_dashboard(filtros, url.query).encode('utf-8'),
+                            'text/html; charset=utf-8', inicio)
+        elif url.path.startswith('/panel/') and url.path.endswith('.png'):
+            nombre_panel = url.path[len('/panel/'):-len('.png')]
+            if nombre_panel not in NOMBRES_PANELES:
+                self._responder_json(404, {'error': 'Panel desconocido'}, inicio)
+                return
+            try:
+                contenido = renderizar_panel(nombre_panel, filtros)
+            except Exception as e:
+                self._responder_error(e, inicio)
+                return
+            if contenido is None:
+                self._responder_json(404, {'error': 'Ningún pedido cumple los filtros'}, inicio)
+            else:
+                self._responder(200, contenido, 'image/png', inicio)
+        elif url.path == '/api/agregados':
+            try:
+                resultado = agregados_dashboard(filtros)
+            except Exception as e:
+                self._responder_error(e, inicio)
+                return
+            if resultado is None:
+                self._responder_json(404, {'error': 'Ningún pedido cumple los filtros'}, inicio)
+            else:
+                self._responder_json(200, resultado, inicio)
+        elif url.path == '/api/filtros':
+            self._responder_json(200, ESTADO['categorias'], inicio)
+        elif url.path == '/api/cache':
+            self._responder_json(200, {
+                'paneles': len(CACHE_PANELES['entradas']),
+                'megabytes': round(CACHE_PANELES['bytes'] / 2**20, 2),
+                'max_megabytes': round(CACHE_PANELES['max_bytes'] / 2**20, 2),
+                'aciertos': CACHE_PANELES['aciertos'],
+                'fallos': CACHE_PANELES['fallos'],
+                'expulsiones': CACHE_PANELES['expulsiones'],
+                'filtros_en_memoria': datos_filtrados.cache_info().currsize,
+                'agregados': dict(analisis.CONTADORES_AGREGADOS),
+            }, inicio)
+        else:
+            self._responder_json(404, {'error': 'Ruta no encontrada'}, inicio)
+
+    def _responder_json(self, codigo, datos, inicio):
+        self._responder(codigo, json.dumps(datos, ensure_ascii=False).encode('utf-8'),
+                        'application/json; charset=utf-8', inicio)
+
+    def _responder_error(self, error, inicio):
+        """
+        Registra un fallo al agregar o dibujar y responde 500 con el error en JSON
+        """
+        print(f"❌ Error al atender {self.path}: {type(error).__name__}: {error}")
+        traceback.print_exc()
+        self._responder_json(500, {'error': f'Error interno: {type(error).__name__}: {error}'}, inicio)
+
+    def _responder(self, codigo, contenido, tipo, inicio):
+        self.send_response(codigo)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(contenido)))
+        self.send_header('Server-Timing', f'total;dur={(time.perf_counter() - inicio) * 1000:.1f}')
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def log_message(self, formato, *args):
+        print(f"🌐 {self.address_string()} - {formato % args}")
+
+def main():
+    """
+    Punto de entrada del servidor del dashboard
+    """
+    parser = argparse.ArgumentParser(description='Servidor del dashboard interactivo Superstore')
+    parser.add_argument('--datos', default=analisis.RUTA_DATASET, help='Ruta del CSV del dataset')
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección en la que escuchar')
+    parser.add_argument('--puerto', type=int, default=8050, help='Puerto HTTP')
+    parser.add_argument('--cache-mb', type=float, default=64,
+                        help='Tamaño máximo de la caché de paneles renderizados en MB')
+    parser.add_argument('--cache-figuras', help='Directorio de la caché de paneles en disco '
+                                                '(se conserva entre ejecuciones)')
+    parser.add_argument('--cache-figuras-mb', type=float, default=analisis.CONFIG_CACHE_FIGURAS['max_mb'],
+                        help='Tamaño máximo de la caché de paneles en disco en MB')
+    args = parser.parse_args()
+
+    CACHE_PANELES['max_bytes'] = int(args.cache_mb * 2**20)
+    analisis.CONFIG_CACHE_FIGURAS.update(directorio=args.cache_figuras, max_mb=args.cache_figuras_mb)
+    if not cargar_estado(args.datos):
+        print("❌ No se pudo cargar el dataset. Terminando ejecución.")
+        return
+
+    servidor = ThreadingHTTPServer((args.host, args.puerto), ManejadorDashboard)
+    print(f"🚀 Dashboard disponible en http://{args.host}:{args.puerto}/")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido")
+    finally:
+        servidor.server_close()
+
+if __name__ == "__main__":
+    main()